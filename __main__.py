@@ -1,6 +1,8 @@
+import sys
+
 from .flows import main
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
 
@@ -0,0 +1,149 @@
+import contextlib
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+from urllib.parse import urlparse
+
+logger = logging.getLogger("BatchRunner")
+
+_local = threading.local()
+
+
+def current_prefix() -> str:
+    return getattr(_local, "prefix", "") or ""
+
+
+@contextlib.contextmanager
+def account_output(prefix: str):
+    """在当前线程内为 print / 日志输出加上账号前缀"""
+    old = current_prefix()
+    _local.prefix = prefix
+    try:
+        yield
+    finally:
+        stream = sys.stdout
+        if isinstance(stream, PrefixedStream):
+            stream.flush_thread()
+        _local.prefix = old
+
+
+class PrefixedStream:
+    """
+    按线程缓冲的输出流：带前缀的线程按整行写出，避免多个账号的输出交错在同一行。
+    未设置前缀的线程 (主线程) 原样透传。
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._buffers: dict[int, str] = {}
+
+    def write(self, s: str) -> int:
+        prefix = current_prefix()
+        if not prefix:
+            with self._lock:
+                return self._stream.write(s)
+        tid = threading.get_ident()
+        with self._lock:
+            buf = self._buffers.get(tid, "") + s
+            *lines, rest = buf.split("\n")
+            self._buffers[tid] = rest
+            if lines:
+                self._stream.write("".join(f"{prefix}{line}\n" for line in lines))
+        return len(s)
+
+    def flush_thread(self):
+        prefix = current_prefix()
+        with self._lock:
+            rest = self._buffers.pop(threading.get_ident(), "")
+            if rest:
+                self._stream.write(f"{prefix}{rest}\n")
+
+    def flush(self):
+        with self._lock:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class PrefixLogFilter(logging.Filter):
+    """为并发批处理中的日志记录加上当前线程的账号前缀"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        prefix = current_prefix()
+        if prefix and not getattr(record, "_cep_prefixed", False):
+            record.msg = f"{prefix}{record.msg}"
+            record._cep_prefixed = True
+        return True
+
+
+def host_of(base_url: str) -> str:
+    try:
+        return urlparse(base_url or "").netloc.lower()
+    except Exception:
+        return ""
+
+
+class BatchExecutor:
+    """
+    多账号并发执行器：线程池 + 按主机的并发上限。
+    同一主机同时处理的账号数不超过 per_host，结果顺序与输入顺序一致。
+    """
+
+    def __init__(self, workers: int = 4, per_host: int = 4):
+        self.workers = max(1, int(workers or 1))
+        self.per_host = max(1, int(per_host or 1))
+        self._host_slots: dict[str, threading.Semaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, host: str) -> threading.Semaphore:
+        with self._slots_lock:
+            sem = self._host_slots.get(host)
+            if sem is None:
+                sem = threading.Semaphore(self.per_host)
+                self._host_slots[host] = sem
+            return sem
+
+    def run(
+        self,
+        items: Iterable[Any],
+        fn: Callable[[Any], Any],
+        *,
+        host_key: Callable[[Any], str] = lambda _: "",
+    ) -> list[Any]:
+        items = list(items)
+        if not items:
+            return []
+
+        def _job(item):
+            with self._slot(host_key(item) or ""):
+                try:
+                    return fn(item)
+                except Exception as e:
+                    logger.error(f"批处理任务异常: {e}", exc_info=True)
+                    return None
+
+        with _redirect_output():
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(items)), thread_name_prefix="cep-batch") as pool:
+                return list(pool.map(_job, items))
+
+
+@contextlib.contextmanager
+def _redirect_output():
+    """批处理期间安装按行加前缀的 stdout 与日志过滤器，结束后还原"""
+    old_stdout = sys.stdout
+    stream = old_stdout if isinstance(old_stdout, PrefixedStream) else PrefixedStream(old_stdout)
+    sys.stdout = stream
+    log_filter = PrefixLogFilter()
+    handlers = list(logging.getLogger().handlers)
+    for h in handlers:
+        h.addFilter(log_filter)
+    try:
+        yield
+    finally:
+        for h in handlers:
+            h.removeFilter(log_filter)
+        sys.stdout = old_stdout
@@ -0,0 +1,390 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import runtime_cache
+from .benchmarks.asset_tree import generate_asset_tree
+from .config_store import load_accounts_from_txt
+from .fake_server import FakeDataset, FakeServer, issue_token
+from .flows import prepare_accounts_for_selection, run_accounts_concurrently
+from .logging_setup import setup_logging
+from .policy import config, get_diversity_every
+from .services.content_gen import AIContentGenerator
+from .run_records import close_run_records
+from .summary_log import flush_summaries
+from .utils import image_cache as _image_cache
+from .utils.http_client import close_shared_adapters
+from .utils.http_metrics import metrics
+from .utils.tracing import start_tracing, stop_tracing
+
+BENCH_VERSION = 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """最近秩百分位 (输入需已排序)"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def phase_stats(trace_path: str) -> dict:
+    """从 trace 文件按事件名聚合耗时 (毫秒)：count / total / p50 / p95 / p99 / max"""
+    with open(trace_path, "r", encoding="utf-8") as f:
+        events = json.load(f).get("traceEvents") or []
+    durations: dict[str, list[float]] = {}
+    for e in events:
+        if e.get("ph") == "X":
+            durations.setdefault(e.get("name") or "?", []).append(float(e.get("dur") or 0.0) / 1000.0)
+    out = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        out[name] = {
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return out
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def io_write_bytes() -> int | None:
+    """进程累计写盘字节数 (仅 Linux 的 /proc/self/io 可用)"""
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    return int(line.split(":", 1)[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def tree_size(root: str, exclude: tuple[str, ...] = ()) -> int:
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) not in exclude]
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=config.base_dir,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except Exception:
+        return ""
+
+
+@contextlib.contextmanager
+def _patched_env(values: dict):
+    saved = {k: os.environ.get(k) for k in values}
+    os.environ.update({k: str(v) for k, v in values.items()})
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+@contextlib.contextmanager
+def _isolated_state(state: dict, state_path: str):
+    saved = (config.state, config.state_path)
+    config.state, config.state_path = state, state_path
+    try:
+        yield
+    finally:
+        config.state, config.state_path = saved
+
+
+def run_benchmark(
+    *,
+    accounts: int = 20,
+    schools: int = 2,
+    grades: int = 3,
+    classes: int = 4,
+    dimensions: int = 5,
+    tasks_per_dimension: int = 4,
+    images_per_dir: int = 2,
+    image_size: tuple[int, int] = (1280, 960),
+    workers: int = 4,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    workdir: str | None = None,
+    verbose: bool = False,
+) -> dict:
+    """
+    端到端压测：生成合成账号 / state / 资源树，启动本地替身服务器，
+    以非交互方式驱动真实的预登录与批量提交流程，返回吞吐与各阶段耗时统计。
+    """
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="cep_bench_")
+    assets_dir = os.path.join(workdir, "assets")
+    dataset = FakeDataset(
+        schools=schools,
+        grades=grades,
+        classes=classes,
+        dimensions=dimensions,
+        tasks_per_dimension=tasks_per_dimension,
+    )
+    usernames = [str(20250000 + i) for i in range(max(1, int(accounts)))]
+    accounts_file = os.path.join(workdir, "accounts.txt")
+    os.makedirs(workdir, exist_ok=True)
+    with open(accounts_file, "w", encoding="utf-8") as f:
+        f.writelines(f"{u} bench{u}\n" for u in usernames)
+
+    meeting_names = sorted({t["name"] for tasks in dataset.tasks_by_dim.values() for t in tasks if "班会" in t["name"]})
+    setup_start = time.perf_counter()
+    tree = generate_asset_tree(
+        assets_dir,
+        user_infos=[dataset.identity(u) for u in usernames],
+        titles=meeting_names,
+        images_per_dir=images_per_dir,
+        image_sizes=[image_size],
+        record_types=("txt",),
+        seed=seed,
+    )
+    setup_seconds = time.perf_counter() - setup_start
+
+    server = FakeServer(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, seed=seed, dataset=dataset)
+    urls = server.urls()
+    env = {
+        "CEP_ASSETS_DIR": assets_dir,
+        "CEP_RUNTIME_CACHE_DIR": os.path.join(workdir, "runtime", "cache"),
+        "CEP_IMAGE_CACHE_DIR": os.path.join(workdir, "runtime", "image_cache"),
+        "CEP_CACHE_FILE": os.path.join(workdir, "content_cache.json"),
+        "CEP_SUMMARY_LOG_DIR": os.path.join(workdir, "runtime", "summary_logs"),
+        "CEP_RECORDS_DIR": os.path.join(workdir, "runtime", "records"),
+        "CEP_LOG_FILE": os.path.join(workdir, "logs", "bench.log"),
+        "CEP_LOG_CONSOLE": "true" if verbose else "false",
+        "CEP_AI_BASE_URL": urls["ai_base_url"],
+        "SILICONFLOW_API_KEY": "bench",
+    }
+    state = {
+        "base_url": urls["base_url"],
+        "upload_url": urls["upload_url"],
+        "accounts": {u: {"token": issue_token(u)} for u in usernames},
+    }
+    sink = None if verbose else open(os.devnull, "w", encoding="utf-8")
+    trace_path = os.path.join(workdir, "trace.json")
+    try:
+        with server, _patched_env(env), _isolated_state(state, os.path.join(workdir, "state.json")):
+            runtime_cache.reset_runtime_caches()
+            _image_cache._default_cache = None
+            metrics.reset()
+            setup_logging()
+            io_before = io_write_bytes()
+            start_tracing(trace_path)
+            run_start = time.perf_counter()
+            with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+                prepared = prepare_accounts_for_selection(load_accounts_from_txt(accounts_file), config, urls["sso_base"])
+                prelogin_seconds = time.perf_counter() - run_start
+                ready = [a for a in prepared if a.get("status") == "已就绪"]
+                preset = {
+                    "mode": "y",
+                    "indices": [],
+                    "selection": "y",
+                    "scope": "pending",
+                    "skip_review": True,
+                    "confirmed_resubmit": False,
+                    "diversity_every": get_diversity_every(),
+                    "submit_index": 0,
+                }
+                ai_gen = AIContentGenerator(model="bench-model")
+                ok_accounts = run_accounts_concurrently(ready, ai_gen, preset, workers=workers)["ok"]
+                flush_summaries()
+                close_run_records()
+            elapsed = time.perf_counter() - run_start
+            stop_tracing()
+            io_after = io_write_bytes()
+            http = metrics.snapshot()["endpoints"]
+            server_requests = sum(server.request_counts.values())
+    finally:
+        if sink:
+            sink.close()
+        stop_tracing()
+        close_shared_adapters()
+        runtime_cache.reset_runtime_caches()
+        _image_cache._default_cache = None
+        setup_logging()
+
+    submissions = dataset.submissions
+    result = {
+        "version": BENCH_VERSION,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "revision": _git_revision(),
+        "params": {
+            "accounts": len(usernames),
+            "schools": schools,
+            "grades": grades,
+            "classes": classes,
+            "dimensions": dimensions,
+            "tasks_per_dimension": tasks_per_dimension,
+            "images_per_dir": images_per_dir,
+            "image_size": list(image_size),
+            "workers": workers,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "error_rate": error_rate,
+            "seed": seed,
+        },
+        "results": {
+            "elapsed_seconds": round(elapsed, 3),
+            "prelogin_seconds": round(prelogin_seconds, 3),
+            "setup_seconds": round(setup_seconds, 3),
+            "ready_accounts": len(ready),
+            "ok_accounts": ok_accounts,
+            "tasks_submitted": submissions,
+            "accounts_per_min": round(ok_accounts / elapsed * 60, 3) if elapsed > 0 else 0.0,
+            "tasks_per_sec": round(submissions / elapsed, 3) if elapsed > 0 else 0.0,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "bytes_written": tree_size(workdir, exclude=(assets_dir,)),
+            "io_write_bytes": (io_after - io_before) if io_before is not None and io_after is not None else None,
+            "asset_files": tree["files"],
+            "http_requests": sum(ep["count"] for ep in http),
+            "http_errors": sum(ep["errors"] for ep in http),
+            "server_requests": server_requests,
+        },
+        "phases": phase_stats(trace_path) if os.path.exists(trace_path) else {},
+    }
+    if own_workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def save_result(result: dict, path: str | None = None) -> str:
+    if not path:
+        path = os.path.join(config.base_dir, "runtime", "bench", f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare_results(current: dict, baseline: dict) -> list[str]:
+    """与历史结果对比主要指标，返回可打印的行"""
+    lines = []
+
+    def _line(label: str, new, old, higher_is_better: bool):
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or not old:
+            return
+        change = (new - old) / old * 100
+        better = change >= 0 if higher_is_better else change <= 0
+        lines.append(f"  {label:<40} {old:>12.3f} -> {new:>12.3f}  ({change:+.1f}% {'✅' if better else '⚠️'})")
+
+    cur, base = current.get("results", {}), baseline.get("results", {})
+    _line("accounts_per_min", cur.get("accounts_per_min"), base.get("accounts_per_min"), True)
+    _line("tasks_per_sec", cur.get("tasks_per_sec"), base.get("tasks_per_sec"), True)
+    _line("peak_rss_bytes", cur.get("peak_rss_bytes"), base.get("peak_rss_bytes"), False)
+    for name, stats in sorted((current.get("phases") or {}).items()):
+        old = (baseline.get("phases") or {}).get(name)
+        if old:
+            _line(f"{name} p95_ms", stats.get("p95_ms"), old.get("p95_ms"), False)
+    return lines
+
+
+def print_result(result: dict):
+    r = result["results"]
+    print("=" * 80)
+    print(f"  账号: {r['ok_accounts']}/{result['params']['accounts']}  任务: {r['tasks_submitted']}  耗时: {r['elapsed_seconds']}s")
+    print(f"  吞吐: {r['accounts_per_min']} 账号/分钟, {r['tasks_per_sec']} 任务/秒")
+    rss = r.get("peak_rss_bytes")
+    print(f"  峰值 RSS: {rss / 1024 / 1024:.1f} MB" if rss else "  峰值 RSS: 不可用")
+    print(f"  写入: {r['bytes_written']} 字节 (工作目录), HTTP 请求 {r['http_requests']} 次, 错误 {r['http_errors']} 次")
+    print("-" * 80)
+    print(f"  {'阶段':<40} {'次数':>6} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10}")
+    for name, s in result.get("phases", {}).items():
+        print(f"  {name:<40} {s['count']:>6} {s['p50_ms']:>10.1f} {s['p95_ms']:>10.1f} {s['p99_ms']:>10.1f}")
+    print("=" * 80)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="端到端吞吐压测：合成账号 + 本地替身服务器 + 真实提交流程")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--schools", type=int, default=2)
+    parser.add_argument("--grades", type=int, default=3)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, default=5)
+    parser.add_argument("--tasks-per-dimension", type=int, default=4)
+    parser.add_argument("--images-per-dir", type=int, default=2)
+    parser.add_argument("--image-size", default="1280x960", help="合成图片尺寸，如 1280x960")
+    parser.add_argument("--workers", type=int, default=4, help="并发处理的账号数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="替身服务器的模拟延迟 (毫秒)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="保留合成数据的工作目录 (默认使用临时目录并在结束后删除)")
+    parser.add_argument("--output", default=None, help="结果 JSON 路径 (默认 runtime/bench/bench-<时间>.json)")
+    parser.add_argument("--compare", default=None, help="与之前的结果 JSON 对比")
+    parser.add_argument("--verbose", action="store_true", help="显示流程输出与日志")
+    args = parser.parse_args(argv)
+
+    try:
+        width, height = (int(x) for x in args.image_size.lower().split("x", 1))
+    except ValueError:
+        parser.error("--image-size 格式应为 宽x高，如 1280x960")
+
+    result = run_benchmark(
+        accounts=args.accounts,
+        schools=args.schools,
+        grades=args.grades,
+        classes=args.classes,
+        dimensions=args.dimensions,
+        tasks_per_dimension=args.tasks_per_dimension,
+        images_per_dir=args.images_per_dir,
+        image_size=(width, height),
+        workers=args.workers,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        workdir=config.resolve_path(args.workdir) if args.workdir else None,
+        verbose=args.verbose,
+    )
+    print_result(result)
+    path = save_result(result, config.resolve_path(args.output) if args.output else None)
+    print(f"[*] 压测结果已写入: {path}")
+    if args.compare:
+        with open(config.resolve_path(args.compare), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"[*] 对比基线 ({baseline.get('revision') or '未知版本'}, {baseline.get('created_at', '')}):")
+        for line in compare_results(result, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
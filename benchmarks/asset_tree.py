@@ -0,0 +1,229 @@
+import io
+import os
+import random
+import shutil
+
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+
+GRADE_NAMES = ["高一", "高二", "高三"]
+CLASS_NUMERALS = ["一", "二", "三", "四", "五", "六", "七", "八", "九", "十", "十一", "十二", "十三", "十四", "十五", "十六"]
+MEETING_TOPICS = [
+    "安全教育", "感恩教育", "心理健康", "诚信考试", "垃圾分类", "防溺水", "网络安全", "文明礼仪",
+    "理想信念", "青春励志", "禁毒宣传", "消防演练", "法治教育", "爱国主义", "劳动最光荣", "珍爱生命",
+]
+LABOR_TOPICS = ["校园清洁", "家务劳动", "植树活动", "食堂帮厨", "社区服务", "图书整理"]
+RECORD_TYPES = ("xlsx", "docx", "txt", "pdf")
+
+# 班会资源包的常见命名风格 (日期格式、书名号、附加说明各不相同)
+PACKAGE_NAME_STYLES = [
+    "{y}-{m:02d}-{d:02d} 《{title}》主题班会",
+    "{y}{m:02d}{d:02d}_《{title}》班会资源包",
+    "{m}月{d}日 {title}主题班会（{grade}{clazz}）",
+    "【{y}.{m}.{d}】“{title}”主题班会",
+    "{title}主题班会 {y}年{m}月",
+]
+
+_MINIMAL_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 200 200]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+
+def school_name(i: int) -> str:
+    return f"福清第{CLASS_NUMERALS[i % len(CLASS_NUMERALS)]}中学" if i < len(CLASS_NUMERALS) else f"合成第{i + 1}中学"
+
+
+def user_info_for(school: str, grade: str, clazz: str) -> dict:
+    """构造能映射到对应资源目录的 user_info (供 ProTaskManager 使用)"""
+    return {"realName": "合成学生", "studentSchoolInfo": {"schoolName": school, "gradeName": grade, "className": clazz}}
+
+
+def synthetic_user_infos(schools: int = 1, grades: int = 1, classes: int = 1) -> list[dict]:
+    infos = []
+    for s in range(max(1, schools)):
+        for g in range(max(1, grades)):
+            grade = GRADE_NAMES[g] if g < len(GRADE_NAMES) else f"{g + 1}年级"
+            for c in range(max(1, classes)):
+                clazz = f"{CLASS_NUMERALS[c]}班" if c < len(CLASS_NUMERALS) else f"{c + 1}班"
+                infos.append(user_info_for(school_name(s), grade, clazz))
+    return infos
+
+
+def meeting_titles(count: int, seed: int = 0) -> list[str]:
+    """生成不重复的班会标题 (主题 + 序号)"""
+    rng = random.Random(seed)
+    topics = list(MEETING_TOPICS)
+    rng.shuffle(topics)
+    return [topics[i % len(topics)] + ("" if i < len(topics) else str(i // len(topics) + 1)) for i in range(count)]
+
+
+def package_name(title: str, index: int, grade: str = "", clazz: str = "", rng: random.Random | None = None) -> str:
+    rng = rng or random.Random(index)
+    style = PACKAGE_NAME_STYLES[index % len(PACKAGE_NAME_STYLES)]
+    return style.format(y=rng.choice([2024, 2025]), m=rng.randrange(1, 13), d=rng.randrange(1, 29), title=title, grade=grade, clazz=clazz)
+
+
+def _render_images(sizes: list[tuple[int, int]], count: int, seed: int) -> list[tuple[str, bytes]]:
+    from PIL import Image
+
+    rng = random.Random(seed)
+    blobs = []
+    for i in range(max(0, count)):
+        size = sizes[i % len(sizes)]
+        noise = Image.effect_noise(size, rng.uniform(20, 80)).convert("RGB")
+        img = Image.blend(noise, Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3))), 0.5)
+        buf = io.BytesIO()
+        if i % 4 == 3:
+            img.save(buf, "PNG")
+            blobs.append(("png", buf.getvalue()))
+        else:
+            img.save(buf, "JPEG", quality=90)
+            blobs.append(("jpg", buf.getvalue()))
+    return blobs
+
+
+def _render_record(kind: str) -> bytes:
+    lines = ["班会主题：{title}", "时间：第 8 周周一", "地点：本班教室", "主持人：班长", "内容：围绕主题开展讨论，同学们踊跃发言，收获颇丰。"]
+    if kind == "xlsx":
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        for line in lines:
+            wb.active.append(line.split("：", 1))
+        buf = io.BytesIO()
+        wb.save(buf)
+        return buf.getvalue()
+    if kind == "docx":
+        try:
+            from docx import Document
+        except ImportError:
+            return b""
+        doc = Document()
+        for line in lines:
+            doc.add_paragraph(line)
+        buf = io.BytesIO()
+        doc.save(buf)
+        return buf.getvalue()
+    if kind == "pdf":
+        return _MINIMAL_PDF
+    return "\n".join(lines).encode("utf-8")
+
+
+class _Writer:
+    """写文件并统计数量与字节数；link=True 时相同内容优先用硬链接共享磁盘空间"""
+
+    def __init__(self, link: bool):
+        self.link = link
+        self.files = 0
+        self.bytes = 0
+        self._sources: dict[int, str] = {}
+
+    def write(self, path: str, data: bytes, *, shareable: bool = True):
+        key = id(data)
+        src = self._sources.get(key) if (self.link and shareable) else None
+        if src:
+            try:
+                os.link(src, path)
+            except OSError:
+                src = None
+        if not src:
+            with open(path, "wb") as f:
+                f.write(data)
+            if shareable:
+                self._sources.setdefault(key, path)
+        self.files += 1
+        self.bytes += len(data)
+
+
+def generate_asset_tree(
+    root: str,
+    *,
+    schools: int = 1,
+    grades: int = 1,
+    classes: int = 1,
+    user_infos: list[dict] | None = None,
+    packages_per_class: int = 3,
+    titles: list[str] | None = None,
+    labor_folders_per_class: int = 0,
+    images_per_dir: int = 2,
+    image_sizes: list[tuple[int, int]] | None = None,
+    record_types: tuple[str, ...] = ("xlsx",),
+    link: bool = True,
+    seed: int = 0,
+    clean: bool = False,
+) -> dict:
+    """
+    生成合成的 assets 资源树 (学校 × 年级 × 班级 × 班会资源包)，用于测试与扩展性压测。
+
+    目录结构与真实资源一致：
+      国旗下讲话/<学校>/默认/
+      劳动|军训/<学校>/<年级>/<班级>/[<专项子文件夹>/]
+      主题班会/<学校>/<年级>/<班级>/<带日期与《》标题的资源包>/ (图片 + 记录文件)
+
+    user_infos 指定时按给定身份生成 (目录名按 ProTaskManager 的清洗规则计算)，
+    否则按 schools × grades × classes 合成。titles 指定班会标题，默认自动生成 packages_per_class 个。
+    record_types 按资源包轮换使用 (xlsx / docx / txt / pdf)。
+    返回统计信息：班级目录列表、资源包数、文件数与逻辑字节数。
+    """
+    if clean and os.path.isdir(root):
+        shutil.rmtree(root)
+    rng = random.Random(seed)
+    infos = user_infos if user_infos is not None else synthetic_user_infos(schools, grades, classes)
+    titles = list(titles) if titles is not None else meeting_titles(packages_per_class, seed)
+    images = _render_images(image_sizes or [(64, 48)], images_per_dir, seed)
+    records = {kind: _render_record(kind) for kind in record_types if kind in RECORD_TYPES}
+    writer = _Writer(link)
+
+    def _fill_images(target: str, prefix: str):
+        os.makedirs(target, exist_ok=True)
+        for i, (ext, data) in enumerate(images):
+            writer.write(os.path.join(target, f"{prefix}_{i + 1}.{ext}"), data)
+
+    class_dirs = []
+    seen_classes, seen_schools = set(), set()
+    packages = 0
+    for info in infos:
+        mgr = ProTaskManager("", user_info=info, base_url="http://synthetic.invalid")
+        school = mgr._sanitize_path_component(mgr._school_name())
+        grade = mgr._sanitize_path_component(mgr._grade_name())
+        clazz = mgr._sanitize_path_component(mgr._pure_class_name())
+        if (school, grade, clazz) in seen_classes:
+            continue
+        seen_classes.add((school, grade, clazz))
+        class_dirs.append((school, grade, clazz))
+        if school not in seen_schools:
+            seen_schools.add(school)
+            _fill_images(os.path.join(root, "国旗下讲话", school, "默认"), "国旗")
+
+        for sub in ("劳动", "军训"):
+            class_root = os.path.join(root, sub, school, grade, clazz)
+            _fill_images(class_root, sub)
+            if sub == "劳动":
+                for i in range(labor_folders_per_class):
+                    topic = LABOR_TOPICS[i % len(LABOR_TOPICS)] + ("" if i < len(LABOR_TOPICS) else str(i))
+                    _fill_images(os.path.join(class_root, f"{rng.randrange(1, 13)}月 {topic}"), topic)
+
+        meeting_root = os.path.join(root, "主题班会", school, grade, clazz)
+        record_kinds = list(records) or ["txt"]
+        for i, title in enumerate(titles):
+            package = os.path.join(meeting_root, package_name(title, i, grade, clazz, rng))
+            _fill_images(package, "班会")
+            kind = record_kinds[i % len(record_kinds)]
+            if kind == "txt":
+                writer.write(os.path.join(package, "班会记录.txt"), _render_record("txt").replace(b"{title}", title.encode("utf-8")), shareable=False)
+            elif records.get(kind):
+                writer.write(os.path.join(package, f"班会记录.{kind}"), records[kind])
+            packages += 1
+
+    return {
+        "root": root,
+        "classes": class_dirs,
+        "user_infos": list(infos),
+        "titles": titles,
+        "packages": packages,
+        "files": writer.files,
+        "bytes": writer.bytes,
+    }
+
@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from comprehensive_eval_pro.flows import parse_account_selection
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.summary_log import append_summary, flush_summaries
+from comprehensive_eval_pro.utils.excel_parser import ExcelParser
+from comprehensive_eval_pro.utils.image_convert import compress_image
+from comprehensive_eval_pro.utils.record_parser import extract_first_record_text
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+TOPICS = ["安全教育", "感恩教育", "心理健康", "诚信考试", "垃圾分类", "防溺水", "网络安全", "文明礼仪", "理想信念", "青春励志"]
+TASK_TEMPLATES = [
+    "高一年段{topic}主题班会",
+    "《{topic}》主题班会活动记录",
+    "校园劳动实践：{topic}",
+    "新生军训汇报{n}",
+    "国旗下讲话：{topic}",
+    "{topic}志愿服务时长打卡",
+    "家务劳动 ({topic})",
+    "综合素质自我评价 {n}",
+]
+
+
+def _task_names(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(TASK_TEMPLATES).format(topic=rng.choice(TOPICS), n=rng.randrange(1, 100)) for _ in range(count)]
+
+
+class Case:
+    """一个基准场景：setup() 准备输入并返回 (被测函数, 每次调用包含的操作数)"""
+
+    def __init__(self, name: str, setup, ops_per_call: int = 1):
+        self.name = name
+        self.setup = setup
+        self.ops_per_call = ops_per_call
+
+
+def _case_match_folder(n: int):
+    def setup(workdir: str):
+        root = os.path.join(workdir, f"folders_{n}")
+        os.makedirs(root, exist_ok=True)
+        rng = random.Random(n)
+        for i in range(n):
+            topic = TOPICS[i % len(TOPICS)]
+            name = f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 《{topic}{i}》主题班会资源包"
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+        mgr = ProTaskManager("", base_url="http://bench.invalid")
+        task_name = f"《{TOPICS[3]}{n // 2}》主题班会"
+        return lambda: mgr._find_best_matching_folder(task_name, root)
+
+    return Case(f"find_best_matching_folder[{n}]", setup)
+
+
+def _case_classify(count: int):
+    def setup(workdir: str):
+        names = _task_names(count)
+
+        def run():
+            for name in names:
+                ProTaskManager._looks_like_class_meeting(name)
+                ProTaskManager._is_labor_task(name)
+
+        return run
+
+    return Case(f"classify_task_names[{count}]", setup, ops_per_call=count)
+
+
+def _case_text(fn_name: str, count: int):
+    def setup(workdir: str):
+        names = [f"  {n}（第{i % 7 + 1}期）　" for i, n in enumerate(_task_names(count, seed=1))]
+        fn = getattr(ProTaskManager, fn_name)
+
+        def run():
+            for name in names:
+                fn(name)
+
+        return run
+
+    return Case(f"{fn_name.lstrip('_')}[{count}]", setup, ops_per_call=count)
+
+
+def _case_compress(fmt: str, size: tuple[int, int]):
+    def setup(workdir: str):
+        from PIL import Image
+
+        path = os.path.join(workdir, f"phone.{fmt.lower()}")
+        noise = Image.effect_noise(size, 40).convert("RGB")
+        Image.blend(noise, Image.new("RGB", size, (120, 160, 90)), 0.5).save(path, fmt)
+
+        def run():
+            out, cleanup = compress_image(path, profile="upload")
+            if cleanup and out and os.path.exists(out):
+                os.remove(out)
+
+        return run
+
+    return Case(f"compress_image[{fmt.lower()} {size[0]}x{size[1]}]", setup)
+
+
+def _write_record_xlsx(path: str, rows: int = 40):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["时间", "地点", "主持人", "内容"])
+    for i in range(rows):
+        ws.append([f"2025-03-{i % 28 + 1:02d}", "高一(8)班教室", "班长", f"第{i + 1}项：围绕{TOPICS[i % len(TOPICS)]}开展讨论，同学们积极发言。"])
+    wb.save(path)
+
+
+def _case_xls():
+    def setup(workdir: str):
+        path = os.path.join(workdir, "班会记录.xlsx")
+        _write_record_xlsx(path)
+        return lambda: ExcelParser.extract_text_from_xls(path)
+
+    return Case("extract_text_from_xls[xlsx 40 rows]", setup)
+
+
+def _case_record():
+    def setup(workdir: str):
+        folder = os.path.join(workdir, "2025-03-01 《安全教育》主题班会")
+        os.makedirs(folder, exist_ok=True)
+        _write_record_xlsx(os.path.join(folder, "记录.xlsx"))
+        with open(os.path.join(folder, "备注.txt"), "w", encoding="utf-8") as f:
+            f.write("班会备注\n")
+        for i in range(6):
+            with open(os.path.join(folder, f"IMG_{i}.jpg"), "wb") as f:
+                f.write(b"\xff\xd8\xff\xd9")
+        return lambda: extract_first_record_text(folder)
+
+    return Case("extract_first_record_text[xlsx+txt+6 images]", setup)
+
+
+def _case_selection(total: int):
+    def setup(workdir: str):
+        inputs = ["1-10,15 20", "+200 +300 -5", "a", "i", "1-%d" % total, "3 5 7 9 11 13 15 17 19", "n", "-1 -2 -3"]
+        current = set(range(0, total, 3))
+
+        def run():
+            for raw in inputs:
+                parse_account_selection(raw, total, current)
+
+        return run
+
+    return Case(f"parse_account_selection[{total}]", setup, ops_per_call=8)
+
+
+def _case_summary():
+    def setup(workdir: str):
+        log_dir = os.path.join(workdir, "summary_logs")
+        user_info = {"realName": "张三", "studentSchoolInfo": {"schoolName": "测试中学", "gradeName": "高一", "className": "8班"}}
+        counter = iter(range(10**9))
+
+        def run():
+            # 写入一批后同步落盘，计入后台写线程的开销
+            for _ in range(8):
+                append_summary(
+                    username="20250001",
+                    user_info=user_info,
+                    task_name=f"主题班会{next(counter)}",
+                    ok=True,
+                    msg="提交成功",
+                    log_dir=log_dir,
+                )
+            flush_summaries()
+
+        return run
+
+    return Case("append_summary", setup, ops_per_call=8)
+
+
+def build_cases(quick: bool = False) -> list[Case]:
+    phone = (1600, 1200) if quick else (4032, 3024)
+    return [
+        _case_match_folder(100),
+        _case_match_folder(1000),
+        _case_classify(10000),
+        _case_text("_normalize_match_text", 10000),
+        _case_text("_extract_quoted_title", 10000),
+        _case_compress("JPEG", phone),
+        _case_compress("PNG", phone),
+        _case_compress("WEBP", phone),
+        _case_xls(),
+        _case_record(),
+        _case_selection(1000),
+        _case_summary(),
+    ]
+
+
+def measure(fn, ops_per_call: int = 1, *, min_time: float = 0.2, repeat: int = 3) -> dict:
+    """
+    取 repeat 轮中最快一轮的 ops/sec；再单独跑一次统计 tracemalloc 峰值分配。
+    每轮至少运行 min_time 秒 (至少一次调用)。
+    """
+    fn()  # 预热 (导入、缓存等一次性开销)
+    best = None
+    calls_total = 0
+    for _ in range(max(1, repeat)):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        calls_total += calls
+        rate = calls * ops_per_call / elapsed
+        best = rate if best is None else max(best, rate)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ops_per_sec": round(best, 3),
+        "calls": calls_total,
+        "alloc_peak_bytes_per_op": int(max(0, peak - before) / max(1, ops_per_call)),
+        "alloc_retained_bytes_per_call": int(max(0, after - before)),
+    }
+
+
+def run_cases(cases: list[Case], *, name_filter: str = "", min_time: float = 0.2, repeat: int = 3, verbose: bool = True) -> dict:
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="cep_micro_")
+    try:
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            fn = case.setup(workdir)
+            results[case.name] = measure(fn, case.ops_per_call, min_time=min_time, repeat=repeat)
+            if verbose:
+                r = results[case.name]
+                print(f"  {case.name:<48} {r['ops_per_sec']:>14,.1f} ops/s  {r['alloc_peak_bytes_per_op']:>10,d} B/op")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    与基线对比：ops/sec 低于基线 (1 - threshold) 倍或峰值分配高于基线 (1 + threshold) 倍记为回退。
+    返回回退描述列表；基线中没有的场景忽略。
+    """
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not isinstance(base, dict):
+            continue
+        base_ops = float(base.get("ops_per_sec") or 0)
+        if base_ops and r["ops_per_sec"] < base_ops * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {base_ops:,.1f} -> {r['ops_per_sec']:,.1f} ({(r['ops_per_sec'] / base_ops - 1) * 100:+.1f}%)")
+        base_alloc = float(base.get("alloc_peak_bytes_per_op") or 0)
+        # 极小的分配量受解释器噪声影响大，低于 1KB 的不参与比较
+        if base_alloc >= 1024 and r["alloc_peak_bytes_per_op"] > base_alloc * (1 + threshold):
+            regressions.append(
+                f"{name}: 峰值分配 {int(base_alloc):,d} -> {r['alloc_peak_bytes_per_op']:,d} B/op ({(r['alloc_peak_bytes_per_op'] / base_alloc - 1) * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("results") if isinstance(data.get("results"), dict) else {}
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH, *, quick: bool = False):
+    data = {
+        "version": 1,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="热点纯 Python 函数的微基准 (ops/sec + 分配量)，并与基线对比")
+    parser.add_argument("--filter", default="", help="只运行名称包含该子串的场景")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="回退判定阈值 (默认 0.25 即 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--quick", action="store_true", help="缩小图片尺寸与计时时长，用于快速冒烟")
+    parser.add_argument("--min-time", type=float, default=None, help="每轮最短计时 (秒)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="另存本次结果 JSON")
+    args = parser.parse_args(argv)
+
+    min_time = args.min_time if args.min_time is not None else (0.05 if args.quick else 0.2)
+    print(f"[*] 运行微基准 (min_time={min_time}s, repeat={args.repeat})")
+    results = run_cases(build_cases(quick=args.quick), name_filter=args.filter, min_time=min_time, repeat=args.repeat)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        merged = {**load_baseline(args.baseline), **results} if args.filter else results
+        save_baseline(merged, args.baseline, quick=args.quick)
+        print(f"[*] 基线已更新: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("[!] 未找到基线文件，使用 --update-baseline 生成。")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"[⚠️] 发现 {len(regressions)} 项超过 {args.threshold:.0%} 的回退：")
+        for line in regressions:
+            print(f"    - {line}")
+        return 1
+    print(f"[✅] 与基线相比无超过 {args.threshold:.0%} 的回退。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,118 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from comprehensive_eval_pro.benchmarks.asset_tree import generate_asset_tree
+from comprehensive_eval_pro.flows import generate_resource_health_report
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.utils.resource_health import health_cache
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+def _timed(fn, repeat: int) -> float:
+    """返回 repeat 次调用中最快一次的耗时 (毫秒)"""
+    best = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_tree(folders: int, workdir: str, *, classes: int = 1, images_per_dir: int = 1, repeat: int = 3) -> dict:
+    """
+    生成约 folders 个班会资源包 (平均分布到 classes 个班级)，测量各文件系统热点路径的耗时。
+    """
+    classes = max(1, min(classes, folders))
+    root = os.path.join(workdir, f"assets_{folders}")
+    start = time.perf_counter()
+    tree = generate_asset_tree(
+        root,
+        classes=classes,
+        packages_per_class=max(1, folders // classes),
+        labor_folders_per_class=min(50, max(1, folders // (classes * 10))),
+        images_per_dir=images_per_dir,
+        record_types=("txt", "xlsx"),
+    )
+    build_ms = (time.perf_counter() - start) * 1000
+
+    info = tree["user_infos"][0]
+    mgr = ProTaskManager("", user_info=info, base_url="http://synthetic.invalid")
+    school, grade, clazz = tree["classes"][0]
+    meeting_root = os.path.join(root, "主题班会", school, grade, clazz)
+    target_title = tree["titles"][len(tree["titles"]) // 2]
+    prepared = [
+        {"username": f"u{i}", "status": "已就绪", "task_mgr": ProTaskManager("", user_info=ui, base_url="http://synthetic.invalid")}
+        for i, ui in enumerate(tree["user_infos"])
+    ]
+
+    def _report():
+        # 每次计时都清空体检缓存，测量真实的体检耗时而不是签名校验
+        health_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_resource_health_report(prepared)
+
+    env_before = os.environ.get("CEP_ASSETS_DIR")
+    os.environ["CEP_ASSETS_DIR"] = root
+    try:
+        timings = {
+            "audit_resources": _timed(lambda: mgr.audit_resources(base_assets_dir=root), repeat),
+            "check_resource_health": _timed(mgr.check_resource_health, repeat),
+            "pick_image_path": _timed(lambda: mgr._pick_image_path("劳动", task_name="校园清洁劳动"), repeat),
+            "find_best_matching_folder": _timed(lambda: mgr._find_best_matching_folder(f"《{target_title}》主题班会", meeting_root), repeat),
+            "generate_resource_health_report": _timed(_report, repeat),
+        }
+    finally:
+        if env_before is None:
+            os.environ.pop("CEP_ASSETS_DIR", None)
+        else:
+            os.environ["CEP_ASSETS_DIR"] = env_before
+    return {
+        "folders": tree["packages"],
+        "classes": len(tree["classes"]),
+        "files": tree["files"],
+        "build_ms": round(build_ms, 1),
+        "timings_ms": {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="资源树扩展性测试：文件夹数量从 10 到 10 万时扫描与匹配耗时的变化")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="逗号分隔的资源包数量，如 10,100,1000,100000")
+    parser.add_argument("--classes", type=int, default=1, help="资源包分布的班级数")
+    parser.add_argument("--images-per-dir", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", default=None, help="生成资源树的目录 (默认临时目录，结束后删除)")
+    parser.add_argument("--output", default=None, help="结果 JSON 路径")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cep_scaling_")
+    rows = []
+    try:
+        for n in sizes:
+            row = measure_tree(n, workdir, classes=args.classes, images_per_dir=args.images_per_dir, repeat=args.repeat)
+            rows.append(row)
+            t = row["timings_ms"]
+            print(
+                f"  {row['folders']:>7} 包 / {row['files']:>8} 文件  生成 {row['build_ms']:>9.0f}ms | "
+                + "  ".join(f"{k}={v:.1f}ms" for k, v in t.items())
+            )
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"sizes": rows}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,8 +1,10 @@
+import argparse
 import os
 import time
 
 
 from .policy import config
+from .report import add_report_arguments
 
 def mask_secret(value: str, prefix: int = 10, suffix: int = 6) -> str:
     if not value:
@@ -69,3 +71,18 @@ def display_user_profile(user_info, token):
     print(">>> 完成 <<<\n")
     time.sleep(0.5)
 
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="comprehensive_eval_pro", description="综合评价自动化系统")
+    parser.add_argument("--rescan", action="store_true", help="忽略本地任务快照，强制全量扫描所有账号的任务")
+    parser.add_argument("--trace", action="store_true", help="记录本次运行的阶段耗时追踪 (runtime/traces/，Chrome trace 格式)")
+    parser.add_argument("--workers", type=int, default=None, help="并发处理的账号数 (默认读取 batch_workers 配置)")
+    parser.add_argument("--resume", metavar="RUN_ID", default=None, help="从中断的运行继续 (runtime/journal/<RUN_ID>.jsonl)，跳过已完成的账号与任务")
+    commands = parser.add_subparsers(dest="command")
+    report = commands.add_parser("report", help="导入汇总日志与运行记录到 SQLite 并查询历史统计")
+    add_report_arguments(report)
+    return parser
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    return build_arg_parser().parse_args(argv if argv is not None else [])
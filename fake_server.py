@@ -0,0 +1,341 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# 1x1 灰色 PNG，充当验证码图片
+_CAPTCHA_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+)
+
+DIMENSION_NAMES = ["思想品德", "学业水平", "身心健康", "艺术素养", "社会实践"]
+TASK_TEMPLATES = ["劳动实践{n}", "军训{n}", "国旗下讲话{n}", "主题班会{n}", "志愿服务{n}"]
+
+
+def _b64url(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data, ensure_ascii=False).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def issue_token(username: str, ttl_seconds: int = 7 * 86400, now: float | None = None) -> str:
+    """签发本地假 JWT (不签名)：载荷中带 sub/exp/iat，供假服务器识别账号"""
+    now = time.time() if now is None else now
+    return ".".join([_b64url({"alg": "none"}), _b64url({"sub": username, "iat": int(now), "exp": int(now + ttl_seconds)}), "fake"])
+
+
+def _token_user(token: str) -> str:
+    try:
+        payload_b64 = (token or "").split(".")[1]
+        payload_b64 += "=" * (-len(payload_b64) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_b64.encode("ascii")).decode("utf-8"))
+        return str(payload.get("sub") or "") if float(payload.get("exp") or 0) > time.time() else ""
+    except Exception:
+        return ""
+
+
+class FakeDataset:
+    """
+    确定性的假数据：账号 -> 学校/年级/班级 由用户名哈希决定；
+    每个账号看到同一套维度与任务，提交状态按账号分别记录。
+    """
+
+    def __init__(self, schools: int = 3, grades: int = 3, classes: int = 4, dimensions: int = 5, tasks_per_dimension: int = 4):
+        self.schools = max(1, int(schools))
+        self.grades = max(1, int(grades))
+        self.classes = max(1, int(classes))
+        self.dimensions = []
+        self.tasks_by_dim: dict[str, list[dict]] = {}
+        task_id = 1000
+        for d in range(max(1, int(dimensions))):
+            d_id = str(d + 1)
+            self.dimensions.append({"id": d + 1, "name": DIMENSION_NAMES[d % len(DIMENSION_NAMES)] + ("" if d < len(DIMENSION_NAMES) else str(d + 1))})
+            tasks = []
+            for t in range(max(0, int(tasks_per_dimension))):
+                task_id += 1
+                name = TASK_TEMPLATES[(d + t) % len(TASK_TEMPLATES)].format(n=task_id)
+                tasks.append({"id": task_id, "name": name, "circleTypeId": 10 + d, "dimensionId": d + 1})
+            self.tasks_by_dim[d_id] = tasks
+        self._submitted: set[tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self.submissions = 0
+
+    def identity(self, username: str) -> dict:
+        h = int(hashlib.md5((username or "").encode("utf-8")).hexdigest(), 16)
+        school = h % self.schools + 1
+        grade = (h // self.schools) % self.grades + 1
+        clazz = (h // (self.schools * self.grades)) % self.classes + 1
+        grade_name = ["高一", "高二", "高三"][grade - 1] if grade <= 3 else f"{grade}年级"
+        return {
+            "realName": f"学生{username}",
+            "studentSchoolInfo": {
+                "schoolId": str(school),
+                "schoolName": f"测试学校{school}",
+                "gradeName": grade_name,
+                "className": f"{clazz}班",
+            },
+        }
+
+    def tasks_for(self, username: str, d_id: str) -> list[dict]:
+        out = []
+        with self._lock:
+            for t in self.tasks_by_dim.get(str(d_id), []):
+                done = (username, t["id"]) in self._submitted
+                out.append({**t, "circleTaskStatus": "已提交" if done else "待写实"})
+        return out
+
+    def submit(self, username: str, task_id) -> bool:
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            self._submitted.add((username, task_id))
+            self.submissions += 1
+        return True
+
+
+class FakeServer:
+    """
+    评价平台 / SSO / 图片上传 / OpenAI 兼容接口的本地替身，用于离线测试与压测。
+    latency_ms / jitter_ms 控制每个请求的模拟延迟，error_rate 控制随机 503 的比例。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+        dataset: FakeDataset | None = None,
+    ):
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.jitter_ms = max(0.0, float(jitter_ms))
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.dataset = dataset or FakeDataset()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._next_image_id = 5000
+        self.request_counts: dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> dict:
+        """可直接写入 state / settings 的各服务地址"""
+        return {
+            "base_url": self.url,
+            "sso_base": self.url,
+            "upload_url": f"{self.url}/common/upload/uploadImage?bussinessType=12&groupName=other",
+            "ai_base_url": f"{self.url}/v1",
+        }
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="cep-fake-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _count(self, path: str):
+        with self._counts_lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+    def _delay_and_fail(self) -> bool:
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._rng.random() < self.error_rate if self.error_rate else False
+        delay = max(0.0, self.latency_ms + jitter) / 1000.0
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def _image_id(self) -> int:
+        with self._rng_lock:
+            self._next_image_id += 1
+            return self._next_image_id
+
+    # --- 路由 ---
+
+    def handle(self, method: str, path: str, query: dict, headers, body: bytes):
+        """返回 (状态码, 响应体, Content-Type, 额外响应头)"""
+        ds = self.dataset
+        q = {k: v[0] for k, v in query.items()}
+        data = {}
+        if body and "json" in (headers.get("Content-Type") or ""):
+            try:
+                data = json.loads(body.decode("utf-8"))
+            except ValueError:
+                data = {}
+
+        if path in ("/", "/uiStudentLogin/login"):
+            return 200, b"<html><body>fake</body></html>", "text/html", {}
+        if path == "/kaptcha/kaptcha.jpg":
+            return 200, _CAPTCHA_PNG, "image/png", {}
+
+        # SSO
+        if path == "/uiStudentLogin/validateCaptcha":
+            return self._json({"code": 1, "msg": "验证码验证通过"})
+        if path == "/teacher/auth/studentLogin/getSchoolIdByStudentNumber":
+            info = ds.identity(q.get("userName", ""))["studentSchoolInfo"]
+            return self._json({"code": 1, "dataList": [{"schoolId": info["schoolId"], "NAME": info["schoolName"]}]})
+        if path == "/teacher/auth/studentLogin/validate":
+            username = str(data.get("username") or "")
+            if not username or not data.get("password"):
+                return self._json({"code": 0, "msg": "账号或密码错误"})
+            token = issue_token(username)
+            return self._json({"code": 1, "token": token, "returnData": {**ds.identity(username), "token": token}})
+
+        # 图片上传 (不需要 Token)
+        if path == "/common/upload/uploadImage":
+            if not body:
+                return self._json({"code": 0, "msg": "缺少文件"})
+            return self._json({"code": 1, "returnData": {"id": self._image_id()}})
+
+        # OpenAI 兼容接口
+        if path in ("/chat/completions", "/v1/chat/completions"):
+            prompt = ""
+            for m in data.get("messages") or []:
+                if isinstance(m, dict) and isinstance(m.get("content"), str):
+                    prompt = m["content"]
+            text = f"这是一段离线生成的写实文案。{prompt[:40]}"
+            return self._json({"choices": [{"message": {"role": "assistant", "content": text}}], "model": data.get("model")})
+
+        # 评价平台业务接口 (需要 Token)
+        if path.startswith("/api/"):
+            username = _token_user(headers.get("X-Auth-Token") or "")
+            if not username:
+                return self._json({"code": 0, "msg": "登录已失效"})
+            if path == "/api/studentInfo/getMenu":
+                return self._json({"code": 1, "data": {"menuList": []}})
+            if path == "/api/studentInfo/getMyInfo":
+                return self._json({"code": 1, "data": ds.identity(username)})
+            if path == "/api/studentCircleNew/getDimensions":
+                return self._json({"code": 1, "dataList": ds.dimensions})
+            if path == "/api/studentCircleNew/getCircleStatistics":
+                return self._json({"code": 1, "data": {"taskList": ds.tasks_for(username, q.get("dimensionId", ""))}})
+            if path == "/api/studentCircleNew/getCircleTask":
+                tasks = [t for d in ds.tasks_by_dim for t in ds.tasks_for(username, d)]
+                return self._json({"code": 1, "dataList": tasks})
+            if path == "/api/studentCircleNew/addCircle":
+                if not data.get("content"):
+                    return self._json({"code": 0, "msg": "内容不能为空"})
+                ok = ds.submit(username, data.get("circleTaskId"))
+                return self._json({"code": 1 if ok else 0, "msg": "提交成功" if ok else "任务不存在"})
+
+        return 404, json.dumps({"code": 0, "msg": "not found"}).encode("utf-8"), "application/json", {}
+
+    @staticmethod
+    def _json(obj: dict, status: int = 200):
+        return status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json;charset=UTF-8", {}
+
+
+def _make_handler(server: FakeServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 响应头与响应体分两次写出，关闭 Nagle 避免与客户端延迟 ACK 叠加出 40ms 级的假延迟
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self, method: str):
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            server._count(parts.path)
+            if server._delay_and_fail():
+                status, payload, ctype, extra = server._json({"code": 0, "msg": "fake server error"}, status=503)
+            else:
+                try:
+                    status, payload, ctype, extra = server.handle(method, parts.path, parse_qs(parts.query), self.headers, body)
+                except Exception as e:
+                    status, payload, ctype, extra = server._json({"code": 0, "msg": f"fake server exception: {e}"}, status=500)
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in extra.items():
+                self.send_header(k, v)
+            self.end_headers()
+            if method != "HEAD":
+                self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_HEAD(self):
+            self._dispatch("HEAD")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="评价平台 / SSO / 上传 / AI 接口的本地替身服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个请求的模拟延迟 (毫秒)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延迟抖动 (毫秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 503 的比例 (0-1)")
+    parser.add_argument("--schools", type=int, default=3)
+    parser.add_argument("--grades", type=int, default=3)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, default=5)
+    parser.add_argument("--tasks-per-dimension", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    dataset = FakeDataset(
+        schools=args.schools,
+        grades=args.grades,
+        classes=args.classes,
+        dimensions=args.dimensions,
+        tasks_per_dimension=args.tasks_per_dimension,
+    )
+    server = FakeServer(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        dataset=dataset,
+    )
+    print(f"[*] 假服务器已启动: {server.url}")
+    for k, v in server.urls().items():
+        print(f"    {k}: {v}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] 已停止。")
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
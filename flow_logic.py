@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import threading
+
+# 并发批处理时多个账号共享同一个 preset，计数需要加锁
+_gen_counts_lock = threading.Lock()
+
 
 def compute_base_entries(
     *,
@@ -68,11 +73,12 @@ def compute_target_entries(
 
 
 def get_or_init_gen_counts(preset: dict) -> dict:
-    gen_counts = preset.get("gen_counts")
-    if not isinstance(gen_counts, dict):
-        gen_counts = {}
-        preset["gen_counts"] = gen_counts
-    return gen_counts
+    with _gen_counts_lock:
+        gen_counts = preset.get("gen_counts")
+        if not isinstance(gen_counts, dict):
+            gen_counts = {}
+            preset["gen_counts"] = gen_counts
+        return gen_counts
 
 
 def should_use_cache_for_task(*, preset: dict, task_name: str, diversity_every: int, should_use_cache) -> bool:
@@ -83,5 +89,6 @@ def should_use_cache_for_task(*, preset: dict, task_name: str, diversity_every:
 
 def mark_task_generated(*, preset: dict, task_name: str):
     gen_counts = get_or_init_gen_counts(preset)
-    gen_counts[task_name] = int(gen_counts.get(task_name, 0) or 0) + 1
+    with _gen_counts_lock:
+        gen_counts[task_name] = int(gen_counts.get(task_name, 0) or 0) + 1
 
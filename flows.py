@@ -2,12 +2,15 @@ import datetime
 import logging
 import os
 import re
+import time
+from collections import Counter
 
 from .cli import (
     display_user_profile,
     get_task_status,
     is_pending_status,
     mask_secret,
+    parse_args,
     print_ai_key_notice,
     print_all_tasks,
 )
@@ -23,13 +26,23 @@ from .policy import (
     get_ddddocr_max_retries,
     get_manual_ocr_max_retries,
     get_ocr_max_retries,
+    get_token_expiry_margin,
     parse_indices,
     should_use_cache,
 )
-from .services.auth import ProAuthService
+from .services.auth import ProAuthService, get_cached_school_meta
 from .services.content_gen import AIContentGenerator
 from .services.task_manager import ProTaskManager
+from .run_journal import current_journal, start_run_journal, stop_run_journal
+from .run_records import close_run_records, record_endpoint_metrics, record_task_result
+from .runtime_cache import save_runtime_caches
 from .flow_logic import compute_base_entries, compute_target_entries, should_use_cache_for_task, mark_task_generated
+from .summary_log import close_summary_writer
+from .utils.http_client import close_shared_adapters
+from .utils.http_metrics import dump_metrics, metrics
+from .utils.image_prewarm import start_image_prewarm, stop_image_prewarm
+from .utils.resource_health import group_key, group_ready_accounts, health_cache
+from .utils.tracing import span, start_tracing, stop_tracing, traced
 
 logger = logging.getLogger("Main")
 
@@ -59,67 +72,131 @@ def _extract_cached_real_name(config: dict, username: str) -> str:
     return get_account_real_name(user_info)
 
 
-def log_missing_resources(student_name: str, username: str, missing_list: list[str], detail_info: dict = None):
-    """
-    将缺失资源记录到 missing_resources.log 文件中。
-    采用结构化日志格式，便于后续审计。
-    """
-    log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "missing_resources.log")
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+def _format_missing_entry(timestamp: str, student_name: str, username: str, missing_list: list[str], detail_info: dict = None) -> str:
     # 提取学校/年级/班级等上下文信息
     school = detail_info.get("school", "未知学校") if detail_info else "未知学校"
     grade = detail_info.get("grade", "未知年级") if detail_info else "未知年级"
     clazz = detail_info.get("class", "未知班级") if detail_info else "未知班级"
 
-    header = f"[{timestamp}] [RESOURCE_MISSING] {school} | {grade} | {clazz} | {student_name} ({username})"
-    
+    lines = [f"[{timestamp}] [RESOURCE_MISSING] {school} | {grade} | {clazz} | {student_name} ({username})"]
+    lines += [f"  └─ 缺失路径: {m}" for m in missing_list]
+    lines.append("-" * 80)
+    return "\n".join(lines) + "\n"
+
+
+def log_missing_resources_batch(entries: list[dict]):
+    """
+    将多个账号的缺失资源一次性追加到 missing_resources.log。
+    entries 中每项包含 student_name / username / missing / detail_info。
+    """
+    if not entries:
+        return
+    log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "missing_resources.log")
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    text = "".join(
+        _format_missing_entry(timestamp, e.get("student_name", "未知"), e.get("username", ""), e.get("missing") or [], e.get("detail_info"))
+        for e in entries
+    )
     with open(log_file, "a", encoding="utf-8") as f:
-        f.write(f"{header}\n")
-        for m in missing_list:
-            f.write(f"  └─ 缺失路径: {m}\n")
-        f.write("-" * 80 + "\n")
+        f.write(text)
+
+
+def log_missing_resources(student_name: str, username: str, missing_list: list[str], detail_info: dict = None):
+    """
+    将缺失资源记录到 missing_resources.log 文件中。
+    采用结构化日志格式，便于后续审计。
+    """
+    log_missing_resources_batch(
+        [{"student_name": student_name, "username": username, "missing": missing_list, "detail_info": detail_info}]
+    )
+
+
+def _resource_detail_info(task_mgr) -> dict:
+    return {
+        "school": task_mgr._school_name(),
+        "grade": task_mgr._grade_name(),
+        "class": task_mgr._pure_class_name(),
+    }
+
+
+def audit_selected_accounts(items: list[dict]) -> int:
+    """
+    批量资源审计：按 (学校, 年级, 班级) 去重，每个班级只调用一次 audit_resources，
+    结果写回各账号的 audit_missing 供处理阶段复用；未通过的账号一次性追加写入 missing_resources.log。
+    已带 audit_missing 的账号不会重复审计。返回未通过审计的账号数。
+    """
+    pending = [it for it in items if it.get("task_mgr") is not None and "audit_missing" not in it]
+    if not pending:
+        return 0
+
+    def _key(task_mgr):
+        try:
+            return group_key(task_mgr)
+        except Exception:
+            # 无法识别班级时按账号单独审计
+            return ("", "", "", id(task_mgr))
+
+    results: dict[tuple, list[str]] = {}
+    for item in pending:
+        key = _key(item["task_mgr"])
+        if key not in results:
+            try:
+                results[key] = list(item["task_mgr"].audit_resources() or [])
+            except Exception as e:
+                logger.error(f"资源审计失败 ({item.get('username')}): {e}")
+                results[key] = None
+        if results[key] is not None:
+            item["audit_missing"] = results[key]
+
+    entries = []
+    for item in pending:
+        missing = item.get("audit_missing")
+        if not missing:
+            continue
+        task_mgr = item["task_mgr"]
+        try:
+            detail_info = _resource_detail_info(task_mgr)
+        except Exception:
+            detail_info = None
+        entries.append(
+            {
+                "student_name": getattr(task_mgr, "student_name", "未知"),
+                "username": item.get("username"),
+                "missing": missing,
+                "detail_info": detail_info,
+            }
+        )
+    try:
+        log_missing_resources_batch(entries)
+    except Exception as e:
+        logger.error(f"写入缺失资源日志失败: {e}")
+    return len(entries)
+
 
 def generate_resource_health_report(prepared_accounts: list[dict]):
     """
     汇总所有就绪账号的资源需求并生成体检报告 (深度检查图片与 Excel 记录)
     """
-    ready_accounts = [a for a in prepared_accounts if a.get("status") == "已就绪" and a.get("task_mgr")]
-    if not ready_accounts:
+    groups = group_ready_accounts(prepared_accounts)
+    if not groups:
         return
 
     print("\n" + "=" * 95)
     print("      🔍 资源体检报告 (Resource Health Check)")
     print("=" * 95)
-    
-    # 聚合：(School, Grade, Class) -> list of usernames
-    groups = {}
-    for a in ready_accounts:
-        tm = a["task_mgr"]
-        school = tm._school_name()
-        grade = tm._grade_name()
-        clazz = tm._pure_class_name()
-        key = (school, grade, clazz)
-        if key not in groups:
-            groups[key] = []
-        groups[key].append(a["username"])
 
     print(f"{'学校':<15} | {'年级':<10} | {'班级':<10} | {'劳动':<6} | {'军训':<6} | {'国旗':<6} | {'班会图':<7} | {'班会记录':<8} | {'账号数'}")
     print("-" * 115)
 
-    for (school, grade, clazz), users in groups.items():
-        # 寻找该组的一个代表账号进行资源检查 (因为同班同学资源需求一致)
-        rep_username = users[0]
-        rep_account = next(a for a in prepared_accounts if a["username"] == rep_username)
-        tm: ProTaskManager = rep_account["task_mgr"]
-        
-        health = tm.check_resource_health()
-        
-        ld_ok = "✅" if health["labor"] else "❌"
-        jx_ok = "✅" if health["military"] else "❌"
+    # 同班同学资源需求一致，取首个账号作为代表；各分组并发体检，结果按资源目录指纹缓存
+    healths = health_cache.get_many([users[0]["task_mgr"] for users in groups.values()])
+    for ((school, grade, clazz), users), health in zip(groups.items(), healths):
+
+        ld_ok = "✅" if health.get("labor") else "❌"
+        jx_ok = "✅" if health.get("military") else "❌"
         gq_ok = "✅" if health.get("speech", False) else "❌"
-        bh_img_ok = "✅" if health["class_meeting_img"] else "❌"
-        bh_record_ok = "✅" if health["class_meeting_record"] else "❌"
+        bh_img_ok = "✅" if health.get("class_meeting_img") else "❌"
+        bh_record_ok = "✅" if health.get("class_meeting_record") else "❌"
 
         # 处理空学校名称显示
         display_school = school if school else "未知学校"
@@ -205,134 +282,144 @@ def _print_accounts_table(prepared_accounts: list[dict], config: dict):
     print("=" * 90)
 
 
+def _prepared_entry(username: str, password: str, status: str, *, real_name: str = "", token: str = "", task_mgr=None) -> dict:
+    return {
+        "username": username,
+        "password": password,
+        "real_name": real_name,
+        "token": token,
+        "status": status,
+        "task_mgr": task_mgr,
+    }
+
+
+def _validate_saved_tokens(config: dict, usernames: list[str], sso_base: str) -> dict[str, dict]:
+    """
+    并发校验已持久化的 Token (有界线程池)，返回 {账号: token_flow}；校验失败的账号不在结果中。
+    """
+    from .batch_runner import BatchExecutor, account_output
+    from .policy import config as settings
+
+    usernames = [u for u in usernames if (get_account_entry(config, u).get("token") or "").strip()]
+    if not usernames:
+        return {}
+    try:
+        workers = max(1, int(settings.get_setting("prelogin_workers", 8, env_name="CEP_PRELOGIN_WORKERS")))
+    except (TypeError, ValueError):
+        workers = 1
+    print(f"\n[*] 正在并发校验 {len(usernames)} 个账号的持久化 Token（并发数: {min(workers, len(usernames))}）...")
+
+    def _job(username: str):
+        with account_output(f"[{username}] "):
+            return try_use_token_flow(config, username, sso_base=sso_base)
+
+    results = BatchExecutor(workers=workers, per_host=workers).run(usernames, _job)
+    return {u: r for u, r in zip(usernames, results) if r}
+
+
+def _login_account_interactively(config: dict, username: str, password: str, sso_base: str) -> dict:
+    """Token 不可用时的顺序登录路径 (可能需要人工输入验证码)"""
+    auth = ProAuthService(sso_base=sso_base)
+    print("[*] 正在溯源学校信息...")
+    school_id = auth.get_school_id(username)
+    if not school_id:
+        return _prepared_entry(username, password, "溯源失败")
+
+    ok = ocr_login_with_retries(auth, username, password, school_id)
+    if not ok:
+        return _prepared_entry(username, password, "登录失败")
+
+    task_mgr = build_task_manager(auth.token, auth.user_info, config)
+    if not task_mgr.activate_session():
+        return _prepared_entry(
+            username,
+            password,
+            "会话激活失败",
+            real_name=get_account_real_name(auth.user_info),
+            token=auth.token or "",
+        )
+
+    # 补全学校信息
+    _patch_school_info(task_mgr, auth, username)
+
+    auth_user_info = auth.user_info if isinstance(getattr(auth, "user_info", None), dict) else {}
+    tm_user_info = task_mgr.user_info if isinstance(getattr(task_mgr, "user_info", None), dict) else {}
+    merged_user_info = dict(auth_user_info)
+    merged_user_info.update(tm_user_info)
+    if hasattr(task_mgr, "user_info"):
+        task_mgr.user_info = merged_user_info
+
+    token_value = (auth.token or getattr(task_mgr, "token", "") or "").strip()
+    if token_value and hasattr(task_mgr, "token"):
+        task_mgr.token = token_value
+
+    # 究极持久化：同步激活 Session 后获取的更全信息（学校/班级/年级）到配置
+    # 交互登录代价高，登录成功后立即保存，避免中途退出丢失
+    entry = get_account_entry(config, username)
+    entry["token"] = auth.token
+    entry["user_info"] = merged_user_info
+    if hasattr(config, "save_state"):
+        config.save_state()
+
+    try:
+        task_mgr.print_resource_setup_hints()
+    except Exception:
+        pass
+
+    return _prepared_entry(
+        username,
+        password,
+        "已就绪",
+        real_name=get_account_real_name(merged_user_info),
+        token=token_value,
+        task_mgr=task_mgr,
+    )
+
+
+@traced("prepare_accounts_for_selection")
 def prepare_accounts_for_selection(
     accounts: list[tuple[str, str]],
     config: dict,
     sso_base: str,
 ):
+    accounts = [((u or "").strip(), (p or "").strip()) for u, p in accounts]
+    # 1. 先并发校验所有已保存的 Token，需要重新登录的账号稍后按顺序交互处理
+    token_flows = _validate_saved_tokens(config, [u for u, p in accounts if u and p], sso_base)
+    for username, token_flow in token_flows.items():
+        # 究极持久化：即使是复用 Token，也要同步最新的 user_info (如学校/班级)
+        entry = get_account_entry(config, username)
+        entry["token"] = token_flow["token"]
+        entry["user_info"] = token_flow["user_info"]
+    # 批量保存一次状态
+    if token_flows and hasattr(config, "save_state"):
+        config.save_state()
+
     prepared: list[dict] = []
     for i, (username, password) in enumerate(accounts):
-        username = (username or "").strip()
-        password = (password or "").strip()
         if not username or not password:
-            prepared.append(
-                {
-                    "username": username,
-                    "password": password,
-                    "real_name": "",
-                    "token": "",
-                    "status": "缺少账号/密码",
-                    "task_mgr": None,
-                }
-            )
+            prepared.append(_prepared_entry(username, password, "缺少账号/密码"))
             continue
 
-        print("\n" + "-" * 60)
-        print(f"[*] 预登录 {i+1}/{len(accounts)}：{username}")
-        print("-" * 60)
-
-        token_flow = try_use_token_flow(config, username, sso_base=sso_base)
+        token_flow = token_flows.get(username)
         if token_flow:
-            # 究极持久化：即使是复用 Token，也要同步最新的 user_info (如学校/班级)
-            entry = get_account_entry(config, username)
-            entry["token"] = token_flow["token"]
-            entry["user_info"] = token_flow["user_info"]
-            # 保存状态
-            if hasattr(config, "save_state"):
-                config.save_state()
-            
-            prepared.append(
-                {
-                    "username": username,
-                    "password": password,
-                    "real_name": get_account_real_name(token_flow["user_info"]),
-                    "token": token_flow["token"],
-                    "status": "已就绪",
-                    "task_mgr": token_flow["task_mgr"],
-                }
-            )
-            continue
-
-        auth = ProAuthService(sso_base=sso_base)
-        print("[*] 正在溯源学校信息...")
-        school_id = auth.get_school_id(username)
-        if not school_id:
             prepared.append(
-                {
-                    "username": username,
-                    "password": password,
-                    "real_name": "",
-                    "token": "",
-                    "status": "溯源失败",
-                    "task_mgr": None,
-                }
-            )
-            continue
-
-        ok = ocr_login_with_retries(auth, username, password, school_id)
-        if not ok:
-            prepared.append(
-                {
-                    "username": username,
-                    "password": password,
-                    "real_name": "",
-                    "token": "",
-                    "status": "登录失败",
-                    "task_mgr": None,
-                }
-            )
-            continue
-
-        task_mgr = build_task_manager(auth.token, auth.user_info, config)
-        if not task_mgr.activate_session():
-            prepared.append(
-                {
-                    "username": username,
-                    "password": password,
-                    "real_name": get_account_real_name(auth.user_info),
-                    "token": auth.token or "",
-                    "status": "会话激活失败",
-                    "task_mgr": None,
-                }
+                _prepared_entry(
+                    username,
+                    password,
+                    "已就绪",
+                    real_name=get_account_real_name(token_flow["user_info"]),
+                    token=token_flow["token"],
+                    task_mgr=token_flow["task_mgr"],
+                )
             )
             continue
 
-        # 补全学校信息
-        _patch_school_info(task_mgr, auth, username)
-
-        auth_user_info = auth.user_info if isinstance(getattr(auth, "user_info", None), dict) else {}
-        tm_user_info = task_mgr.user_info if isinstance(getattr(task_mgr, "user_info", None), dict) else {}
-        merged_user_info = dict(auth_user_info)
-        merged_user_info.update(tm_user_info)
-        if hasattr(task_mgr, "user_info"):
-            task_mgr.user_info = merged_user_info
-
-        token_value = (auth.token or getattr(task_mgr, "token", "") or "").strip()
-        if token_value and hasattr(task_mgr, "token"):
-            task_mgr.token = token_value
-
-        # 究极持久化：同步激活 Session 后获取的更全信息（学校/班级/年级）到配置
-        entry = get_account_entry(config, username)
-        entry["token"] = auth.token
-        entry["user_info"] = merged_user_info
-        if hasattr(config, "save_state"):
-            config.save_state()
-
-        try:
-            task_mgr.print_resource_setup_hints()
-        except Exception:
-            pass
-
-        prepared.append(
-            {
-                "username": username,
-                "password": password,
-                "real_name": get_account_real_name(merged_user_info),
-                "token": token_value,
-                "status": "已就绪",
-                "task_mgr": task_mgr,
-            }
-        )
+        print("\n" + "-" * 60)
+        print(f"[*] 预登录 {i+1}/{len(accounts)}：{username}")
+        print("-" * 60)
+        prepared.append(_login_account_interactively(config, username, password, sso_base))
+    # 会话激活缓存在预登录期间只写内存，这里统一写回一次
+    save_runtime_caches()
 
     ready_count = len([a for a in prepared if a.get("status") == "已就绪"])
     fail_count = len(prepared) - ready_count
@@ -427,15 +514,20 @@ def build_task_manager(token: str, user_info: dict, config: dict):
     )
 
 
-def _patch_school_info(task_mgr: ProTaskManager, auth: ProAuthService, username: str):
+def _patch_school_info(task_mgr: ProTaskManager, auth: ProAuthService | None, username: str, sso_base: str | None = None):
     """
-    当 TaskManager 中缺失学校信息时，通过 AuthService 补全并回填
+    当 TaskManager 中缺失学校信息时，通过 AuthService 补全并回填；
+    优先读取学校信息缓存，未命中时才创建 AuthService 联网查询
     """
     school_name_fn = getattr(task_mgr, "_school_name", None)
     has_school = bool(callable(school_name_fn) and (school_name_fn() or "").strip())
     if not has_school:
         try:
-            meta = auth.get_school_meta(username)
+            meta = get_cached_school_meta(sso_base or getattr(auth, "sso_base", ""), username)
+            if meta is None:
+                if auth is None:
+                    auth = ProAuthService(sso_base=sso_base)
+                meta = auth.get_school_meta(username)
             school_name = str(meta.get("name") or "").strip()
             if school_name:
                 ssi = task_mgr.user_info.setdefault("studentSchoolInfo", {})
@@ -449,29 +541,87 @@ def _patch_school_info(task_mgr: ProTaskManager, auth: ProAuthService, username:
 
 
 def try_use_token_flow(config: dict, username: str, sso_base: str | None = None):
-    entry = get_account_entry(config, username)
-    token = (entry.get("token") or "").strip()
-    user_info = entry.get("user_info") if isinstance(entry.get("user_info"), dict) else {}
-    if not token:
-        return None
+    with span("try_use_token_flow", account=username):
+        entry = get_account_entry(config, username)
+        token = (entry.get("token") or "").strip()
+        user_info = entry.get("user_info") if isinstance(entry.get("user_info"), dict) else {}
+        if not token:
+            return None
 
-    print(f"[*] 检测到该账号持久化 Token，正在校验有效性：{username}")
-    task_mgr = build_task_manager(token, user_info, config)
-    if not task_mgr.activate_session():
-        print("[⚠️] Token 失效，将重新登录。")
-        return None
+        task_mgr = build_task_manager(token, user_info, config)
+        margin = get_token_expiry_margin()
+        remaining = task_mgr.token_seconds_remaining() if margin >= 0 else None
+        if user_info and remaining is not None and remaining > margin:
+            # JWT 本地判定仍在有效期内，直接沿用缓存的 user_info，省去在线校验
+            print(f"[*] 持久化 Token 本地校验通过（剩余约 {int(remaining // 60)} 分钟）：{username}")
+        else:
+            print(f"[*] 检测到该账号持久化 Token，正在校验有效性：{username}")
+            if not task_mgr.activate_session():
+                print("[⚠️] Token 失效，将重新登录。")
+                return None
+
+        if sso_base:
+            _patch_school_info(task_mgr, None, username, sso_base=sso_base)
+
+        # 返回最新的 user_info (可能在 activate_session 或 _patch_school_info 中被补充了信息)
+        return {"token": task_mgr.token, "user_info": task_mgr.user_info, "task_mgr": task_mgr}
+
+
+def _load_account_tasks(task_mgr: ProTaskManager, account_username: str | None, rescan: bool = False) -> list[dict]:
+    """有账号标识时走任务快照 (支持增量刷新)，否则全量扫描"""
+    load_tasks = getattr(task_mgr, "load_tasks", None)
+    if account_username and callable(load_tasks):
+        return load_tasks(account_username, rescan=rescan)
+    return task_mgr.get_all_tasks(force_refresh=False)
+
+
+def _mark_task_submitted(task_mgr: ProTaskManager, account_username: str | None, task: dict):
+    mark = getattr(task_mgr, "mark_tasks_submitted", None)
+    if account_username and callable(mark):
+        try:
+            mark(account_username, [task])
+        except Exception as e:
+            logger.debug(f"更新任务快照失败: {e}")
 
-    if sso_base:
-        auth = ProAuthService(sso_base=sso_base)
-        _patch_school_info(task_mgr, auth, username)
 
-    # 返回最新的 user_info (可能在 activate_session 或 _patch_school_info 中被补充了信息)
-    return {"token": task_mgr.token, "user_info": task_mgr.user_info, "task_mgr": task_mgr}
+def run_task_flow(
+    task_mgr: ProTaskManager,
+    ai_gen: AIContentGenerator,
+    preset=None,
+    strict: bool = True,
+    account_username: str | None = None,
+    rescan: bool = False,
+    interactive: bool = True,
+):
+    preset, _ = _run_task_flow(
+        task_mgr,
+        ai_gen,
+        preset=preset,
+        strict=strict,
+        account_username=account_username,
+        rescan=rescan,
+        interactive=interactive,
+    )
+    return preset
 
 
-def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=None, strict: bool = True, account_username: str | None = None):
+def _run_task_flow(
+    task_mgr: ProTaskManager,
+    ai_gen: AIContentGenerator,
+    preset=None,
+    strict: bool = True,
+    account_username: str | None = None,
+    rescan: bool = False,
+    interactive: bool = True,
+):
+    """
+    run_task_flow 的实现，返回 (preset, 状态)：
+    - "ok"：选中的任务全部提交成功 (含中断前已成功的任务)
+    - "partial"：有任务提交失败、被审查跳过或中途退出
+    - "skip"：未处理任何任务 (无任务/扫描失败、取消、未确认重提或需要逐条审查)
+    """
     print("[*] 正在扫描全维度任务...")
-    tasks = task_mgr.get_all_tasks(force_refresh=False)
+    tasks = _load_account_tasks(task_mgr, account_username, rescan=rescan)
 
     pending_tasks = []
     for t in tasks:
@@ -517,8 +667,8 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
             if raw_choice in ("n", "q", "quit", "exit"):
                 if strict:
                     print("[*] 用户取消，程序退出。")
-                    return None
-                return None
+                    return None, "skip"
+                return None, "skip"
 
             indices = []
             selection = raw_choice
@@ -555,8 +705,8 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
     if selection not in {"y", "bh", "gq", "ld", "jx", "indices"}:
         print("[*] 用户取消或输入无效，跳过。")
         if strict:
-            return None
-        return preset
+            return None, "skip"
+        return preset, "skip"
 
     if not preset.get("scope"):
         print("\n" + "=" * 40)
@@ -569,8 +719,8 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
         if raw_scope in ("0", "n", "q", "quit", "exit"):
             if strict:
                 print("[*] 用户取消，程序退出。")
-                return None
-            return preset
+                return None, "skip"
+            return preset, "skip"
         if raw_scope == "1":
             preset["scope"] = "pending"
         elif raw_scope == "2":
@@ -580,8 +730,8 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
         else:
             if strict:
                 print("[*] 用户取消或输入无效，程序退出。")
-                return None
-            return preset
+                return None, "skip"
+            return preset, "skip"
 
     scope = (preset.get("scope") or "pending").lower()
     if scope not in {"pending", "done", "all"}:
@@ -632,18 +782,21 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
     if not target_entries:
         print("[!] 没有选中任何任务。")
         if strict:
-            return None
-        return preset
+            return None, "skip"
+        return preset, "skip"
 
     need_resubmit_confirm = scope in {"done", "all"} and done_count > 0
     if need_resubmit_confirm and not preset.get("confirmed_resubmit"):
+        if not interactive:
+            print("[*] 重新提交未经确认，并发模式下已跳过该账号。")
+            return preset, "skip"
         confirm_resubmit = input("[!] 本次操作会再次提交任务，可能产生重复记录。确认继续? (y/n): ").strip().lower()
         if confirm_resubmit != "y":
             if strict:
                 print("[*] 用户取消，程序退出。")
-                return None
+                return None, "skip"
             print("[*] 已跳过该账号。")
-            return preset
+            return preset, "skip"
         preset["confirmed_resubmit"] = True
 
     print("\n" + "=" * 100)
@@ -673,14 +826,23 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
         preset["skip_review"] = skip_review
 
     skip_review = bool(preset.get("skip_review"))
+    if not skip_review and not interactive:
+        print("[*] 并发模式不支持逐条审查，已跳过该账号。")
+        return preset, "skip"
     diversity_every = preset.get("diversity_every")
     if not isinstance(diversity_every, int):
         diversity_every = get_diversity_every()
         preset["diversity_every"] = diversity_every
 
+    journal = current_journal()
+    all_ok = True
     for _, task in target_entries:
         task_name = task.get("name", "未命名")
+        if journal is not None and account_username and journal.is_task_done(account_username, task):
+            print(f"[*] {task_name} 已在中断前提交成功，跳过。")
+            continue
         print(f"\n{'-'*20} 正在处理: {task_name} {'-'*20}")
+        task_start = time.perf_counter()
         use_cache_for_this = should_use_cache_for_task(
             preset=preset,
             task_name=task_name,
@@ -701,8 +863,10 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
 
             confirm = input("\n[?] 确认提交该任务? (y: 确认提交 / n: 跳过 / q: 退出全部): ").lower()
             if confirm == "n":
+                all_ok = False
                 continue
             if confirm == "q":
+                all_ok = False
                 break
             upload_paths = preview.get("upload_paths") or []
             attachment_ids = []
@@ -724,9 +888,13 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
             result = task_mgr.submit_task(task, ai_gen, dry_run=False, use_cache=use_cache_for_this)
 
         mark_task_generated(preset=preset, task_name=task_name)
+        _mark_task_submitted(task_mgr, account_username, task)
+        if journal is not None and account_username:
+            journal.record_task(account_username, task, result.get("code") == 1, str(result.get("msg") or ""))
         if result.get("code") == 1:
             print(f"[✅] {task_name} 提交成功！")
         else:
+            all_ok = False
             print(f"[❌] {task_name} 提交失败: {result.get('msg')}")
         if account_username:
             try:
@@ -741,10 +909,125 @@ def run_task_flow(task_mgr: ProTaskManager, ai_gen: AIContentGenerator, preset=N
                 )
             except Exception:
                 pass
+            try:
+                record_task_result(
+                    username=account_username,
+                    user_info=getattr(task_mgr, "user_info", {}) or {},
+                    task=task,
+                    ok=(result.get("code") == 1),
+                    msg=str(result.get("msg") or ""),
+                    elapsed_ms=(time.perf_counter() - task_start) * 1000,
+                    attempt=journal.attempts(account_username, task) if journal is not None else 1,
+                )
+            except Exception as e:
+                logger.debug(f"写入运行记录失败: {e}")
 
 
     print("\n[*] 所有选定任务处理完毕。")
-    return preset
+    return preset, "ok" if all_ok else "partial"
+
+
+def process_account(item: dict, ai_gen: AIContentGenerator, preset=None, *, rescan: bool = False, interactive: bool = True):
+    """
+    处理单个已选账号：资源审计 + 任务流程。
+    返回 (状态, preset)，状态为 "ok" (任务全部提交成功) / "partial" (部分任务未成功) /
+    "skip" (未处理任何任务) / "cancel" (首个账号方案选择时用户取消)。
+    journal 中只有 "ok" 的账号在 --resume 时被视为已完成。
+    """
+    had_preset = preset is not None
+    with span("process_account", account=item.get("username")) as sp:
+        status, preset = _process_account(item, ai_gen, preset, rescan=rescan, interactive=interactive)
+        sp.set(status=status)
+    journal = current_journal()
+    if journal is not None and status != "cancel":
+        if not had_preset and preset is not None:
+            journal.record_preset(preset)
+        journal.record_account(item.get("username") or "", status)
+    return status, preset
+
+
+def _process_account(item: dict, ai_gen: AIContentGenerator, preset=None, *, rescan: bool = False, interactive: bool = True):
+    username = item.get("username")
+    task_mgr = item.get("task_mgr")
+    if task_mgr is None:
+        token_flow = try_use_token_flow(config, username)
+        if token_flow:
+            task_mgr = token_flow["task_mgr"]
+        else:
+            print("[❌] 该账号未预登录成功，跳过。")
+            return "skip", preset
+
+    try:
+        # 资源深度审计：优先复用批量审计 (audit_selected_accounts) 的班级级结果，已在批量阶段写过日志
+        pre_audited = item.get("task_mgr") is task_mgr and "audit_missing" in item
+        missing = item["audit_missing"] if pre_audited else task_mgr.audit_resources()
+        if missing:
+            student_name = getattr(task_mgr, "student_name", "未知")
+            print(f"[⚠️] 账号 {username} ({student_name}) 资源审计未通过，将跳过处理。")
+            for m in missing:
+                print(f"    - {m}")
+            if not pre_audited:
+                log_missing_resources(student_name, username, missing, detail_info=_resource_detail_info(task_mgr))
+            return "skip", preset
+
+        if preset is None:
+            entry = get_account_entry(config, username)
+            if isinstance(entry.get("user_info"), dict) and entry.get("token"):
+                display_user_profile(entry.get("user_info"), entry.get("token"))
+            preset, status = _run_task_flow(task_mgr, ai_gen, preset=None, strict=True, account_username=username, rescan=rescan)
+            if preset is None:
+                return "cancel", None
+        else:
+            _, status = _run_task_flow(
+                task_mgr,
+                ai_gen,
+                preset=preset,
+                strict=False,
+                account_username=username,
+                rescan=rescan,
+                interactive=interactive,
+            )
+        return status, preset
+    except Exception as e:
+        logger.error(f"处理账号 {username} 时发生未捕获异常: {e}", exc_info=True)
+        print(f"[❌] 账号 {username} 处理失败，已跳过。")
+        return "skip", preset
+
+
+def get_batch_workers(args=None) -> int:
+    workers = getattr(args, "workers", None)
+    if workers is None:
+        workers = config.get_setting("batch_workers", 1, env_name="CEP_BATCH_WORKERS")
+    try:
+        return max(1, int(workers))
+    except (TypeError, ValueError):
+        return 1
+
+
+def run_accounts_concurrently(items: list[dict], ai_gen: AIContentGenerator, preset: dict, *, rescan: bool = False, workers: int = 4) -> Counter:
+    """
+    非交互地并发处理多个账号 (沿用已确定的 preset)，返回各处理状态的账号数
+    ("ok" 全部成功 / "skip" 无可处理任务 / "partial" 部分失败 / "error" 异常)。
+    每个账号的输出带 [账号] 前缀；同一主机的并发数受 batch_per_host_limit 限制。
+    """
+    from .batch_runner import BatchExecutor, account_output, host_of
+
+    audit_selected_accounts(items)
+    per_host = config.get_setting("batch_per_host_limit", 4, env_name="CEP_BATCH_PER_HOST_LIMIT")
+    executor = BatchExecutor(workers=workers, per_host=per_host)
+
+    def _job(item: dict) -> str:
+        username = item.get("username") or "?"
+        with account_output(f"[{username}] "):
+            print("[*] 开始处理")
+            status, _ = process_account(item, ai_gen, preset, rescan=rescan, interactive=False)
+        return status
+
+    def _host(item: dict) -> str:
+        return host_of(getattr(item.get("task_mgr"), "base_url", "") or "")
+
+    results = executor.run(items, _job, host_key=_host)
+    return Counter(r or "error" for r in results)
 
 
 def _get_selected_accounts_display_name(selected_indices: set[int], prepared_accounts: list[dict]) -> str:
@@ -762,20 +1045,59 @@ def _get_selected_accounts_display_name(selected_indices: set[int], prepared_acc
     return f"：({', '.join(selected_names)})"
 
 
-def main():
+def _print_resume_hint():
+    journal = current_journal()
+    if journal is not None and journal.meta:
+        print(f"[*] 已完成的账号与任务已记录，可使用 --resume {journal.run_id} 从中断处继续。")
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if getattr(args, "command", None) == "report":
+        from .report import run_report
+
+        return run_report(args)
     try:
-        _main_impl()
+        _main_impl(args)
     except KeyboardInterrupt:
         print("\n\n" + "!" * 60)
         print("  👋 检测到用户中断 (Ctrl+C)，正在安全退出...")
         print("  感谢使用，祝您生活愉快！")
         print("!" * 60 + "\n")
+        _print_resume_hint()
     except Exception as e:
         logger.error(f"系统发生致命错误: {e}", exc_info=True)
         print(f"\n[💥] 程序因不可预知错误崩溃: {e}")
+        _print_resume_hint()
+    finally:
+        stop_run_journal()
+        stop_image_prewarm()
+        close_shared_adapters()
+        close_summary_writer()
+        save_runtime_caches()
+        try:
+            record_endpoint_metrics(metrics.snapshot())
+        except Exception as e:
+            logger.debug(f"写入接口指标记录失败: {e}")
+        close_run_records()
+        try:
+            trace_path = stop_tracing()
+            if trace_path:
+                print(f"[*] 运行追踪已写入: {trace_path}（可用 chrome://tracing 或 ui.perfetto.dev 打开）")
+        except Exception as e:
+            logger.debug(f"写入运行追踪失败: {e}")
+        try:
+            metrics_path = dump_metrics()
+            if metrics_path:
+                logger.info(f"HTTP 接口指标已写入: {metrics_path}")
+        except Exception as e:
+            logger.debug(f"写入 HTTP 指标失败: {e}")
 
-def _main_impl():
+def _main_impl(args=None):
     setup_logging()
+    rescan = bool(getattr(args, "rescan", False))
+    if getattr(args, "trace", False) or config.get_setting("trace_enabled", False, env_name="CEP_TRACE_ENABLED"):
+        start_tracing()
 
     print("=" * 60)
     print("      综合评价自动化系统")
@@ -788,13 +1110,27 @@ def _main_impl():
     sso_base = config.get_setting("sso_base", "https://www.nazhisoft.com")
     ai_gen = AIContentGenerator(model=config.get_setting("model"))
 
+    resume_id = getattr(args, "resume", None)
+    journal = None
+    if resume_id:
+        journal = start_run_journal(resume_id)
+        if journal is None:
+            print(f"[❌] 未找到运行记录: {resume_id}")
+            return
+        print(f"[*] 断点续跑：{resume_id}")
+    elif config.get_setting("journal_enabled", True, env_name="CEP_JOURNAL_ENABLED"):
+        journal = start_run_journal()
+
     default_accounts_file = config.get_setting("accounts_file", "accounts.txt", env_name="CEP_ACCOUNTS_FILE", is_path=True)
-    path = input(f"[?] 请输入账号txt路径（默认: {default_accounts_file}）: ").strip()
-    if not path:
-        path = default_accounts_file
+    if resume_id and journal.meta.get("accounts_file"):
+        path = journal.meta["accounts_file"]
     else:
-        # 用户手动输入也进行解析
-        path = config.resolve_path(path)
+        path = input(f"[?] 请输入账号txt路径（默认: {default_accounts_file}）: ").strip()
+        if not path:
+            path = default_accounts_file
+        else:
+            # 用户手动输入也进行解析
+            path = config.resolve_path(path)
 
     try:
         accounts = load_accounts_from_txt(path)
@@ -807,6 +1143,16 @@ def _main_impl():
         return
 
     accounts = sorted(accounts, key=lambda x: _account_sort_key(x[0]))
+    if resume_id:
+        # 已完成的账号不再预登录；只处理中断前选中的账号
+        selected_users = journal.meta.get("selected")
+        done = journal.done_accounts()
+        remaining = [a for a in accounts if (selected_users is None or a[0] in selected_users) and a[0] not in done]
+        print(f"[*] 中断前已完成 {len(done)} 个账号，剩余 {len(remaining)} 个待处理。")
+        if not remaining:
+            print("[🏁] 该次运行的所有账号均已完成。")
+            return
+        accounts = remaining
     print(f"[*] 已读取到 {len(accounts)} 个账号，将先对所有账号执行预登录并持久化会话。")
 
     prepared_accounts = prepare_accounts_for_selection(
@@ -815,9 +1161,16 @@ def _main_impl():
         sso_base=sso_base,
     )
 
+    # 用户挑选账号期间，后台预先体检各班级资源并转码可能用到的图片
+    health_cache.prewarm(prepared_accounts)
+    start_image_prewarm(a["task_mgr"] for a in prepared_accounts if a.get("status") == "已就绪" and a.get("task_mgr"))
+
     selectable = [i for i, a in enumerate(prepared_accounts) if a.get("status") == "已就绪"]
     selected = set()  # 默认不选中任何账号，由用户决定
-    while True:
+    if resume_id:
+        # 续跑沿用中断前的选择 (预登录失败的账号同样不可选)
+        selected = set(selectable)
+    while not resume_id:
         _print_accounts_table(prepared_accounts, config)
         generate_resource_health_report(prepared_accounts)
 
@@ -850,57 +1203,41 @@ def _main_impl():
 
     prepared_accounts = [prepared_accounts[i] for i in sorted(selected)]
     print(f"[*] 将对所选 {len(prepared_accounts)} 个账号批量执行同一套操作。")
+    if journal is not None:
+        if resume_id:
+            journal.record_run(resumed=True)
+        else:
+            journal.record_run(accounts_file=path, selected=[a.get("username") for a in prepared_accounts])
+            print(f"[*] 本次运行编号: {journal.run_id}（中断后可使用 --resume {journal.run_id} 继续）")
+    failed_audit = audit_selected_accounts(prepared_accounts)
+    if failed_audit:
+        print(f"[⚠️] {failed_audit} 个账号资源审计未通过，处理时将跳过（详见 missing_resources.log）。")
 
     preset = None
-    success_count = 0
+    if resume_id and journal.preset:
+        preset = dict(journal.preset)
+        print("[*] 沿用中断前的操作方案。")
+    counts: Counter = Counter()
+    workers = get_batch_workers(args)
     for i, item in enumerate(prepared_accounts):
+        if preset is not None and workers > 1 and preset.get("skip_review"):
+            # 首个账号确定了操作方案且为自动模式，其余账号并发执行
+            rest = prepared_accounts[i:]
+            print(f"\n[*] 其余 {len(rest)} 个账号将以 {workers} 路并发处理（沿用首个账号的操作方案）。")
+            counts.update(run_accounts_concurrently(rest, ai_gen, preset, rescan=rescan, workers=workers))
+            break
+
         username = item.get("username")
-        password = item.get("password")
         print("\n" + "=" * 60)
         print(f"[*] 批量处理账号 {i+1}/{len(prepared_accounts)}：{username}")
         print("=" * 60)
 
-        task_mgr = item.get("task_mgr")
-        if task_mgr is None:
-            token_flow = try_use_token_flow(config, username)
-            if token_flow:
-                task_mgr = token_flow["task_mgr"]
-            else:
-                print("[❌] 该账号未预登录成功，跳过。")
-                continue
-
-        try:
-            # 资源深度审计
-            missing = task_mgr.audit_resources()
-            if missing:
-                student_name = getattr(task_mgr, "student_name", "未知")
-                print(f"[⚠️] 账号 {username} ({student_name}) 资源审计未通过，将跳过处理。")
-                for m in missing:
-                    print(f"    - {m}")
-                log_missing_resources(
-                    student_name,
-                    username,
-                    missing,
-                    detail_info={
-                        "school": task_mgr._school_name(),
-                        "grade": task_mgr._grade_name(),
-                        "class": task_mgr._pure_class_name(),
-                    },
-                )
-                continue
-
-            if preset is None:
-                entry = get_account_entry(config, username)
-                if isinstance(entry.get("user_info"), dict) and entry.get("token"):
-                    display_user_profile(entry.get("user_info"), entry.get("token"))
-                preset = run_task_flow(task_mgr, ai_gen, preset=None, strict=True, account_username=username)
-                if preset is None:
-                    return
-            else:
-                run_task_flow(task_mgr, ai_gen, preset=preset, strict=False, account_username=username)
-            success_count += 1
-        except Exception as e:
-            logger.error(f"处理账号 {username} 时发生未捕获异常: {e}", exc_info=True)
-            print(f"[❌] 账号 {username} 处理失败，已跳过。")
+        status, preset = process_account(item, ai_gen, preset, rescan=rescan)
+        if status == "cancel":
+            return
+        counts[status] += 1
 
-    print(f"\n[🏁] 所有流程处理完毕。成功执行账号数: {success_count}/{len(prepared_accounts)}")
+    print(f"\n[🏁] 所有流程处理完毕。成功执行账号数: {counts['ok']}/{len(prepared_accounts)}")
+    others = [f"{label} {counts[key]}" for key, label in (("skip", "无待办跳过"), ("partial", "部分失败"), ("error", "异常")) if counts[key]]
+    if others:
+        print(f"    其中 {'，'.join(others)}")
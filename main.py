@@ -1,4 +1,5 @@
 import os
+import sys
 from . import cli as _cli
 from . import config_store as _config_store
 from . import flows as _flows
@@ -42,8 +43,8 @@ _is_pending_status = _cli.is_pending_status
 run_task_flow = _flows.run_task_flow
 
 
-def main():
-    return _flows.main()
+def main(argv: list[str] | None = None):
+    return _flows.main(sys.argv[1:] if argv is None else argv)
 
 
 if __name__ == "__main__":
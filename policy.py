@@ -125,6 +125,10 @@ def env_bool(name: str, default: bool) -> bool:
 def get_diversity_every() -> int:
     return config.get_setting("diversity_every", 3, env_name="CEP_DIVERSITY_EVERY")
 
+def get_token_expiry_margin() -> int:
+    """Token 剩余有效期超过该秒数时跳过在线校验；负数表示总是在线校验"""
+    return config.get_setting("token_expiry_margin", 3600, env_name="CEP_TOKEN_EXPIRY_MARGIN")
+
 def should_use_cache(submit_index: int, diversity_every: int) -> bool:
     if diversity_every <= 0:
         return True
@@ -0,0 +1,516 @@
+import argparse
+import datetime as _dt
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Iterable, Optional
+
+from .policy import config
+from .summary_log import _safe_filename
+
+logger = logging.getLogger("Report")
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    run_id TEXT,
+    ts TEXT NOT NULL,
+    day TEXT NOT NULL,
+    school TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    class TEXT NOT NULL,
+    username TEXT NOT NULL,
+    task_id TEXT,
+    task_name TEXT NOT NULL,
+    dimension TEXT,
+    ok INTEGER NOT NULL,
+    msg TEXT,
+    elapsed_ms REAL,
+    attempt INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_results_record ON results(run_id, username, task_name, attempt, ts) WHERE source = 'record';
+CREATE INDEX IF NOT EXISTS ix_results_school_day ON results(school, day, ok);
+CREATE INDEX IF NOT EXISTS ix_results_class_task ON results(school, grade, class, task_name, ok);
+CREATE INDEX IF NOT EXISTS ix_results_day ON results(day);
+CREATE INDEX IF NOT EXISTS ix_results_task_day ON results(task_name, day);
+CREATE INDEX IF NOT EXISTS ix_results_user_task_ts ON results(username, task_name, ts);
+
+CREATE TABLE IF NOT EXISTS endpoints (
+    run_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    day TEXT NOT NULL,
+    method TEXT NOT NULL,
+    host TEXT NOT NULL,
+    path TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    latency_sum_ms REAL NOT NULL,
+    p95_ms REAL,
+    PRIMARY KEY (run_id, method, host, path)
+);
+CREATE INDEX IF NOT EXISTS ix_endpoints_day ON endpoints(day);
+
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    offset INTEGER NOT NULL,
+    fingerprint TEXT
+);
+"""
+
+# 同一次提交同时出现在汇总日志与运行记录中时按 (账号, 任务, 时间 ±1 秒) 去重，以运行记录为准
+_SUMMARY_DUPLICATE = """
+SELECT 1 FROM results
+WHERE source = 'record' AND username = ? AND task_name = ?
+  AND ts BETWEEN datetime(?, '-1 second') AND datetime(?, '+1 second')
+LIMIT 1
+"""
+_DELETE_SUMMARY_DUPLICATE = """
+DELETE FROM results
+WHERE source = 'summary' AND username = ? AND task_name = ?
+  AND ts BETWEEN datetime(?, '-1 second') AND datetime(?, '+1 second')
+"""
+
+
+def get_report_db_path() -> str:
+    return config.get_setting(
+        "report_db",
+        os.path.join(config.base_dir, "runtime", "report.db"),
+        env_name="CEP_REPORT_DB",
+        is_path=True,
+    )
+
+
+def _summary_log_dir() -> str:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    path = config.get_setting("summary_log_dir", os.path.join(base_dir, "runtime", "summary_logs"), env_name="CEP_SUMMARY_LOG_DIR")
+    return os.path.expandvars(os.path.expanduser((path or "").strip() or os.path.join(base_dir, "runtime", "summary_logs")))
+
+
+def _records_dir() -> str:
+    from .run_records import get_records_dir
+
+    return get_records_dir()
+
+
+def _normalize_ts(ts: str) -> str:
+    """统一为 'YYYY-MM-DD HH:MM:SS' (SQLite datetime 可直接比较)"""
+    return (ts or "").replace("T", " ")[:19]
+
+
+def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    path = db_path or get_report_db_path()
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(sources)")}
+    if "fingerprint" not in columns:
+        conn.execute("ALTER TABLE sources ADD COLUMN fingerprint TEXT")
+    return conn
+
+
+def parse_summary_line(line: str) -> Optional[dict]:
+    """解析 append_summary 写入的一行 (去掉 ANSI 颜色)：时间 | 班级 | OK/FAIL | 任务 [| 错误信息]"""
+    parts = [p.strip() for p in _ANSI.sub("", line).rstrip("\n").split(" | ", 4)]
+    if len(parts) < 4 or parts[2] not in ("OK", "FAIL"):
+        return None
+    ts = _normalize_ts(parts[0])
+    try:
+        _dt.datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return {"ts": ts, "class_display": parts[1], "ok": parts[2] == "OK", "task_name": parts[3], "msg": parts[4] if len(parts) > 4 else ""}
+
+
+def _source_state(conn: sqlite3.Connection, path: str) -> Optional[sqlite3.Row]:
+    return conn.execute("SELECT size, mtime, offset, fingerprint FROM sources WHERE path = ?", (path,)).fetchone()
+
+
+def _set_source_state(conn: sqlite3.Connection, path: str, size: int, mtime: float, offset: int, fingerprint: Optional[str] = None):
+    conn.execute(
+        "INSERT INTO sources(path, size, mtime, offset, fingerprint) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, offset = excluded.offset, "
+        "fingerprint = excluded.fingerprint",
+        (path, size, mtime, offset, fingerprint),
+    )
+
+
+def _file_fingerprint(f, st: os.stat_result) -> str:
+    """文件身份：设备号 + inode + 首行哈希；同一路径被轮转后重建时会变化 (inode 可能被复用，故加首行)"""
+    f.seek(0)
+    head = f.read(4096)
+    first_line = head[: head.find(b"\n") + 1]
+    return f"{st.st_dev}:{st.st_ino}:{hashlib.sha1(first_line).hexdigest()}"
+
+
+def _read_new_lines(conn: sqlite3.Connection, path: str) -> Iterable[str]:
+    """增量读取追加写的文本文件：只返回上次导入之后新增的完整行，并更新读取位置"""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return []
+    with f:
+        st = os.fstat(f.fileno())
+        fingerprint = _file_fingerprint(f, st)
+        state = _source_state(conn, path)
+        offset = state["offset"] if state is not None else 0
+        if state is not None and state["fingerprint"] not in (None, fingerprint):
+            offset = 0  # 同一路径已换成新文件 (运行记录轮转后重建)
+        if st.st_size < offset:
+            offset = 0  # 文件被截断
+        if state is not None and st.st_size == offset and state["fingerprint"] == fingerprint:
+            return []
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    _set_source_state(conn, path, st.st_size, st.st_mtime, offset + end, fingerprint)
+    return data[:end].decode("utf-8", errors="replace").splitlines()
+
+
+def _insert_record(conn: sqlite3.Connection, rec: dict) -> int:
+    kind = rec.get("kind") or "task"
+    ts = _normalize_ts(str(rec.get("ts") or ""))
+    if len(ts) < 10:
+        return 0
+    if kind == "endpoint":
+        conn.execute(
+            "INSERT OR REPLACE INTO endpoints(run_id, ts, day, method, host, path, count, errors, retries, latency_sum_ms, p95_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rec.get("run_id") or "",
+                ts,
+                ts[:10],
+                rec.get("method") or "",
+                rec.get("host") or "",
+                rec.get("path") or "",
+                int(rec.get("count") or 0),
+                int(rec.get("errors") or 0),
+                int(rec.get("retries") or 0),
+                float(rec.get("latency_sum_ms") or 0),
+                rec.get("p95_ms"),
+            ),
+        )
+        return 1
+    if kind != "task":
+        return 0
+    username = str(rec.get("username") or "").strip()
+    task_name = str(rec.get("task_name") or "").strip() or "-"
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO results(source, run_id, ts, day, school, grade, class, username, task_id, task_name, dimension, ok, msg, elapsed_ms, attempt) "
+        "VALUES ('record', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            rec.get("run_id") or "",
+            ts,
+            ts[:10],
+            str(rec.get("school") or "").strip() or "未知学校",
+            str(rec.get("grade") or "").strip() or "未知年级",
+            str(rec.get("class") or "").strip() or "未知班级",
+            username,
+            None if rec.get("task_id") is None else str(rec.get("task_id")),
+            task_name,
+            rec.get("dimension") or "",
+            1 if rec.get("ok") else 0,
+            rec.get("msg") or "",
+            rec.get("elapsed_ms"),
+            int(rec.get("attempt") or 1),
+        ),
+    )
+    if cur.rowcount:
+        conn.execute(_DELETE_SUMMARY_DUPLICATE, (username, task_name, ts, ts))
+    return cur.rowcount
+
+
+def ingest_records(conn: sqlite3.Connection, records_dir: Optional[str] = None) -> int:
+    """导入运行记录：已轮转的 .gz 分段整体导入一次，当前分段按读取位置增量导入"""
+    records_dir = records_dir or _records_dir()
+    count = 0
+    for path in sorted(glob.glob(os.path.join(glob.escape(records_dir), "*.jsonl.gz"))):
+        if _source_state(conn, path) is not None:
+            continue
+        try:
+            with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except (OSError, EOFError) as e:
+            logger.error(f"读取运行记录分段失败 ({path}): {e}")
+            continue
+        count += _ingest_json_lines(conn, lines)
+        st = os.stat(path)
+        _set_source_state(conn, path, st.st_size, st.st_mtime, st.st_size)
+    for path in sorted(glob.glob(os.path.join(glob.escape(records_dir), "*.jsonl"))):
+        count += _ingest_json_lines(conn, _read_new_lines(conn, path))
+    return count
+
+
+def _ingest_json_lines(conn: sqlite3.Connection, lines: Iterable[str]) -> int:
+    count = 0
+    for line in lines:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(rec, dict):
+            count += _insert_record(conn, rec)
+    return count
+
+
+_NAME_COLUMNS = ("school", "grade", "class", "username")
+
+
+def _raw_names(conn: sqlite3.Connection) -> dict[str, dict[str, str]]:
+    """
+    汇总日志的目录名/文件名经过 _safe_filename 处理 (如 "一中（高中部）" -> "一中_高中部_")，
+    运行记录保存的是原始名称；按列建立 净化名 -> 原始名 的映射以便两者归到同一分组。
+    """
+    names: dict[str, dict[str, str]] = {c: {} for c in _NAME_COLUMNS}
+    for column in _NAME_COLUMNS:
+        for (value,) in conn.execute(f"SELECT DISTINCT {column} FROM results WHERE source = 'record'"):
+            names[column].setdefault(_safe_filename(value), value)
+    return names
+
+
+def _restore_summary_names(conn: sqlite3.Connection, names: dict[str, dict[str, str]]):
+    """把先前以净化名导入的汇总日志行改回原始名称"""
+    for column, mapping in names.items():
+        for safe, raw in mapping.items():
+            if safe != raw:
+                conn.execute(f"UPDATE results SET {column} = ? WHERE source = 'summary' AND {column} = ?", (raw, safe))
+
+
+def ingest_summary_logs(conn: sqlite3.Connection, log_dir: Optional[str] = None) -> int:
+    """导入彩色汇总日志 <log_dir>/<学校>/<年级>/<班级>/<账号>.log (按读取位置增量导入)"""
+    log_dir = log_dir or _summary_log_dir()
+    names = _raw_names(conn)
+    _restore_summary_names(conn, names)
+    count = 0
+    for root, _, files in os.walk(log_dir):
+        rel = os.path.relpath(root, log_dir).split(os.sep)
+        school, grade, clazz = (rel + ["", "", ""])[:3] if rel != ["."] else ("", "", "")
+        school = names["school"].get(school, school)
+        grade = names["grade"].get(grade, grade)
+        clazz = names["class"].get(clazz, clazz)
+        for name in files:
+            if not name.endswith(".log"):
+                continue
+            username = name[: -len(".log")]
+            username = names["username"].get(username, username)
+            for line in _read_new_lines(conn, os.path.join(root, name)):
+                row = parse_summary_line(line)
+                if row is None:
+                    continue
+                ts = row["ts"]
+                if conn.execute(_SUMMARY_DUPLICATE, (username, row["task_name"], ts, ts)).fetchone():
+                    continue
+                conn.execute(
+                    "INSERT INTO results(source, run_id, ts, day, school, grade, class, username, task_name, ok, msg, attempt) "
+                    "VALUES ('summary', NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)",
+                    (
+                        ts,
+                        ts[:10],
+                        school or "未知学校",
+                        grade or "未知年级",
+                        clazz or "未知班级",
+                        username,
+                        row["task_name"],
+                        1 if row["ok"] else 0,
+                        row["msg"],
+                    ),
+                )
+                count += 1
+    return count
+
+
+def ingest(conn: sqlite3.Connection, *, records_dir: Optional[str] = None, log_dir: Optional[str] = None) -> dict:
+    """增量导入运行记录与汇总日志 (单个事务)，返回各来源新增的行数"""
+    with conn:
+        records = ingest_records(conn, records_dir)
+        summaries = ingest_summary_logs(conn, log_dir)
+    return {"records": records, "summary_lines": summaries}
+
+
+def _since_day(since: Optional[str]) -> Optional[str]:
+    """--since 支持天数 (7 表示最近 7 天，含今天) 或 YYYY-MM-DD"""
+    if since in (None, ""):
+        return None
+    text = str(since).strip()
+    if text.isdigit():
+        return (_dt.date.today() - _dt.timedelta(days=max(0, int(text) - 1))).isoformat()
+    _dt.date.fromisoformat(text)
+    return text
+
+
+def _where(filters: dict) -> tuple[str, list]:
+    clauses, params = [], []
+    for column, op, value in (
+        ("school", "=", filters.get("school")),
+        ("grade", "=", filters.get("grade")),
+        ("class", "=", filters.get("clazz")),
+        ("day", ">=", _since_day(filters.get("since"))),
+        ("day", "<=", filters.get("until")),
+    ):
+        if value:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def failure_rates(conn: sqlite3.Connection, *, group_by: str = "school", **filters) -> list[dict]:
+    """按学校 (或 grade / class / day / task) 统计提交次数与失败率"""
+    columns = {
+        "school": "school",
+        "grade": "school, grade",
+        "class": "school, grade, class",
+        "day": "day",
+        "task": "task_name",
+    }[group_by]
+    where, params = _where(filters)
+    sql = (
+        f"SELECT {columns}, COUNT(*) AS total, SUM(ok = 0) AS failed, "
+        f"ROUND(100.0 * SUM(ok = 0) / COUNT(*), 2) AS failure_rate FROM results{where} "
+        f"GROUP BY {columns} ORDER BY failure_rate DESC, total DESC"
+    )
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def never_submitted(conn: sqlite3.Connection, *, school: str, grade: Optional[str] = None, clazz: Optional[str] = None) -> list[dict]:
+    """
+    某学校 (可限定年级/班级) 各班从未成功提交过的任务：任务全集取该校出现过的任务名，
+    attempts 为该班对该任务的失败次数。
+    """
+    sql = """
+    WITH tasks AS (SELECT DISTINCT task_name FROM results WHERE school = ?),
+         classes AS (
+             SELECT DISTINCT grade, class FROM results
+             WHERE school = ? AND (? IS NULL OR grade = ?) AND (? IS NULL OR class = ?)
+         )
+    SELECT c.grade, c.class, t.task_name,
+           (SELECT COUNT(*) FROM results r
+             WHERE r.school = ? AND r.grade = c.grade AND r.class = c.class AND r.task_name = t.task_name) AS attempts
+    FROM classes c CROSS JOIN tasks t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM results r
+        WHERE r.school = ? AND r.grade = c.grade AND r.class = c.class AND r.task_name = t.task_name AND r.ok = 1
+    )
+    ORDER BY c.grade, c.class, t.task_name
+    """
+    params = (school, school, grade, grade, clazz, clazz, school, school)
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def slowest_endpoints(conn: sqlite3.Connection, *, since: Optional[str] = "7", until: Optional[str] = None, limit: int = 10) -> list[dict]:
+    """按平均延迟排序的接口 (汇总所选时间范围内的全部运行)"""
+    where, params = _where({"since": since, "until": until})
+    sql = (
+        "SELECT method, host, path, SUM(count) AS requests, SUM(errors) AS errors, SUM(retries) AS retries, "
+        "ROUND(SUM(latency_sum_ms) / MAX(SUM(count), 1), 1) AS avg_ms, MAX(p95_ms) AS max_p95_ms, COUNT(*) AS runs "
+        f"FROM endpoints{where} GROUP BY method, host, path ORDER BY avg_ms DESC LIMIT ?"
+    )
+    return [dict(r) for r in conn.execute(sql, params + [max(1, int(limit))])]
+
+
+def _print_rows(rows: list[dict], limit: Optional[int] = None):
+    if not rows:
+        print("(无数据)")
+        return
+    shown = rows[:limit] if limit else rows
+    headers = list(shown[0].keys())
+    widths = [max(len(str(h)), *(len(str(r[h] if r[h] is not None else "-")) for r in shown)) for h in headers]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in shown:
+        print("  ".join(str(r[h] if r[h] is not None else "-").ljust(w) for h, w in zip(headers, widths)))
+    if limit and len(rows) > limit:
+        print(f"... 共 {len(rows)} 行，仅显示前 {limit} 行")
+
+
+def add_report_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--db", default=None, help="SQLite 数据库路径 (默认 runtime/report.db)")
+    parser.add_argument("--no-ingest", action="store_true", help="跳过导入，只查询现有数据库")
+    parser.add_argument("--records-dir", default=None, help="运行记录目录 (默认 records_dir 配置)")
+    parser.add_argument("--summary-dir", default=None, help="汇总日志目录 (默认 summary_log_dir 配置)")
+    parser.add_argument("--limit-rows", type=int, default=50, help="最多显示的行数")
+    sub = parser.add_subparsers(dest="query")
+
+    failures = sub.add_parser("failures", help="失败率 (默认按学校)")
+    failures.add_argument("--by", choices=["school", "grade", "class", "day", "task"], default="school")
+    failures.add_argument("--school")
+    failures.add_argument("--grade")
+    failures.add_argument("--class", dest="clazz")
+    failures.add_argument("--since", help="最近 N 天 (含今天) 或起始日期 YYYY-MM-DD")
+    failures.add_argument("--until", help="截止日期 YYYY-MM-DD")
+
+    missing = sub.add_parser("missing", help="班级从未成功提交的任务")
+    missing.add_argument("--school", required=True)
+    missing.add_argument("--grade")
+    missing.add_argument("--class", dest="clazz")
+
+    endpoints = sub.add_parser("endpoints", help="最慢的接口")
+    endpoints.add_argument("--since", default="7", help="最近 N 天 (默认 7) 或起始日期 YYYY-MM-DD")
+    endpoints.add_argument("--until")
+    endpoints.add_argument("--limit", type=int, default=10)
+
+    sub.add_parser("ingest", help="只导入，不查询")
+
+
+def run_report(args: argparse.Namespace) -> int:
+    conn = connect(args.db)
+    try:
+        if not args.no_ingest:
+            start = time.perf_counter()
+            added = ingest(conn, records_dir=args.records_dir, log_dir=args.summary_dir)
+            print(
+                f"[*] 已导入 运行记录 {added['records']} 条、汇总日志 {added['summary_lines']} 行 "
+                f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+            )
+        query = args.query or "failures"
+        if query == "ingest":
+            return 0
+        start = time.perf_counter()
+        if query == "failures":
+            rows = failure_rates(
+                conn,
+                group_by=getattr(args, "by", "school"),
+                school=getattr(args, "school", None),
+                grade=getattr(args, "grade", None),
+                clazz=getattr(args, "clazz", None),
+                since=getattr(args, "since", None),
+                until=getattr(args, "until", None),
+            )
+        elif query == "missing":
+            rows = never_submitted(conn, school=args.school, grade=args.grade, clazz=args.clazz)
+        else:
+            rows = slowest_endpoints(conn, since=args.since, until=args.until, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _print_rows(rows, args.limit_rows)
+        print(f"[*] 查询耗时 {elapsed_ms:.1f}ms")
+        return 0
+    except ValueError as e:
+        print(f"[❌] 参数无效: {e}")
+        return 2
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="comprehensive_eval_pro report", description="历史运行结果查询 (SQLite 索引)")
+    add_report_arguments(parser)
+    return run_report(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
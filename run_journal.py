@@ -0,0 +1,228 @@
+import datetime as _dt
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from .policy import config
+
+logger = logging.getLogger("RunJournal")
+
+# 断点续跑需要恢复的 preset 字段 (gen_counts 等运行期计数不恢复)
+PRESET_KEYS = ("mode", "indices", "selection", "scope", "skip_review", "confirmed_resubmit", "diversity_every")
+
+# 运行期的全局 Journal；为 None 时 record_* 直接返回
+_journal: Optional["RunJournal"] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal_dir() -> str:
+    return config.get_setting(
+        "journal_dir",
+        os.path.join(config.base_dir, "runtime", "journal"),
+        env_name="CEP_JOURNAL_DIR",
+        is_path=True,
+    )
+
+
+def get_journal_fsync_batch() -> int:
+    try:
+        return max(1, int(config.get_setting("journal_fsync_batch", 20, env_name="CEP_JOURNAL_FSYNC_BATCH")))
+    except (TypeError, ValueError):
+        return 20
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def task_key(task: dict) -> str:
+    """任务在 journal 中的标识：优先使用任务 id，缺失时退化为任务名"""
+    task_id = task.get("id")
+    return str(task_id) if task_id not in (None, "") else f"name:{task.get('name', '')}"
+
+
+class RunJournal:
+    """
+    追加写的运行日志 runtime/journal/<run_id>.jsonl，每完成一步写一行：
+      {"ts", "account", "task_id", "phase", "result", ...}
+    phase 为 run (运行参数) / preset (操作方案) / submit (单个任务提交) / account (账号处理完毕)。
+    每行写入后立即 flush，每 fsync_batch 行 (以及关闭时) fsync 一次；
+    文件在写入第一条记录 (record_run) 时才创建，未开始处理就退出的运行不留下空文件。
+    重新打开时读取已有记录，供 --resume 跳过已完成的账号与任务。
+    """
+
+    def __init__(self, path: str, run_id: str, *, fsync_batch: Optional[int] = None):
+        self.path = path
+        self.run_id = run_id
+        self.fsync_batch = fsync_batch or get_journal_fsync_batch()
+        self.meta: dict = {}
+        self.preset: Optional[dict] = None
+        self._done_tasks: dict[str, set[str]] = {}
+        self._done_accounts: set[str] = set()
+        self._attempts: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._fh = None
+        self._closed = False
+        self._load()
+
+    @classmethod
+    def create(cls, run_id: Optional[str] = None, journal_dir: Optional[str] = None) -> "RunJournal":
+        run_id = run_id or new_run_id()
+        return cls(os.path.join(journal_dir or get_journal_dir(), f"{run_id}.jsonl"), run_id)
+
+    @classmethod
+    def resume(cls, run_id: str, journal_dir: Optional[str] = None) -> Optional["RunJournal"]:
+        """打开已有的运行日志；不存在时返回 None"""
+        path = os.path.join(journal_dir or get_journal_dir(), f"{run_id}.jsonl")
+        if not os.path.isfile(path):
+            return None
+        return cls(path, run_id)
+
+    def _open_locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if self._fh.tell() > 0 and not self._ends_with_newline():
+            # 上次运行在写一行的中途被终止：补一个换行，避免新记录接在残行后面
+            self._fh.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 中断时残留的半行
+                if isinstance(rec, dict):
+                    self._apply(rec)
+
+    def _apply(self, rec: dict):
+        phase = rec.get("phase")
+        account = rec.get("account") or ""
+        if phase == "run":
+            self.meta.update(rec.get("meta") or {})
+        elif phase == "preset" and isinstance(rec.get("preset"), dict):
+            self.preset = rec["preset"]
+        elif phase == "submit":
+            key = (account, str(rec.get("task_id")))
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            if rec.get("result") == "ok":
+                self._done_tasks.setdefault(account, set()).add(key[1])
+        elif phase == "account" and rec.get("result") == "ok":
+            self._done_accounts.add(account)
+
+    def _write(self, rec: dict):
+        rec = {"ts": _dt.datetime.now().isoformat(timespec="seconds"), **rec}
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            if self._fh is None:
+                self._open_locked()
+            self._apply(rec)
+            self._fh.write(line)
+            self._fh.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        try:
+            os.fsync(self._fh.fileno())
+        except OSError as e:
+            logger.debug(f"journal fsync 失败: {e}")
+        self._unsynced = 0
+
+    def record_run(self, **meta: Any):
+        self._write({"account": None, "task_id": None, "phase": "run", "result": "start", "meta": meta})
+
+    def record_preset(self, preset: dict):
+        if not isinstance(preset, dict):
+            return
+        self._write({"account": None, "task_id": None, "phase": "preset", "result": "ok", "preset": {k: preset.get(k) for k in PRESET_KEYS}})
+
+    def record_task(self, account: str, task: dict, ok: bool, msg: str = ""):
+        self._write(
+            {
+                "account": account,
+                "task_id": task_key(task),
+                "phase": "submit",
+                "result": "ok" if ok else "fail",
+                "name": task.get("name", ""),
+                "msg": "" if ok else msg,
+            }
+        )
+
+    def record_account(self, account: str, status: str):
+        self._write({"account": account, "task_id": None, "phase": "account", "result": status})
+
+    def is_task_done(self, account: str, task: dict) -> bool:
+        with self._lock:
+            return task_key(task) in self._done_tasks.get(account or "", ())
+
+    def attempts(self, account: str, task: dict) -> int:
+        """该任务在本次运行 (含续跑前) 中的提交次数"""
+        with self._lock:
+            return self._attempts.get((account or "", task_key(task)), 0)
+
+    def is_account_done(self, account: str) -> bool:
+        with self._lock:
+            return (account or "") in self._done_accounts
+
+    def done_accounts(self) -> set[str]:
+        with self._lock:
+            return set(self._done_accounts)
+
+    def flush(self):
+        with self._lock:
+            if self._fh is not None and self._unsynced:
+                self._sync_locked()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._fh is None:
+                return
+            self._fh.flush()
+            self._sync_locked()
+            self._fh.close()
+            self._fh = None
+
+
+def start_run_journal(resume_id: Optional[str] = None, journal_dir: Optional[str] = None) -> Optional[RunJournal]:
+    """
+    开启本次运行的 journal 并设为全局；resume_id 指定时续写已有的 journal，不存在则返回 None。
+    """
+    global _journal
+    journal = RunJournal.resume(resume_id, journal_dir) if resume_id else RunJournal.create(journal_dir=journal_dir)
+    if journal is None:
+        return None
+    with _journal_lock:
+        old, _journal = _journal, journal
+    if old is not None:
+        old.close()
+    return journal
+
+
+def current_journal() -> Optional[RunJournal]:
+    return _journal
+
+
+def stop_run_journal() -> Optional[RunJournal]:
+    """关闭全局 journal (fsync 剩余记录)，返回被关闭的实例；未开启时返回 None"""
+    global _journal
+    with _journal_lock:
+        journal, _journal = _journal, None
+    if journal is not None:
+        journal.close()
+    return journal
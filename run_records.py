@@ -0,0 +1,248 @@
+import datetime as _dt
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Iterator, Optional
+
+from .policy import config
+from .summary_log import _extract_grade_name, _extract_pure_class_name, _extract_school_name
+
+logger = logging.getLogger("RunRecords")
+
+# 运行期的全局写入器；首次记录时按本次运行编号创建
+_writer: Optional["RunRecordWriter"] = None
+_writer_lock = threading.Lock()
+
+
+def get_records_dir() -> str:
+    return config.get_setting(
+        "records_dir",
+        os.path.join(config.base_dir, "runtime", "records"),
+        env_name="CEP_RECORDS_DIR",
+        is_path=True,
+    )
+
+
+def get_records_max_bytes() -> int:
+    """单个 JSONL 分段的大小上限，超过后轮转并 gzip 压缩；0 表示不轮转"""
+    try:
+        return max(0, int(config.get_setting("records_max_bytes", 16 * 1024 * 1024, env_name="CEP_RECORDS_MAX_BYTES")))
+    except (TypeError, ValueError):
+        return 16 * 1024 * 1024
+
+
+def records_enabled() -> bool:
+    return bool(config.get_setting("records_enabled", True, env_name="CEP_RECORDS_ENABLED"))
+
+
+def _gzip_file(src: str):
+    tmp = src + ".gz.tmp"
+    try:
+        with open(src, "rb") as f_in, gzip.open(tmp, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(tmp, src + ".gz")
+        os.remove(src)
+    except OSError as e:
+        logger.error(f"压缩运行记录分段失败 ({src}): {e}")
+
+
+class RunRecordWriter:
+    """
+    每次运行一条 JSONL 记录流：<records_dir>/<run_id>.jsonl，每个任务提交结果一行 (kind=task)，
+    运行结束时追加各 HTTP 接口的指标 (kind=endpoint)。
+    当前分段超过 max_bytes 时改名为 <run_id>.<序号>.jsonl 并在后台 gzip 为 .jsonl.gz，
+    然后继续写新的当前分段；iter_run_records 按顺序读取全部分段。
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = get_records_max_bytes() if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._fh = None
+        self._size = 0
+        self._compressors: list[threading.Thread] = []
+
+    def _open_locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._size = self._fh.tell()
+
+    def _next_segment_path(self) -> str:
+        stem = self.path[: -len(".jsonl")] if self.path.endswith(".jsonl") else self.path
+        index = len(_segment_paths(self.path)) + 1
+        while True:
+            candidate = f"{stem}.{index:04d}.jsonl"
+            if not os.path.exists(candidate) and not os.path.exists(candidate + ".gz"):
+                return candidate
+            index += 1
+
+    def _rotate_locked(self):
+        self._fh.close()
+        self._fh = None
+        segment = self._next_segment_path()
+        os.replace(self.path, segment)
+        thread = threading.Thread(target=_gzip_file, args=(segment,), name="cep-records-gzip", daemon=True)
+        thread.start()
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+        self._open_locked()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        size = len(line.encode("utf-8"))
+        with self._lock:
+            if self._fh is None:
+                self._open_locked()
+            if self.max_bytes and self._size > 0 and self._size + size > self.max_bytes:
+                self._rotate_locked()
+            self._fh.write(line)
+            self._fh.flush()
+            self._size += size
+
+    def close(self, timeout: Optional[float] = 30.0):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            compressors, self._compressors = self._compressors, []
+        for thread in compressors:
+            thread.join(timeout)
+
+
+def _segment_paths(path: str) -> list[str]:
+    stem = path[: -len(".jsonl")] if path.endswith(".jsonl") else path
+    segments = glob.glob(glob.escape(stem) + ".[0-9][0-9][0-9][0-9]*.jsonl") + glob.glob(glob.escape(stem) + ".[0-9][0-9][0-9][0-9]*.jsonl.gz")
+    # 压缩中途退出时可能同时残留 .jsonl 与 .jsonl.gz，以完整的 .gz 为准
+    by_base: dict[str, str] = {}
+    for p in segments:
+        base = p[:-3] if p.endswith(".gz") else p
+        if p.endswith(".gz") or base not in by_base:
+            by_base[base] = p
+
+    def _index(base: str) -> int:
+        try:
+            return int(base[len(stem) + 1 : -len(".jsonl")])
+        except ValueError:
+            return 0
+
+    return [by_base[base] for base in sorted(by_base, key=_index)]
+
+
+def iter_run_records(path: str) -> Iterator[dict]:
+    """按写入顺序读取一次运行的全部记录 (已轮转的 .gz 分段 + 当前分段)，跳过损坏的行"""
+    for p in _segment_paths(path) + ([path] if os.path.exists(path) else []):
+        opener = gzip.open if p.endswith(".gz") else open
+        try:
+            with opener(p, "rt", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(rec, dict):
+                        yield rec
+        except (OSError, EOFError) as e:
+            logger.error(f"读取运行记录失败 ({p}): {e}")
+
+
+def _get_writer() -> Optional[RunRecordWriter]:
+    global _writer
+    if _writer is not None:
+        return _writer
+    if not records_enabled():
+        return None
+    from .run_journal import current_journal, new_run_id
+
+    with _writer_lock:
+        if _writer is None:
+            journal = current_journal()
+            run_id = journal.run_id if journal is not None else new_run_id()
+            _writer = RunRecordWriter(os.path.join(get_records_dir(), f"{run_id}.jsonl"))
+        return _writer
+
+
+def record_task_result(
+    *,
+    username: str,
+    user_info: dict,
+    task: dict,
+    ok: bool,
+    msg: str = "",
+    elapsed_ms: Optional[float] = None,
+    attempt: int = 1,
+):
+    """追加一条任务提交结果到本次运行的 JSONL 记录流"""
+    writer = _get_writer()
+    if writer is None:
+        return
+    run_id = os.path.basename(writer.path)[: -len(".jsonl")]
+    writer.write(
+        {
+            "kind": "task",
+            "ts": _dt.datetime.now().isoformat(timespec="milliseconds"),
+            "run_id": run_id,
+            "school": _extract_school_name(user_info),
+            "grade": _extract_grade_name(user_info),
+            "class": _extract_pure_class_name(user_info),
+            "username": username,
+            "task_id": task.get("id"),
+            "task_name": task.get("name", ""),
+            "dimension": task.get("dimensionName") or "",
+            "ok": bool(ok),
+            "msg": msg,
+            "elapsed_ms": round(elapsed_ms, 1) if elapsed_ms is not None else None,
+            "attempt": attempt,
+        }
+    )
+
+
+def _p95_ms(buckets: dict, count: int) -> Optional[float]:
+    """由累计直方图估算 p95 的上界 (毫秒)；落在 +Inf 桶时返回 None"""
+    if not count:
+        return None
+    for bound, cumulative in buckets.items():
+        if bound != "+Inf" and cumulative >= 0.95 * count:
+            return float(bound) * 1000
+    return None
+
+
+def record_endpoint_metrics(snapshot: dict):
+    """运行结束时把 HTTP 接口指标快照写入记录流 (每个接口一行)，供历史报表统计慢接口"""
+    endpoints = (snapshot or {}).get("endpoints") or []
+    if not endpoints:
+        return
+    writer = _get_writer()
+    if writer is None:
+        return
+    run_id = os.path.basename(writer.path)[: -len(".jsonl")]
+    ts = _dt.datetime.now().isoformat(timespec="milliseconds")
+    for ep in endpoints:
+        writer.write(
+            {
+                "kind": "endpoint",
+                "ts": ts,
+                "run_id": run_id,
+                "method": ep.get("method"),
+                "host": ep.get("host"),
+                "path": ep.get("path"),
+                "count": ep.get("count", 0),
+                "errors": ep.get("errors", 0),
+                "retries": ep.get("retries", 0),
+                "latency_sum_ms": round(float(ep.get("latency_sum") or 0) * 1000, 3),
+                "p95_ms": _p95_ms(ep.get("latency_buckets") or {}, ep.get("count", 0)),
+            }
+        )
+
+
+def close_run_records() -> Optional[str]:
+    """关闭本次运行的记录流 (等待后台压缩完成)，返回当前分段路径；未写过记录时返回 None"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return None
+    writer.close()
+    return writer.path
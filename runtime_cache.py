@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from typing import Any
+
+from .config_store import load_json_config, save_json_config
+from .policy import config
+
+
+class RuntimeCache:
+    """
+    带 TTL 的持久化键值缓存：内存 + runtime/cache/<name>.json 两级。
+    条目格式为 {key: {"ts": 写入时间戳, "value": 值}}，过期条目读取时视为未命中，写回磁盘时清理。
+    set/delete 传 save=False 时只改内存，稍后由 save() / save_runtime_caches() 统一写回。
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, cache_dir: str | None = None):
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.cache_dir = cache_dir or get_runtime_cache_dir()
+        self.path = os.path.join(self.cache_dir, f"{name}.json")
+        self._lock = threading.RLock()
+        self._entries: dict | None = None
+        self._dirty = False
+
+    def _load_locked(self) -> dict:
+        if self._entries is None:
+            data = load_json_config(self.path)
+            self._entries = data if isinstance(data, dict) else {}
+        return self._entries
+
+    def get(self, key: str, ttl: float | None = None, default: Any = None) -> Any:
+        if not key:
+            return default
+        ttl = self.ttl_seconds if ttl is None else float(ttl)
+        with self._lock:
+            entry = self._load_locked().get(key)
+        if not isinstance(entry, dict):
+            return default
+        ts = entry.get("ts")
+        if not isinstance(ts, (int, float)) or (ttl >= 0 and time.time() - ts > ttl):
+            return default
+        return entry.get("value", default)
+
+    def get_entry(self, key: str) -> dict | None:
+        """返回原始条目 (含 ts)，不做过期判断"""
+        with self._lock:
+            entry = self._load_locked().get(key)
+        return dict(entry) if isinstance(entry, dict) else None
+
+    def set(self, key: str, value: Any, *, save: bool = True):
+        if not key:
+            return
+        with self._lock:
+            self._load_locked()[key] = {"ts": time.time(), "value": value}
+            self._dirty = True
+            if save:
+                self._save_locked()
+
+    def delete(self, key: str, *, save: bool = True):
+        with self._lock:
+            if self._load_locked().pop(key, None) is not None:
+                self._dirty = True
+                if save:
+                    self._save_locked()
+
+    def save(self):
+        """有未写回的修改时保存到磁盘"""
+        with self._lock:
+            if self._entries is not None and self._dirty:
+                self._save_locked()
+
+    def _prune_locked(self):
+        """删除已过期的条目 (ttl < 0 表示永不过期)"""
+        if self.ttl_seconds < 0 or not self._entries:
+            return
+        now = time.time()
+        for key in [
+            k
+            for k, entry in self._entries.items()
+            if not isinstance(entry, dict) or not isinstance(entry.get("ts"), (int, float)) or now - entry["ts"] > self.ttl_seconds
+        ]:
+            del self._entries[key]
+
+    def _save_locked(self):
+        self._prune_locked()
+        try:
+            save_json_config(self._entries or {}, self.path)
+            self._dirty = False
+        except Exception:
+            pass
+
+
+_caches: dict[str, RuntimeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_runtime_cache_dir() -> str:
+    return config.get_setting(
+        "runtime_cache_dir",
+        os.path.join(config.base_dir, "runtime", "cache"),
+        env_name="CEP_RUNTIME_CACHE_DIR",
+        is_path=True,
+    )
+
+
+def get_runtime_cache(name: str, ttl_seconds: float) -> RuntimeCache:
+    """按名称获取共享的缓存实例；同名缓存在进程内只有一份"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = RuntimeCache(name, ttl_seconds)
+            _caches[name] = cache
+        return cache
+
+
+def save_runtime_caches():
+    """把所有缓存实例中未写回的修改保存到磁盘 (批量 set(save=False) 之后调用)"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.save()
+
+
+def reset_runtime_caches():
+    """丢弃进程内的缓存实例 (测试或切换缓存目录时使用)"""
+    with _caches_lock:
+        _caches.clear()
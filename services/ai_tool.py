@@ -2,6 +2,7 @@ import logging
 import os
 from ..policy import config
 from comprehensive_eval_pro.utils.http_client import create_session, request_json_response
+from comprehensive_eval_pro.utils.tracing import traced
 
 logger = logging.getLogger("AITool")
 
@@ -115,6 +116,7 @@ class AIModelTool:
         provider = self.providers.get(provider_key)
         return provider, (model or "").strip()
 
+    @traced("AIModelTool.chat")
     def chat(
         self,
         *,
@@ -8,6 +8,48 @@ from comprehensive_eval_pro.services.vision import VisionService
 
 logger = logging.getLogger("AuthModule")
 
+
+def _school_meta_cache():
+    from comprehensive_eval_pro.policy import config
+    from comprehensive_eval_pro.runtime_cache import get_runtime_cache
+
+    ttl = config.get_setting("school_meta_cache_ttl", 30 * 86400, env_name="CEP_SCHOOL_META_CACHE_TTL")
+    if ttl <= 0:
+        return None
+    return get_runtime_cache("school_meta", ttl)
+
+
+def _school_meta_key(sso_base: str, username: str) -> str:
+    username = (username or "").strip()
+    return f"{(sso_base or '').rstrip('/')}|{username}" if username else ""
+
+
+def get_cached_school_meta(sso_base: str, username: str) -> dict | None:
+    """
+    读取缓存的学校信息：None 表示未缓存 (需要联网查询)，{} 表示负缓存仍有效。
+    """
+    cache = _school_meta_cache()
+    key = _school_meta_key(sso_base, username)
+    if cache is None or not key:
+        return None
+    meta = cache.get(key)
+    if not isinstance(meta, dict):
+        return None
+    if meta:
+        return dict(meta)
+    from comprehensive_eval_pro.policy import config
+
+    negative_ttl = config.get_setting("school_meta_negative_ttl", 600, env_name="CEP_SCHOOL_META_NEGATIVE_TTL")
+    return {} if cache.get(key, ttl=negative_ttl) is not None else None
+
+
+def store_school_meta(sso_base: str, username: str, meta: dict):
+    """写入内存缓存；落盘由 save_runtime_caches() 在预登录结束/退出时统一完成"""
+    cache = _school_meta_cache()
+    key = _school_meta_key(sso_base, username)
+    if cache is not None and key:
+        cache.set(key, dict(meta or {}), save=False)
+
 class ProAuthService:
     """
     专业的 SSO 认证服务 (精简独立版)
@@ -121,11 +163,24 @@ class ProAuthService:
             return False
 
     def get_school_meta(self, username: str) -> dict:
+        """
+        账号 -> 学校 {id, name}；结果持久化缓存 (runtime/cache/school_meta.json)，
+        服务端明确查无结果时做短期负缓存，网络/解析异常不缓存。
+        """
+        cached = get_cached_school_meta(self.sso_base, username)
+        if cached is not None:
+            return cached
+        meta = self._fetch_school_meta(username)
+        if meta is not None:
+            store_school_meta(self.sso_base, username, meta)
+        return meta or {}
+
+    def _fetch_school_meta(self, username: str) -> dict | None:
         url = f"{self.sso_base}/teacher/auth/studentLogin/getSchoolIdByStudentNumber?userName={username}"
         try:
             data = request_json(self.session, "POST", url, json={"key": ""}, headers=self.headers, timeout=10, logger=logger)
             if not isinstance(data, dict):
-                return {}
+                return None
             if data.get('code') == 1 and data.get('dataList'):
                 item = data['dataList'][0] if isinstance(data['dataList'], list) and data['dataList'] else {}
                 if not isinstance(item, dict):
@@ -143,7 +198,7 @@ class ProAuthService:
             return {}
         except Exception as e:
             logger.error(f"获取学校信息发生异常: {e}")
-            return {}
+            return None
 
     def get_school_id(self, username: str) -> str:
         """自动溯源学校 ID"""
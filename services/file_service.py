@@ -3,8 +3,10 @@ import logging
 import requests
 from typing import Optional
 
-from comprehensive_eval_pro.utils.http_client import request_json
-from comprehensive_eval_pro.utils.image_convert import cleanup_temp_file, ensure_jpg
+from comprehensive_eval_pro.utils.http_client import create_session, request_json
+from comprehensive_eval_pro.utils.image_cache import get_image_cache
+from comprehensive_eval_pro.utils.image_convert import cleanup_temp_file, compress_image, ensure_jpg
+from comprehensive_eval_pro.utils.image_prewarm import wait_for_prewarm
 
 logger = logging.getLogger("FileService")
 
@@ -14,10 +16,9 @@ class ProFileService:
     """
     def __init__(self, session: requests.Session = None, upload_url: str = None):
         # 图片服务器与业务服务器独立，实战证明不需要 Token
-        if session is None:
-            self.session = requests.Session()
-        else:
-            self.session = requests.Session()
+        # 不复用业务 Session 的 Header/Cookie，但共享其连接池
+        self.session = create_session(retries=0)
+        if session is not None:
             try:
                 self.session.proxies = getattr(session, "proxies", {})
                 self.session.verify = getattr(session, "verify", True)
@@ -38,7 +39,11 @@ class ProFileService:
             logger.error(f"图片不存在: {file_path}")
             return None
 
-        upload_path, cleanup = ensure_jpg(file_path)
+        # 按上传规格降采样并控制体积；无法解码时退回原始的 JPG 兜底转换
+        wait_for_prewarm(file_path)
+        upload_path, cleanup = compress_image(file_path, profile="upload", cache=get_image_cache())
+        if not upload_path:
+            upload_path, cleanup = ensure_jpg(file_path)
         try:
             logger.info(f"正在上传图片: {os.path.basename(upload_path)}")
             with open(upload_path, 'rb') as f:
@@ -8,6 +8,10 @@ import re
 import unicodedata
 import base64
 import json
+import copy
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 try:
     import fitz  # PyMuPDF
 except ImportError:
@@ -17,11 +21,20 @@ from comprehensive_eval_pro.services.content_gen import AIContentGenerator
 from comprehensive_eval_pro.services.file_service import ProFileService
 from comprehensive_eval_pro.utils.excel_parser import ExcelParser
 from comprehensive_eval_pro.utils.http_client import create_session, request_json, request_json_response
+from comprehensive_eval_pro.utils.tracing import span, traced
 
 logger = logging.getLogger("TaskManager")
 
 DEFAULT_TIMEOUT = 10
 
+
+def get_assets_dir() -> str:
+    """资源根目录：默认为项目根目录下的 assets，可通过 assets_dir / CEP_ASSETS_DIR 指向其他位置"""
+    from comprehensive_eval_pro.policy import config
+
+    default = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+    return config.get_setting("assets_dir", default, env_name="CEP_ASSETS_DIR", is_path=True) or default
+
 class ProTaskManager:
     """
     专业的任务管理与提交系统
@@ -76,6 +89,37 @@ class ProTaskManager:
         s = re.sub(r"\s+", "", s)
         return s.strip("._") or s
 
+    @staticmethod
+    def _decode_token_payload(token: str | None) -> dict:
+        """本地解码 JWT 载荷 (不校验签名)；非 JWT 格式返回空字典"""
+        token = (token or "").strip()
+        if token.count(".") != 2:
+            return {}
+        try:
+            payload_b64 = token.split(".", 2)[1]
+            payload_b64 += "=" * (-len(payload_b64) % 4)
+            payload_raw = base64.urlsafe_b64decode(payload_b64.encode("utf-8"))
+            payload = json.loads(payload_raw.decode("utf-8")) if payload_raw else {}
+        except Exception:
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def token_seconds_remaining(self, now: float | None = None) -> float | None:
+        """
+        根据 JWT 的 exp 计算 Token 剩余有效秒数；
+        非 JWT、缺少 exp 或 iat 晚于当前时间 (本机时钟异常) 时返回 None，需在线校验。
+        """
+        payload = self._decode_token_payload(self.token)
+        try:
+            exp = float(payload.get("exp"))
+        except (TypeError, ValueError):
+            return None
+        now = time.time() if now is None else now
+        iat = payload.get("iat")
+        if isinstance(iat, (int, float)) and iat > now + 300:
+            return None
+        return exp - now
+
     def _student_school_info(self) -> dict:
         info = self.user_info.get("studentSchoolInfo") if isinstance(self.user_info, dict) else {}
         return info if isinstance(info, dict) else {}
@@ -110,21 +154,13 @@ class ProTaskManager:
 
         # 3. 从 Token 找
         if not name:
-            token = (getattr(self, "token", None) or "").strip()
-            if token.count(".") == 2:
-                try:
-                    payload_b64 = token.split(".", 2)[1]
-                    payload_b64 += "=" * (-len(payload_b64) % 4)
-                    payload_raw = base64.urlsafe_b64decode(payload_b64.encode("utf-8"))
-                    payload = json.loads(payload_raw.decode("utf-8")) if payload_raw else {}
-                    if isinstance(payload, dict):
-                        info2 = payload.get("studentSchoolInfo") if isinstance(payload.get("studentSchoolInfo"), dict) else payload
-                        for k in possible_keys:
-                            if isinstance(info2, dict) and info2.get(k):
-                                name = str(info2[k]).strip()
-                                break
-                except Exception:
-                    pass
+            payload = self._decode_token_payload(getattr(self, "token", None))
+            if payload:
+                info2 = payload.get("studentSchoolInfo") if isinstance(payload.get("studentSchoolInfo"), dict) else payload
+                for k in possible_keys:
+                    if isinstance(info2, dict) and info2.get(k):
+                        name = str(info2[k]).strip()
+                        break
             
         # 4. 环境变量兜底
         if not name:
@@ -193,13 +229,12 @@ class ProTaskManager:
                 return pure
         return class_name
 
-    def _pick_image_path(self, sub_dir: str, task_name: str = "", base_assets_dir: str | None = None) -> str | None:
+    def _image_candidate_dirs(self, sub_dir: str, base_assets_dir: str | None = None) -> list[str]:
         """
-        根据任务类型子目录寻找一张随机图片，支持任务专项路径逻辑。
+        按优先级返回某任务类型的候选图片目录（不检查是否存在）。
         """
         if base_assets_dir is None:
-            current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            base_assets_dir = os.path.join(current_dir, "assets")
+            base_assets_dir = get_assets_dir()
         
         school_dir = self._sanitize_path_component(self._school_name())
         grade_dir = self._sanitize_path_component(self._grade_name())
@@ -221,8 +256,43 @@ class ProTaskManager:
                 
                 # 2. 次选：学校默认 (对劳动等任务作为兜底)
                 candidates.append(os.path.join(base_assets_dir, sub_dir, school_dir, "默认"))
+        return candidates
 
-        for target in candidates:
+    def collect_candidate_images(self, base_assets_dir: str | None = None) -> dict[str, list[str]]:
+        """
+        列出该账号在各专项任务中可能用到的全部图片 (劳动/军训/国旗下讲话/主题班会)，
+        供后台预转码使用。返回 {任务类型: [图片路径]}。
+        """
+        if base_assets_dir is None:
+            base_assets_dir = get_assets_dir()
+        school_dir = self._sanitize_path_component(self._school_name())
+        grade_dir = self._sanitize_path_component(self._grade_name())
+        class_dir = self._sanitize_path_component(self._pure_class_name())
+
+        out: dict[str, list[str]] = {}
+        for sub_dir in ("劳动", "军训", "国旗下讲话", "主题班会"):
+            if sub_dir == "主题班会":
+                # 班会资源包只认班级私有目录 (与 submit_task 一致)
+                targets = []
+                if school_dir and grade_dir and class_dir:
+                    targets.append(os.path.join(base_assets_dir, sub_dir, school_dir, grade_dir, class_dir))
+            else:
+                targets = self._image_candidate_dirs(sub_dir, base_assets_dir)
+            seen = set()
+            paths = []
+            for target in targets:
+                for p in self._list_images_recursive(target):
+                    if p not in seen:
+                        seen.add(p)
+                        paths.append(p)
+            out[sub_dir] = paths
+        return out
+
+    def _pick_image_path(self, sub_dir: str, task_name: str = "", base_assets_dir: str | None = None) -> str | None:
+        """
+        根据任务类型子目录寻找一张随机图片，支持任务专项路径逻辑。
+        """
+        for target in self._image_candidate_dirs(sub_dir, base_assets_dir):
             if not os.path.isdir(target):
                 continue
             
@@ -301,8 +371,7 @@ class ProTaskManager:
         class_dir = self._sanitize_path_component(clazz)
 
         if base_assets_dir is None:
-            current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            base_assets_dir = os.path.join(current_dir, "assets")
+            base_assets_dir = get_assets_dir()
 
         # 1. 国旗下讲话 (学校默认)
         gq_dir = os.path.join(base_assets_dir, "国旗下讲话", school_dir, "默认")
@@ -350,17 +419,36 @@ class ProTaskManager:
             print(f"  - {m}")
         print("!" * 60 + "\n")
 
-    def activate_session(self):
+    def _activation_cache(self):
+        """返回 (缓存, 键)；activation_cache_ttl <= 0 时禁用"""
+        from comprehensive_eval_pro.policy import config
+        from comprehensive_eval_pro.runtime_cache import get_runtime_cache
+
+        ttl = config.get_setting("activation_cache_ttl", 3600, env_name="CEP_ACTIVATION_CACHE_TTL")
+        if ttl <= 0 or not self.token:
+            return None, ""
+        key = hashlib.md5(f"{self.base_url}|{self.token}".encode("utf-8")).hexdigest()
+        return get_runtime_cache("activations", ttl), key
+
+    def activate_session(self, use_cache: bool = True):
         """
         深度激活业务 Session (获取菜单 + 获取学生基本信息)
+        激活结果按 Token 缓存 (activation_cache_ttl)：缓存有效时只重放 getMyInfo，
+        且身份 (学校/年级/班级) 未变化时跳过资源目录创建与资源预警扫描。
         """
+        cache, cache_key = self._activation_cache()
+        cached = cache.get(cache_key) if (cache and use_cache) else None
+        if not isinstance(cached, dict):
+            cached = None
         try:
-            # 1. 模拟首页访问，初始化后端 Session 上下文
-            self.session.get(f"{self.base_url}/", timeout=DEFAULT_TIMEOUT)
-            
-            # 2. 模拟菜单点击
-            menu_url = f"{self.base_url}/api/studentInfo/getMenu"
-            menu_data, menu_resp = request_json_response(self.session, "GET", menu_url, timeout=DEFAULT_TIMEOUT, logger=logger)
+            menu_data = None
+            if cached is None:
+                # 1. 模拟首页访问，初始化后端 Session 上下文
+                self.session.get(f"{self.base_url}/", timeout=DEFAULT_TIMEOUT)
+
+                # 2. 模拟菜单点击
+                menu_url = f"{self.base_url}/api/studentInfo/getMenu"
+                menu_data, menu_resp = request_json_response(self.session, "GET", menu_url, timeout=DEFAULT_TIMEOUT, logger=logger)
             
             # 3. 模拟获取学生信息
             info_url = f"{self.base_url}/api/studentInfo/getMyInfo"
@@ -379,16 +467,28 @@ class ProTaskManager:
                     for k, v in m_data.items():
                         if v and not self.user_info.get(k):
                             self.user_info[k] = v
+                elif cached is not None:
+                    for k, v in (cached.get("user_info") or {}).items():
+                        if v and not self.user_info.get(k):
+                            self.user_info[k] = copy.deepcopy(v)
 
                 # 更新姓名显示
                 self.student_name = self.user_info.get('NAME') or self.user_info.get('realName') or self.user_info.get('studentName') or '未知'
                 
                 logger.info(f"业务 Session 激活成功，当前学生: {self.student_name} ({self._school_name()})")
                 
-                # 确保基础资源目录结构存在
-                self._ensure_resource_dirs()
-                
-                self.print_resource_setup_hints()
+                identity = [self._school_name(), self._grade_name(), self._pure_class_name()]
+                if cached is not None and cached.get("identity") == identity:
+                    logger.debug("账号身份未变化，跳过资源目录检查")
+                else:
+                    # 确保基础资源目录结构存在
+                    self._ensure_resource_dirs()
+                    
+                    self.print_resource_setup_hints()
+
+                if cache:
+                    # 预登录阶段逐个账号激活，结束后由 save_runtime_caches() 统一写回
+                    cache.set(cache_key, {"user_info": copy.deepcopy(self.user_info), "identity": identity}, save=False)
                 return True
         except Exception as e:
             logger.error(f"Session 激活失败: {e}")
@@ -414,7 +514,7 @@ class ProTaskManager:
         grade_dir = self._sanitize_path_component(grade)
         class_dir = self._sanitize_path_component(clazz)
 
-        base_assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+        base_assets_dir = get_assets_dir()
         task_types = ["劳动", "军训", "主题班会", "国旗下讲话"]
         
         for tt in task_types:
@@ -437,10 +537,9 @@ class ProTaskManager:
         grade_dir = self._sanitize_path_component(self._grade_name())
         class_dir = self._sanitize_path_component(self._pure_class_name())
         
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         meeting_candidates = []
         if school_dir and grade_dir and class_dir:
-            meeting_candidates.append(os.path.join(current_dir, "assets", "主题班会", school_dir, grade_dir, class_dir))
+            meeting_candidates.append(os.path.join(get_assets_dir(), "主题班会", school_dir, grade_dir, class_dir))
         
         all_folders = []
         for cand_root in meeting_candidates:
@@ -453,6 +552,39 @@ class ProTaskManager:
                     pass
         return all_folders
 
+    def resource_signature(self) -> tuple:
+        """
+        资源目录指纹：各候选目录及其直接子目录的 mtime。
+        资源包/图片增删、改名时随之变化，用于判断资源体检结果是否需要重算；
+        原地覆盖写入已有文件不会改变目录 mtime，不在检测范围内。
+        """
+        dirs = []
+        for sub in ("劳动", "军训", "国旗下讲话"):
+            dirs.extend(self._image_candidate_dirs(sub))
+        school_dir = self._sanitize_path_component(self._school_name())
+        grade_dir = self._sanitize_path_component(self._grade_name())
+        class_dir = self._sanitize_path_component(self._pure_class_name())
+        if school_dir and grade_dir and class_dir:
+            dirs.append(os.path.join(get_assets_dir(), "主题班会", school_dir, grade_dir, class_dir))
+
+        signature = []
+        for d in dirs:
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                signature.append((d, None, ()))
+                continue
+            children = []
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            children.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns))
+            except OSError:
+                pass
+            signature.append((d, mtime, tuple(sorted(children))))
+        return tuple(signature)
+
     def check_resource_health(self) -> dict[str, bool]:
         """
         检查当前账号各维度资源的健康状况
@@ -466,21 +598,20 @@ class ProTaskManager:
         }
 
         # 检查班会 (图 + 记录)
-        # 复用匹配逻辑寻找班会文件夹
-        from comprehensive_eval_pro.utils.record_parser import extract_first_record_text
+        # 复用匹配逻辑寻找班会文件夹；记录只探测文件是否存在，不做全文解析
+        from comprehensive_eval_pro.utils.record_parser import has_record_file
         
         # 模拟一个通用的班会任务名进行探测
         dummy_task_name = "主题班会"
         
         # 确定资源目录优先级 (与 submit_task 保持一致)
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         school_dir = self._sanitize_path_component(self._school_name())
         grade_dir = self._sanitize_path_component(self._grade_name())
         class_dir = self._sanitize_path_component(self._pure_class_name())
         
         meeting_candidates = []
         if school_dir and grade_dir and class_dir:
-            meeting_candidates.append(os.path.join(current_dir, "assets", "主题班会", school_dir, grade_dir, class_dir))
+            meeting_candidates.append(os.path.join(get_assets_dir(), "主题班会", school_dir, grade_dir, class_dir))
 
         # 只要能在任何候选目录下找到任何有效的班会资源包即可
         for cand_root in meeting_candidates:
@@ -501,8 +632,7 @@ class ProTaskManager:
                     
                     # 检查是否有记录
                     if not results["class_meeting_record"]:
-                        content, _ = extract_first_record_text(item_path)
-                        if content:
+                        if has_record_file(item_path):
                             results["class_meeting_record"] = True
                     
                     if results["class_meeting_img"] and results["class_meeting_record"]:
@@ -583,89 +713,244 @@ class ProTaskManager:
 
         return False
 
+    def _dimension_cache_key(self) -> str:
+        """维度列表对同一学校的所有学生一致：以 base_url + 学校 ID (或校名) 为键"""
+        school = str(self._student_school_info().get("schoolId") or "").strip() or self._school_name()
+        if not school:
+            return ""
+        return f"{self.base_url}|{school}"
+
+    def _load_dimensions(self, use_cache: bool = True) -> list[dict]:
+        """
+        获取清洗后的维度列表 [{"id", "name"}] 并填充 dimension_map。
+        命中学校级缓存 (内存 + runtime/cache/dimensions.json) 时跳过 getDimensions 请求。
+        """
+        from comprehensive_eval_pro.policy import config
+        from comprehensive_eval_pro.runtime_cache import get_runtime_cache
+
+        ttl = config.get_setting("dimension_cache_ttl", 86400, env_name="CEP_DIMENSION_CACHE_TTL")
+        cache = get_runtime_cache("dimensions", ttl)
+        cache_key = self._dimension_cache_key() if ttl > 0 else ""
+
+        if use_cache and cache_key:
+            cached = cache.get(cache_key, ttl=ttl)
+            if isinstance(cached, list) and cached:
+                for d in cached:
+                    self.dimension_map[str(d.get("id"))] = d.get("name") or f"维度{d.get('id')}"
+                logger.debug(f"命中学校维度缓存: {cache_key} ({len(cached)} 个维度)")
+                return [dict(d) for d in cached]
+
+        dim_url = f"{self.base_url}/api/studentCircleNew/getDimensions"
+        dim_res = request_json(self.session, "GET", dim_url, timeout=DEFAULT_TIMEOUT, logger=logger)
+        dimensions = []
+        if isinstance(dim_res, dict) and dim_res.get('code') == 1:
+            dimensions = dim_res.get('dataList') or dim_res.get('data') or []
+        
+        # 建立维度映射
+        cleaned_dimensions = []
+        for d in dimensions:
+            if not isinstance(d, dict):
+                continue
+            raw_id = d.get("id") or d.get("dimensionId")
+            if raw_id is None:
+                continue
+            d_id = str(raw_id).strip()
+            if not d_id or d_id.lower() == "none":
+                continue
+            d_name = d.get('name') or d.get('dimensionName') or f"维度{d_id}"
+            self.dimension_map[d_id] = d_name
+            cleaned_dimensions.append({"id": d_id, "name": d_name})
+
+        if cache_key and cleaned_dimensions:
+            cache.set(cache_key, cleaned_dimensions)
+        return cleaned_dimensions
+
+    def _fetch_dimension_tasks(self, d_id: str) -> list[dict] | None:
+        """获取单个维度下的任务列表；请求失败时返回 None (与“该维度没有任务”区分)"""
+        d_name = self.dimension_map.get(d_id, f"维度{d_id}")
+        url = f"{self.base_url}/api/studentCircleNew/getCircleStatistics?dimensionId={d_id}"
+        try:
+            res = request_json(self.session, "GET", url, timeout=DEFAULT_TIMEOUT, logger=logger)
+            if isinstance(res, dict) and res.get('code') == 1:
+                data = res.get('data', {}) or {}
+                tasks = data.get('taskList') or res.get('dataList') or []
+                return [t for t in tasks if isinstance(t, dict)]
+            logger.debug(f"维度 {d_id} ({d_name}) 扫描失败: {res}")
+        except Exception as e:
+            logger.debug(f"维度 {d_id} ({d_name}) 扫描跳过: {e}")
+        return None
+
+    def _fetch_dimensions_concurrently(self, dim_ids: list[str]) -> list[list[dict] | None]:
+        """
+        并发拉取多个维度的任务，结果顺序与 dim_ids 一一对应；拉取失败的维度为 None。
+        """
+        if not dim_ids:
+            return []
+        from comprehensive_eval_pro.policy import config
+
+        workers = config.get_setting("dimension_scan_workers", 4, env_name="CEP_DIMENSION_SCAN_WORKERS")
+        workers = max(1, min(int(workers or 1), len(dim_ids)))
+        if workers == 1:
+            return [self._fetch_dimension_tasks(d_id) for d_id in dim_ids]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cep-dim-scan") as pool:
+            return list(pool.map(self._fetch_dimension_tasks, dim_ids))
+
+    def _scan_dimensions(self, use_cache: bool = True) -> tuple[list[str], list[list[dict] | None]]:
+        """
+        拉取维度列表并并发扫描各维度，返回 (维度 ID 列表, 对应的原始任务列表，失败的维度为 None)。
+        """
+        # 1. 获取真实维度列表并建立映射 (同校账号共享缓存)
+        dimensions = self._load_dimensions(use_cache=use_cache)
+
+        if not dimensions:
+            # 兜底常用维度
+            dimensions = [{"id": i} for i in range(1, 16)]
+        
+        logger.info(f"开始扫描 {len(dimensions)} 个业务维度...")
+
+        # 2. 并发获取各维度任务 (有界线程池)，结果顺序与维度顺序一致
+        dim_ids = []
+        for dim in dimensions:
+            raw_id = dim.get("id") or dim.get("dimensionId")
+            if raw_id is None:
+                continue
+            d_id = str(raw_id).strip()
+            if not d_id or d_id.lower() == "none":
+                continue
+            dim_ids.append(d_id)
+        return dim_ids, self._fetch_dimensions_concurrently(dim_ids)
+
+    def _merge_dimension_tasks(self, dim_ids: list[str], results: list[list[dict] | None]) -> list[dict]:
+        """按维度原始顺序合并并按任务 ID 去重，保证结果确定"""
+        all_tasks = []
+        task_ids = set()
+        for d_id, tasks in zip(dim_ids, results):
+            d_name = self.dimension_map.get(d_id, f"维度{d_id}")
+            for t in tasks or []:
+                if t.get('id') not in task_ids:
+                    t['dimensionId'] = d_id
+                    t['dimensionName'] = d_name # 注入维度名称
+                    all_tasks.append(t)
+                    task_ids.add(t.get('id'))
+        return all_tasks
+
+    def _fetch_fallback_tasks(self) -> list[dict]:
+        """兜底扫描：直接调用 getCircleTask"""
+        all_tasks = []
+        task_ids = set()
+        try:
+            task_url = f"{self.base_url}/api/studentCircleNew/getCircleTask"
+            res = request_json(self.session, "GET", task_url, timeout=DEFAULT_TIMEOUT, logger=logger)
+            if isinstance(res, dict) and res.get('code') == 1:
+                data = res.get('data') or {}
+                tasks = res.get('dataList') or data.get('taskList') or []
+                for t in tasks:
+                    if t.get('id') not in task_ids:
+                        all_tasks.append(t)
+                        task_ids.add(t.get('id'))
+        except Exception as e:
+            logger.debug(f"兜底任务扫描跳过: {e}")
+        return all_tasks
+
+    @traced("ProTaskManager.get_all_tasks")
     def get_all_tasks(self, force_refresh: bool = False):
         """
         全方位扫描任务
         """
         if force_refresh:
-            self.activate_session()
+            self.activate_session(use_cache=False)
         
         all_tasks = []
-        task_ids = set()
-
         try:
-            # 1. 获取真实维度列表并建立映射
-            dim_url = f"{self.base_url}/api/studentCircleNew/getDimensions"
-            dim_res = request_json(self.session, "GET", dim_url, timeout=DEFAULT_TIMEOUT, logger=logger)
-            dimensions = []
-            if isinstance(dim_res, dict) and dim_res.get('code') == 1:
-                dimensions = dim_res.get('dataList') or dim_res.get('data') or []
-            
-            # 建立维度映射
-            cleaned_dimensions = []
-            for d in dimensions:
-                raw_id = d.get("id") or d.get("dimensionId")
-                if raw_id is None:
-                    continue
-                d_id = str(raw_id).strip()
-                if not d_id or d_id.lower() == "none":
-                    continue
-                d_name = d.get('name') or d.get('dimensionName') or f"维度{d_id}"
-                self.dimension_map[d_id] = d_name
-                cleaned_dimensions.append(d)
-            dimensions = cleaned_dimensions
-
-            if not dimensions:
-                # 兜底常用维度
-                dimensions = [{"id": i} for i in range(1, 16)]
-            
-            logger.info(f"开始扫描 {len(dimensions)} 个业务维度...")
-
-            # 2. 遍历维度获取任务
-            for dim in dimensions:
-                raw_id = dim.get("id") or dim.get("dimensionId")
-                if raw_id is None:
-                    continue
-                d_id = str(raw_id).strip()
-                if not d_id or d_id.lower() == "none":
-                    continue
-                d_name = self.dimension_map.get(d_id, f"维度{d_id}")
-                
-                url = f"{self.base_url}/api/studentCircleNew/getCircleStatistics?dimensionId={d_id}"
-                try:
-                    res = request_json(self.session, "GET", url, timeout=DEFAULT_TIMEOUT, logger=logger)
-                    if isinstance(res, dict) and res.get('code') == 1:
-                        data = res.get('data', {}) or {}
-                        tasks = data.get('taskList') or res.get('dataList') or []
-                        for t in tasks:
-                            if t.get('id') not in task_ids:
-                                t['dimensionId'] = d_id
-                                t['dimensionName'] = d_name # 注入维度名称
-                                all_tasks.append(t)
-                                task_ids.add(t.get('id'))
-                except Exception as e:
-                    logger.debug(f"维度 {d_id} ({d_name}) 扫描跳过: {e}")
+            dim_ids, results = self._scan_dimensions(use_cache=not force_refresh)
+            all_tasks = self._merge_dimension_tasks(dim_ids, results)
 
             # 3. 兜底扫描：直接调用 getCircleTask
             if not all_tasks:
-                try:
-                    task_url = f"{self.base_url}/api/studentCircleNew/getCircleTask"
-                    res = request_json(self.session, "GET", task_url, timeout=DEFAULT_TIMEOUT, logger=logger)
-                    if isinstance(res, dict) and res.get('code') == 1:
-                        data = res.get('data') or {}
-                        tasks = res.get('dataList') or data.get('taskList') or []
-                        for t in tasks:
-                            if t.get('id') not in task_ids:
-                                all_tasks.append(t)
-                                task_ids.add(t.get('id'))
-                except Exception as e:
-                    logger.debug(f"兜底任务扫描跳过: {e}")
+                all_tasks = self._fetch_fallback_tasks()
 
         except Exception as e:
             logger.error(f"全方位扫描发生异常: {e}")
 
         return all_tasks
 
+    def _task_snapshot_cache(self, account_key: str):
+        from comprehensive_eval_pro.runtime_cache import get_runtime_cache
+
+        digest = hashlib.md5(f"{self.base_url}|{account_key}".encode("utf-8")).hexdigest()
+        return get_runtime_cache(f"task_snapshots/{digest}", -1)
+
+    @traced("ProTaskManager.load_tasks")
+    def load_tasks(self, account_key: str, rescan: bool = False) -> list[dict]:
+        """
+        带快照的任务加载 (runtime/cache/task_snapshots/)：
+        - 快照未过期：直接复用，仅重新拉取被标记为“已变更”的维度 (本账号刚提交过任务的维度)；
+          拉取失败的维度保留旧任务并继续标记为已变更，下次加载时重试
+        - 快照过期、不存在或 rescan=True：完整扫描并写入新快照
+        """
+        from comprehensive_eval_pro.policy import config
+
+        ttl = config.get_setting("task_snapshot_ttl", 1800, env_name="CEP_TASK_SNAPSHOT_TTL")
+        cache = self._task_snapshot_cache(account_key)
+        snap = None if (rescan or ttl <= 0) else cache.get("snapshot")
+        if isinstance(snap, dict) and time.time() - float(snap.get("scanned_at") or 0) <= ttl:
+            snap = copy.deepcopy(snap)
+            for d_id, d_name in (snap.get("names") or {}).items():
+                self.dimension_map.setdefault(d_id, d_name)
+            dims = [(str(d_id), tasks) for d_id, tasks in (snap.get("dims") or [])]
+            dirty = [d_id for d_id, _ in dims if d_id in set(snap.get("dirty") or [])]
+            if dirty:
+                logger.info(f"任务快照增量刷新: {len(dirty)}/{len(dims)} 个维度")
+                fresh = dict(zip(dirty, self._fetch_dimensions_concurrently(dirty)))
+                dims = [(d_id, tasks if fresh.get(d_id) is None else fresh[d_id]) for d_id, tasks in dims]
+                snap["dims"] = [[d_id, tasks] for d_id, tasks in dims]
+                snap["dirty"] = [d_id for d_id in dirty if fresh.get(d_id) is None]
+                cache.set("snapshot", copy.deepcopy(snap))
+            else:
+                logger.info("命中任务快照，跳过全量扫描")
+            tasks = self._merge_dimension_tasks([d for d, _ in dims], [t for _, t in dims])
+            if tasks or snap.get("fallback"):
+                return tasks or snap.get("fallback") or []
+
+        all_tasks = []
+        fallback = []
+        try:
+            dim_ids, results = self._scan_dimensions(use_cache=not rescan)
+            all_tasks = self._merge_dimension_tasks(dim_ids, results)
+            if not all_tasks:
+                fallback = self._fetch_fallback_tasks()
+        except Exception as e:
+            logger.error(f"全方位扫描发生异常: {e}")
+            return all_tasks
+
+        if all_tasks or fallback:
+            cache.set("snapshot", copy.deepcopy({
+                "scanned_at": time.time(),
+                "dims": [[d_id, tasks or []] for d_id, tasks in zip(dim_ids, results)],
+                "names": {d_id: self.dimension_map.get(d_id, f"维度{d_id}") for d_id in dim_ids},
+                "fallback": fallback,
+                "dirty": [d_id for d_id, tasks in zip(dim_ids, results) if tasks is None],
+            }))
+        return all_tasks or fallback
+
+    def mark_tasks_submitted(self, account_key: str, tasks: list[dict]):
+        """
+        标记快照中这些任务所在维度需要刷新；无维度信息的任务直接作废整个快照。
+        """
+        cache = self._task_snapshot_cache(account_key)
+        snap = cache.get("snapshot")
+        if not isinstance(snap, dict):
+            return
+        dirty = set(snap.get("dirty") or [])
+        for t in tasks:
+            d_id = str((t or {}).get("dimensionId") or "").strip()
+            if not d_id:
+                cache.delete("snapshot")
+                return
+            dirty.add(d_id)
+        snap["dirty"] = sorted(dirty)
+        cache.set("snapshot", snap)
+
     def _extract_date(self, text):
         """
         从文本中提取日期模式 (如 9.8, 09.08, 2025.9.8)
@@ -869,6 +1154,7 @@ class ProTaskManager:
             return 2.0
         return 0.5
 
+    @traced("ProTaskManager.submit_task")
     def submit_task(
         self,
         task,
@@ -889,10 +1175,11 @@ class ProTaskManager:
         dim_name = task.get("dimensionName") or ""
 
         # 1. 识别任务类型
-        is_flag_speech = "国旗下讲话" in task_name
-        is_labor_task = self._is_labor_task(task_name)
-        is_military_task = "军训" in task_name
-        is_class_meeting = self._looks_like_class_meeting(task_name, dim_name)
+        with span("submit.classify", task=task_name):
+            is_flag_speech = "国旗下讲话" in task_name
+            is_labor_task = self._is_labor_task(task_name)
+            is_military_task = "军训" in task_name
+            is_class_meeting = self._looks_like_class_meeting(task_name, dim_name)
         
         # 2. 获取附件与内容
         attachment_ids = list(attachment_ids_override) if isinstance(attachment_ids_override, list) else []
@@ -901,9 +1188,6 @@ class ProTaskManager:
         upload_paths = []
         xls_content = ""
         
-        # 确定资源目录
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
         if is_flag_speech:
             target_sub_dir = "国旗下讲话"
         elif is_labor_task:
@@ -924,14 +1208,15 @@ class ProTaskManager:
             # 3. 根目录 (兼容旧版)
             meeting_candidates = []
             if school_dir and grade_dir and class_dir:
-                meeting_candidates.append(os.path.join(current_dir, "assets", "主题班会", school_dir, grade_dir, class_dir))
+                meeting_candidates.append(os.path.join(get_assets_dir(), "主题班会", school_dir, grade_dir, class_dir))
 
             matched_folder = None
-            for cand_root in meeting_candidates:
-                if os.path.isdir(cand_root):
-                    matched_folder = self._find_best_matching_folder(task_name, cand_root)
-                    if matched_folder:
-                        break
+            with span("submit.match", task=task_name):
+                for cand_root in meeting_candidates:
+                    if os.path.isdir(cand_root):
+                        matched_folder = self._find_best_matching_folder(task_name, cand_root)
+                        if matched_folder:
+                            break
             
             if matched_folder:
                 logger.info(f"✅ 班会任务【{task_name}】智能匹配到资源包: {os.path.basename(matched_folder)}")
@@ -943,7 +1228,8 @@ class ProTaskManager:
                     chosen_img_path = random.choice(imgs)
                     logger.info(f"📸 已从资源包随机抽取照片: {os.path.basename(chosen_img_path)}")
                     if not dry_run:
-                        img_id = self.file_service.upload_image(chosen_img_path)
+                        with span("submit.upload", task=task_name):
+                            img_id = self.file_service.upload_image(chosen_img_path)
                         if img_id: attachment_ids.append(img_id)
                     else:
                         attachment_ids.append(888888) # 预览 ID
@@ -961,12 +1247,13 @@ class ProTaskManager:
                             logger.info(f"🚀 [霸道缓存] 命中全校共享解析结果: {cache_key}")
                         else:
                             from comprehensive_eval_pro.utils.record_parser import extract_first_record_text
-                            xls_content, used_file = extract_first_record_text(matched_folder)
-                            
-                            # 逻辑触发：如果返回的是 PDF 占位符或者为空，则触发真正的视觉 OCR
-                            if not xls_content or xls_content == "[PDF记录: 待视觉解析]":
-                                logger.info(f"未发现文本记录文件或仅发现 PDF，尝试视觉解析...")
-                                xls_content = self._get_content_from_pdf_via_ocr(matched_folder, task_name, ai_generator)
+                            with span("submit.parse", task=task_name):
+                                xls_content, used_file = extract_first_record_text(matched_folder)
+                                
+                                # 逻辑触发：如果返回的是 PDF 占位符或者为空，则触发真正的视觉 OCR
+                                if not xls_content or xls_content == "[PDF记录: 待视觉解析]":
+                                    logger.info(f"未发现文本记录文件或仅发现 PDF，尝试视觉解析...")
+                                    xls_content = self._get_content_from_pdf_via_ocr(matched_folder, task_name, ai_generator)
                             
                             if xls_content:
                                 self._GLOBAL_RECORD_CACHE[cache_key] = xls_content
@@ -979,10 +1266,12 @@ class ProTaskManager:
 
         # 通用图片挂载 (针对专项任务)
         if not attachment_ids and (not is_class_meeting) and target_sub_dir:
-            chosen_img_path = self._pick_image_path(target_sub_dir, task_name=task_name)
+            with span("submit.match", task=task_name):
+                chosen_img_path = self._pick_image_path(target_sub_dir, task_name=task_name)
             if chosen_img_path:
                 if not dry_run:
-                    img_id = self.file_service.upload_image(chosen_img_path)
+                    with span("submit.upload", task=task_name):
+                        img_id = self.file_service.upload_image(chosen_img_path)
                     if img_id:
                         attachment_ids.append(img_id)
                         logger.info(f"成功为任务【{task_name}】挂载图片附件 ID: {img_id}")
@@ -995,17 +1284,18 @@ class ProTaskManager:
         if content_override is not None:
             content = str(content_override)
         else:
-            if is_labor_task and chosen_img_path:
-                content = ai_generator.generate_labor_content(chosen_img_path, task_name, use_cache=use_cache, school_name=school_name)
-            elif is_military_task:
-                content = ai_generator.generate_military_content(task_name, use_cache=use_cache, school_name=school_name)
-            elif is_class_meeting:
-                if xls_content:
-                    content = ai_generator.generate_class_meeting_content(xls_content, task_name, use_cache=use_cache, school_name=school_name)
+            with span("submit.generate", task=task_name):
+                if is_labor_task and chosen_img_path:
+                    content = ai_generator.generate_labor_content(chosen_img_path, task_name, use_cache=use_cache, school_name=school_name)
+                elif is_military_task:
+                    content = ai_generator.generate_military_content(task_name, use_cache=use_cache, school_name=school_name)
+                elif is_class_meeting:
+                    if xls_content:
+                        content = ai_generator.generate_class_meeting_content(xls_content, task_name, use_cache=use_cache, school_name=school_name)
+                    else:
+                        content = ai_generator.generate_speech_content(task_name, use_cache=use_cache, school_name=school_name)
                 else:
                     content = ai_generator.generate_speech_content(task_name, use_cache=use_cache, school_name=school_name)
-            else:
-                content = ai_generator.generate_speech_content(task_name, use_cache=use_cache, school_name=school_name)
             
         if not content:
             content = f"在{school_name}参加了{task_name}活动，收获颇丰。"
@@ -1065,7 +1355,9 @@ class ProTaskManager:
 
         try:
             url = f"{self.base_url}/api/studentCircleNew/addCircle"
-            res = request_json(self.session, "POST", url, json=payload, timeout=20, logger=logger)
+            with span("submit.post", task=task_name) as sp:
+                res = request_json(self.session, "POST", url, json=payload, timeout=20, logger=logger)
+                sp.set(code=res.get("code") if isinstance(res, dict) else None)
             return res if isinstance(res, dict) else {"code": 0, "msg": "提交失败：响应解析异常"}
         except Exception as e:
             return {"code": 0, "msg": f"提交异常: {e}"}
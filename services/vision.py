@@ -5,7 +5,10 @@ import threading
 from typing import List, Optional, Union, Any
 
 from ..policy import config
+from comprehensive_eval_pro.utils.image_cache import get_image_cache
 from comprehensive_eval_pro.utils.image_convert import compress_image, cleanup_temp_file
+from comprehensive_eval_pro.utils.image_prewarm import wait_for_prewarm
+from comprehensive_eval_pro.utils.tracing import traced
 
 logger = logging.getLogger("VisionService")
 
@@ -57,6 +60,7 @@ class VisionService:
         with open(image_path, "rb") as f:
             return base64.b64encode(f.read()).decode("utf-8")
 
+    @traced("VisionService.see")
     def see(
         self,
         image_source: Union[str, bytes, List[Union[str, bytes]]],
@@ -64,13 +68,14 @@ class VisionService:
         engine: str = "auto",
         prompt: Optional[str] = None,
         model: Optional[str] = None,
-        max_size_mb: float = 1.0,
+        max_size_mb: Optional[float] = None,
         timeout: int = 60
     ) -> str:
         """
         统一视觉接口
         :param image_source: 图片路径、字节流或其列表
         :param task_type: 'ocr' 或 'analysis'
+        :param max_size_mb: 显式传入时覆盖图片规格 (ocr/vision) 的体积预算
         """
         sources = image_source if isinstance(image_source, list) else [image_source]
         processed_paths = []
@@ -93,12 +98,19 @@ class VisionService:
                         cleanup = True
                     else:
                         temp_p = src
+                        wait_for_prewarm(temp_p)
 
                     if not temp_p or not os.path.exists(temp_p):
                         logger.warning(f"图片路径无效，跳过: {temp_p}")
                         continue
 
-                    proc_p, comp_cleanup = compress_image(temp_p, max_size_mb=max_size_mb, is_captcha=is_captcha)
+                    proc_p, comp_cleanup = compress_image(
+                        temp_p,
+                        max_size_mb=max_size_mb,
+                        is_captcha=is_captcha,
+                        profile="ocr" if task_type == "ocr" else "vision",
+                        cache=None if cleanup else get_image_cache(),
+                    )
                     if not proc_p:
                         logger.warning(f"图片预处理失败（可能损坏），跳过该图片: {temp_p}")
                         if cleanup: cleanup_temp_file(temp_p, True)
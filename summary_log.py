@@ -1,11 +1,170 @@
+import atexit
 import datetime as _dt
+import logging
 import os
+import queue
 import threading
+import time
+from collections import OrderedDict
 
 from .policy import config
 
-# 全局线程锁，确保日志写入的原子性
-_log_lock = threading.Lock()
+logger = logging.getLogger("SummaryLog")
+
+_STOP = object()
+
+
+def _get_max_open_files() -> int:
+    try:
+        return max(1, int(config.get_setting("summary_log_max_open_files", 64, env_name="CEP_SUMMARY_LOG_MAX_OPEN_FILES")))
+    except (TypeError, ValueError):
+        return 64
+
+
+def _get_flush_interval() -> float:
+    try:
+        return max(0.05, float(config.get_setting("summary_log_flush_interval", 1.0, env_name="CEP_SUMMARY_LOG_FLUSH_INTERVAL")))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class SummaryWriter:
+    """
+    汇总日志的后台写线程：append_summary 只把 (路径, 行) 放进队列，由单个线程按顺序落盘。
+    按目标路径缓存打开的文件句柄 (LRU，超过上限时关闭最久未用的)，
+    每 flush_interval 秒及进程退出时 flush；flush() 同步等待已入队的行全部写完。
+    """
+
+    def __init__(self, max_open_files: int | None = None, flush_interval: float | None = None):
+        self.max_open_files = max_open_files
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._handles: "OrderedDict[str, object]" = OrderedDict()
+        self._dirs: set[str] = set()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_started_locked(self):
+        if self._thread is not None:
+            return
+        if self.max_open_files is None:
+            self.max_open_files = _get_max_open_files()
+        if self.flush_interval is None:
+            self.flush_interval = _get_flush_interval()
+        # 每个写线程使用自己的队列，已停止的线程不会与新线程争抢同一队列
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(self._queue,), name="cep-summary-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: str, line: str):
+        with self._lock:
+            self._ensure_started_locked()
+            self._queue.put((path, line))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        同步落盘：等待此前入队的行全部写入并关闭缓存的文件句柄 (便于随后读取或删除日志目录)。
+        超时返回 False。
+        """
+        with self._lock:
+            if self._thread is None:
+                return True
+            done = threading.Event()
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 5.0):
+        """写完队列中剩余的行后停止写线程；之后再写入会自动重启"""
+        with self._lock:
+            # 持锁入队 _STOP 并等待退出：期间的 write() 会等到旧线程结束后再启动新线程
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _open(self, path: str):
+        fh = self._handles.get(path)
+        if fh is not None:
+            self._handles.move_to_end(path)
+            return fh
+        target_dir = os.path.dirname(path)
+        if target_dir not in self._dirs:
+            os.makedirs(target_dir, exist_ok=True)
+            self._dirs.add(target_dir)
+        try:
+            fh = open(path, "a", encoding="utf-8")
+        except FileNotFoundError:
+            # 目录在运行期间被删除
+            os.makedirs(target_dir, exist_ok=True)
+            fh = open(path, "a", encoding="utf-8")
+        self._handles[path] = fh
+        while len(self._handles) > self.max_open_files:
+            _, old = self._handles.popitem(last=False)
+            self._close_handle(old)
+        return fh
+
+    @staticmethod
+    def _close_handle(fh):
+        try:
+            fh.close()
+        except OSError as e:
+            logger.error(f"关闭汇总日志失败: {e}")
+
+    def _flush_all(self, close: bool = False):
+        for path, fh in list(self._handles.items()):
+            try:
+                fh.flush()
+            except OSError as e:
+                logger.error(f"写入汇总日志失败 ({path}): {e}")
+            if close:
+                self._close_handle(fh)
+        if close:
+            self._handles.clear()
+            self._dirs.clear()
+
+    def _run(self, q: queue.Queue):
+        dirty = False
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush_all(close=True)
+                return
+            if isinstance(item, threading.Event):
+                self._flush_all(close=True)
+                dirty = False
+                item.set()
+                continue
+            if item is not None:
+                path, line = item
+                try:
+                    self._open(path).write(line)
+                    dirty = True
+                except OSError as e:
+                    logger.error(f"写入汇总日志失败 ({path}): {e}")
+            if dirty and time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_all()
+                dirty = False
+                last_flush = time.monotonic()
+
+
+_writer = SummaryWriter()
+
+
+def flush_summaries(timeout: float | None = None) -> bool:
+    """同步写出所有已提交的汇总日志 (测试与运行结束时使用)"""
+    return _writer.flush(timeout)
+
+
+def close_summary_writer(timeout: float | None = 5.0):
+    _writer.close(timeout)
+
+
+atexit.register(close_summary_writer)
 
 
 def _safe_filename(name: str) -> str:
@@ -72,7 +231,6 @@ def append_summary(
     
     target_dir = os.path.join(root_log_dir, school_name, grade_name, class_name)
     target_dir = os.path.expandvars(os.path.expanduser(target_dir))
-    os.makedirs(target_dir, exist_ok=True)
 
     # 2. 准备彩色日志行 (使用 ANSI 转义码，Windows 10+ 原生支持，也可配合 colorama)
     # 颜色定义
@@ -100,8 +258,5 @@ def append_summary(
         line += f" | {C_MSG}{m}{C_RESET}"
     line += "\n"
 
-    path = os.path.join(target_dir, f"{_safe_filename(username)}.log")
-    with _log_lock:
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(line)
+    _writer.write(os.path.join(target_dir, f"{_safe_filename(username)}.log"), line)
 
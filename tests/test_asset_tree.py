@@ -0,0 +1,62 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.benchmarks.asset_tree import generate_asset_tree
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+
+
+class TestSyntheticAssetTree(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="cep_asset_tree_")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_generated_tree_passes_audit_and_health_check(self):
+        tree = generate_asset_tree(
+            self.root,
+            schools=2,
+            grades=2,
+            classes=3,
+            packages_per_class=5,
+            labor_folders_per_class=2,
+            record_types=("xlsx", "txt", "pdf"),
+        )
+        self.assertEqual(len(tree["classes"]), 12)
+        self.assertEqual(tree["packages"], 60)
+
+        for info in tree["user_infos"][:3]:
+            mgr = ProTaskManager("", user_info=info, base_url="http://example.test")
+            self.assertEqual(mgr.audit_resources(base_assets_dir=self.root), [])
+            with mock.patch.dict(os.environ, {"CEP_ASSETS_DIR": self.root}):
+                self.assertTrue(all(mgr.check_resource_health().values()))
+
+        school, grade, clazz = tree["classes"][0]
+        meeting_root = os.path.join(self.root, "主题班会", school, grade, clazz)
+        packages = sorted(os.listdir(meeting_root))
+        self.assertEqual(len(packages), 5)
+        self.assertTrue(any("《" in p and "》" in p for p in packages))
+        exts = {os.path.splitext(f)[1] for p in packages for f in os.listdir(os.path.join(meeting_root, p)) if f.startswith("班会记录")}
+        self.assertEqual(exts, {".xlsx", ".txt", ".pdf"})
+
+        mgr = ProTaskManager("", user_info=tree["user_infos"][0], base_url="http://example.test")
+        title = tree["titles"][3]
+        matched = mgr._find_best_matching_folder(f"{title}主题班会", meeting_root)
+        self.assertIn(title, os.path.basename(matched))
+
+    def test_explicit_identities_and_titles(self):
+        infos = [{"studentSchoolInfo": {"schoolName": "测试 中学", "gradeName": "高一", "className": "高一八班"}}] * 3
+        tree = generate_asset_tree(self.root, user_infos=infos, titles=["安全教育"], images_per_dir=1)
+        self.assertEqual(tree["classes"], [("测试中学", "高一", "八班")])
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "劳动", "测试中学", "高一", "八班")))
+        self.assertEqual(tree["packages"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
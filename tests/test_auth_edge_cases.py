@@ -1,12 +1,26 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+from comprehensive_eval_pro import runtime_cache
 from comprehensive_eval_pro.services.auth import ProAuthService
 
 class TestAuthEdgeCases(unittest.TestCase):
     def setUp(self):
+        # 学校信息缓存写入临时目录，避免用例之间互相影响
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_auth_edge_")
+        self.env = patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
         self.auth = ProAuthService()
         self.auth.session = MagicMock()
 
+    def tearDown(self):
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
     def test_get_school_meta_malformed_json(self):
         """测试后端返回非 JSON 或格式错误时的情况"""
         mock_res = MagicMock()
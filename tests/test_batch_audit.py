@@ -0,0 +1,110 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+
+
+class _ClassMgr:
+    def __init__(self, school, grade, clazz, missing, name="学生"):
+        self.school, self.grade, self.clazz = school, grade, clazz
+        self.missing = missing
+        self.student_name = name
+        self.audits = 0
+
+    def _school_name(self):
+        return self.school
+
+    def _grade_name(self):
+        return self.grade
+
+    def _pure_class_name(self):
+        return self.clazz
+
+    def audit_resources(self):
+        self.audits += 1
+        return list(self.missing)
+
+
+class _BareMgr:
+    """测试替身：没有学校/年级/班级方法"""
+
+    def __init__(self):
+        self.audits = 0
+
+    def audit_resources(self):
+        self.audits += 1
+        return []
+
+
+class TestBatchAudit(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_batch_audit_")
+        # missing_resources.log 写到 flows 模块所在目录，重定向到临时目录并记录打开次数
+        self.log_file = os.path.join(self.tmp, "missing_resources.log")
+        self.opens = []
+        self.real_open = real_open = open
+
+        def _open(path, *args, **kwargs):
+            if os.path.basename(str(path)) == "missing_resources.log":
+                self.opens.append(path)
+                return real_open(self.log_file, *args, **kwargs)
+            return real_open(path, *args, **kwargs)
+
+        self.open_patch = mock.patch("builtins.open", side_effect=_open)
+        self.open_patch.start()
+
+    def tearDown(self):
+        self.open_patch.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_audits_once_per_class_and_logs_in_one_append(self):
+        ok = [_ClassMgr("一中", "高一", "1班", []) for _ in range(3)]
+        bad = [_ClassMgr("一中", "高一", "2班", ["主题班会/一中/高一/2班"], name=f"学生{i}") for i in range(2)]
+        items = [{"username": f"u{i}", "task_mgr": m} for i, m in enumerate(ok + bad)]
+
+        failed = flows.audit_selected_accounts(items)
+
+        self.assertEqual(failed, 2)
+        self.assertEqual(sum(m.audits for m in ok), 1)
+        self.assertEqual(sum(m.audits for m in bad), 1)
+        self.assertEqual([it["audit_missing"] for it in items[:3]], [[], [], []])
+        self.assertEqual(items[4]["audit_missing"], ["主题班会/一中/高一/2班"])
+        self.assertEqual(len(self.opens), 1)
+        with self.real_open(self.log_file, encoding="utf-8") as f:
+            text = f.read()
+        self.assertEqual(text.count("[RESOURCE_MISSING] 一中 | 高一 | 2班"), 2)
+        self.assertIn("学生1 (u4)", text)
+
+        # 再次调用不会重复审计，也不会重复写日志
+        self.assertEqual(flows.audit_selected_accounts(items), 0)
+        self.assertEqual(sum(m.audits for m in ok + bad), 2)
+        self.assertEqual(len(self.opens), 1)
+
+    def test_process_account_reuses_batch_result(self):
+        mgr = _ClassMgr("一中", "高一", "2班", ["缺失"])
+        item = {"username": "u1", "task_mgr": mgr, "audit_missing": ["缺失"]}
+        with redirect_stdout(io.StringIO()) as out:
+            status, _ = flows._process_account(item, ai_gen=None, preset=None)
+        self.assertEqual(status, "skip")
+        self.assertEqual(mgr.audits, 0)
+        self.assertIn("资源审计未通过", out.getvalue())
+        self.assertEqual(self.opens, [])
+
+    def test_managers_without_class_info_are_audited_individually(self):
+        mgrs = [_BareMgr(), _BareMgr()]
+        items = [{"username": f"u{i}", "task_mgr": m} for i, m in enumerate(mgrs)]
+        self.assertEqual(flows.audit_selected_accounts(items), 0)
+        self.assertEqual([m.audits for m in mgrs], [1, 1])
+        self.assertEqual(self.opens, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import io
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+from comprehensive_eval_pro.batch_runner import BatchExecutor, PrefixedStream, account_output
+from comprehensive_eval_pro.run_records import close_run_records
+
+
+class Gauge:
+    """记录同时处于提交中的账号数峰值"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+
+
+class SlowMgr:
+    def __init__(self, name, base_url="http://a.example", gauge=None):
+        self.name = name
+        self.base_url = base_url
+        self.student_name = name
+        self.user_info = {}
+        self.submitted = []
+        self.gauge = gauge or Gauge()
+
+    def get_all_tasks(self, force_refresh=False):
+        return [{"name": "劳动A", "circleTaskStatus": "待写实", "dimensionName": "x"}]
+
+    def get_class_meeting_folders(self):
+        return []
+
+    def audit_resources(self):
+        return []
+
+    def submit_task(self, task, ai_gen, dry_run=True, use_cache=True):
+        with self.gauge:
+            time.sleep(0.05)
+        self.submitted.append(task.get("name"))
+        return {"code": 1}
+
+
+def _preset(**overrides):
+    preset = {
+        "mode": "ld",
+        "selection": "ld",
+        "scope": "pending",
+        "indices": [],
+        "skip_review": True,
+        "confirmed_resubmit": False,
+        "diversity_every": 5,
+        "submit_index": 0,
+    }
+    preset.update(overrides)
+    return preset
+
+
+class TestBatchExecutor(unittest.TestCase):
+    def test_results_keep_input_order_and_respect_host_cap(self):
+        active = {}
+        peak = {}
+        lock = threading.Lock()
+
+        def job(item):
+            host, n = item
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            return n
+
+        items = [("a" if n % 2 else "b", n) for n in range(12)]
+        results = BatchExecutor(workers=8, per_host=2).run(items, job, host_key=lambda it: it[0])
+        self.assertEqual(results, list(range(12)))
+        self.assertLessEqual(peak["a"], 2)
+        self.assertLessEqual(peak["b"], 2)
+        self.assertGreaterEqual(peak["a"] + peak["b"], 3)
+
+    def test_job_exception_does_not_abort_batch(self):
+        def job(n):
+            if n == 1:
+                raise RuntimeError("boom")
+            return n
+
+        self.assertEqual(BatchExecutor(workers=3).run([0, 1, 2], job), [0, None, 2])
+
+    def test_prefixed_stream_writes_whole_lines(self):
+        raw = io.StringIO()
+        stream = PrefixedStream(raw)
+        with mock.patch.object(sys, "stdout", stream):
+            with account_output("[u1] "):
+                stream.write("hello ")
+                stream.write("world\nsecond")
+            stream.write("plain\n")
+        self.assertEqual(raw.getvalue(), "[u1] hello world\n[u1] second\nplain\n")
+
+
+class TestConcurrentAccounts(unittest.TestCase):
+    def setUp(self):
+        # 流程测试不写入仓库内的 runtime/records
+        self.env = mock.patch.dict(os.environ, {"CEP_RECORDS_ENABLED": "false"})
+        self.env.start()
+
+    def tearDown(self):
+        close_run_records()
+        self.env.stop()
+
+    def test_accounts_run_concurrently_with_shared_preset(self):
+        gauge = Gauge()
+        items = [{"username": f"u{i}", "task_mgr": SlowMgr(f"u{i}", gauge=gauge)} for i in range(8)]
+        preset = _preset()
+        out = io.StringIO()
+        with mock.patch.object(sys, "stdout", out), mock.patch.object(flows, "_mark_task_submitted"), \
+                mock.patch.dict(os.environ, {"CEP_BATCH_PER_HOST_LIMIT": "8"}):
+            counts = flows.run_accounts_concurrently(items, object(), preset, workers=8)
+
+        self.assertEqual(counts, {"ok": 8})
+        self.assertTrue(all(it["task_mgr"].submitted == ["劳动A"] for it in items))
+        self.assertEqual(preset["gen_counts"]["劳动A"], 8)
+        self.assertGreater(gauge.peak, 1)
+        for line in out.getvalue().splitlines():
+            self.assertRegex(line, r"^\[u\d\] ")
+
+    def test_non_interactive_skips_instead_of_prompting(self):
+        mgr = SlowMgr("u1")
+        mgr.get_all_tasks = lambda force_refresh=False: [
+            {"name": "劳动A", "circleTaskStatus": "已提交", "dimensionName": "x"}
+        ]
+        preset = _preset(scope="all")
+        with mock.patch("builtins.input", side_effect=AssertionError("should not prompt")):
+            flows.run_task_flow(mgr, object(), preset=preset, strict=False, interactive=False)
+            flows.run_task_flow(mgr, object(), preset=_preset(skip_review=False), strict=False, interactive=False)
+        self.assertEqual(mgr.submitted, [])
+
+    def test_skipped_accounts_are_not_counted_as_success(self):
+        done = SlowMgr("u1")
+        done.get_all_tasks = lambda force_refresh=False: [
+            {"name": "劳动A", "circleTaskStatus": "已提交", "dimensionName": "x"}
+        ]
+        items = [{"username": "u1", "task_mgr": done}, {"username": "u2", "task_mgr": SlowMgr("u2")}]
+        with mock.patch.object(sys, "stdout", io.StringIO()), mock.patch.object(flows, "_mark_task_submitted"):
+            counts = flows.run_accounts_concurrently(items, object(), _preset(), workers=2)
+            status, _ = flows.process_account(items[0], object(), _preset(), interactive=False)
+        self.assertEqual(counts, {"ok": 1, "skip": 1})
+        self.assertEqual(status, "skip")
+
+    def test_batch_workers_from_args_and_settings(self):
+        from comprehensive_eval_pro.cli import parse_args
+
+        self.assertEqual(flows.get_batch_workers(parse_args(["--workers", "6"])), 6)
+        with mock.patch.dict(os.environ, {"CEP_BATCH_WORKERS": "3"}):
+            self.assertEqual(flows.get_batch_workers(parse_args([])), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
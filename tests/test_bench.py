@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import bench
+from comprehensive_eval_pro.policy import config
+
+
+class TestBench(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="cep_bench_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(bench.percentile(values, 50), 50.0)
+        self.assertEqual(bench.percentile(values, 99), 99.0)
+        self.assertEqual(bench.percentile([], 95), 0.0)
+
+    def test_small_run_submits_all_special_tasks(self):
+        state_before = config.state
+        result = bench.run_benchmark(
+            accounts=3,
+            schools=1,
+            grades=1,
+            classes=2,
+            dimensions=2,
+            tasks_per_dimension=3,
+            images_per_dir=1,
+            image_size=(64, 48),
+            workers=2,
+            workdir=self.workdir,
+        )
+        self.assertIs(config.state, state_before)
+
+        r = result["results"]
+        self.assertEqual(r["ok_accounts"], 3)
+        # 2 个维度 × 3 个任务，均属于四大专项
+        self.assertEqual(r["tasks_submitted"], 18)
+        self.assertGreater(r["tasks_per_sec"], 0)
+        self.assertEqual(r["http_errors"], 0)
+        self.assertIn("ProTaskManager.submit_task", result["phases"])
+        self.assertEqual(result["phases"]["process_account"]["count"], 3)
+        self.assertGreater(r["bytes_written"], 0)
+
+        path = bench.save_result(result, os.path.join(self.workdir, "out", "bench.json"))
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["params"]["accounts"], 3)
+        lines = bench.compare_results(result, result)
+        self.assertTrue(any("tasks_per_sec" in line and "+0.0%" in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,7 +10,7 @@ from pathlib import Path
 # 允许从根目录导入
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from comprehensive_eval_pro.summary_log import append_summary
+from comprehensive_eval_pro.summary_log import append_summary, flush_summaries
 from comprehensive_eval_pro.config_store import load_json_config, save_json_config
 
 class TestConcurrencyMultiSchool(unittest.TestCase):
@@ -113,6 +113,7 @@ class TestConcurrencyMultiSchool(unittest.TestCase):
 
         # 验证
         self.assertEqual(len(errors), 0, f"并发测试中出现异常: {errors}")
+        self.assertTrue(flush_summaries(timeout=10))
         
         # 验证每个账号的日志行数
         for username, user_info in account_pool:
@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import runtime_cache
+from comprehensive_eval_pro.fake_server import FakeDataset, FakeServer, issue_token
+from comprehensive_eval_pro.services.ai_tool import AIModelTool
+from comprehensive_eval_pro.services.auth import ProAuthService
+from comprehensive_eval_pro.services.file_service import ProFileService
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.utils.http_client import create_session, request_json
+
+
+class TestFakeServer(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_fake_server_")
+        self.env = mock.patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir, "CEP_IMAGE_CACHE_ENABLED": "false"})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
+        self.server = FakeServer(dataset=FakeDataset(dimensions=2, tasks_per_dimension=3)).start()
+        self.urls = self.server.urls()
+
+    def tearDown(self):
+        self.server.stop()
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _manager(self, username="20240001"):
+        mgr = ProTaskManager(issue_token(username), base_url=self.urls["base_url"], upload_url=self.urls["upload_url"])
+        with mock.patch.object(ProTaskManager, "_ensure_resource_dirs"), mock.patch.object(
+            ProTaskManager, "print_resource_setup_hints"
+        ):
+            self.assertTrue(mgr.activate_session(use_cache=False))
+        return mgr
+
+    def test_scan_and_submit_round_trip(self):
+        mgr = self._manager()
+        self.assertTrue(mgr.student_name)
+        tasks = mgr.get_all_tasks()
+        self.assertEqual(len(tasks), 6)
+        self.assertTrue(all(t["circleTaskStatus"] == "待写实" for t in tasks))
+
+        res = mgr.submit_task(
+            tasks[0], None, dry_run=False, content_override="离线文案", attachment_ids_override=[1]
+        )
+        self.assertEqual(res.get("code"), 1)
+        self.assertEqual(self.server.dataset.submissions, 1)
+        statuses = {t["id"]: t["circleTaskStatus"] for t in mgr.get_all_tasks(force_refresh=True)}
+        self.assertEqual(statuses[tasks[0]["id"]], "已提交")
+
+    def test_sso_upload_and_ai_endpoints(self):
+        auth = ProAuthService(sso_base=self.urls["sso_base"])
+        meta = auth.get_school_meta("20240002")
+        self.assertTrue(meta.get("id"))
+        self.assertTrue(auth.login("20240002", "pw", "1234", school_id=meta["id"]))
+        self.assertTrue(auth.token)
+
+        img = os.path.join(self.cache_dir, "a.jpg")
+        from PIL import Image
+
+        Image.new("RGB", (32, 32), (200, 100, 50)).save(img, "JPEG")
+        self.assertIsInstance(ProFileService(upload_url=self.urls["upload_url"]).upload_image(img), int)
+
+        ai = AIModelTool(api_key="k", base_url=self.urls["ai_base_url"])
+        self.assertTrue(ai.chat(model="fake-model", messages=[{"role": "user", "content": "你好"}]))
+
+    def test_expired_token_and_error_rate(self):
+        expired = issue_token("u", ttl_seconds=-10)
+        session = create_session(shared=False)
+        data = request_json(
+            session, "GET", f"{self.urls['base_url']}/api/studentInfo/getMyInfo", headers={"X-Auth-Token": expired}
+        )
+        self.assertEqual(data.get("code"), 0)
+
+        with FakeServer(error_rate=1.0, seed=1) as flaky:
+            res = session.get(f"{flaky.url}/api/studentInfo/getMenu", timeout=5)
+            self.assertEqual(res.status_code, 503)
+        self.assertEqual(self.server.request_counts.get("/api/studentInfo/getMyInfo"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
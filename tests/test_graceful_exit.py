@@ -1,11 +1,14 @@
 
 import unittest
 from unittest.mock import patch, MagicMock
+import os
 import sys
 import io
 from comprehensive_eval_pro.flows import main
 
 class TestGracefulExit(unittest.TestCase):
+    # main() 收尾时会写运行记录与接口指标，测试中关闭以免写入仓库内的 runtime/
+    @patch.dict(os.environ, {"CEP_RECORDS_ENABLED": "false", "CEP_METRICS_ENABLED": "false"})
     @patch("comprehensive_eval_pro.flows._main_impl")
     def test_keyboard_interrupt_handling(self, mock_impl):
         # 模拟 _main_impl 抛出 KeyboardInterrupt
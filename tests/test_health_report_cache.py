@@ -0,0 +1,144 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.benchmarks.asset_tree import generate_asset_tree
+from comprehensive_eval_pro.flows import generate_resource_health_report
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.utils.record_parser import has_record_file
+from comprehensive_eval_pro.utils.resource_health import HealthReportCache, health_cache
+
+
+class TestHealthReportCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="cep_health_cache_")
+        self.env = mock.patch.dict(os.environ, {"CEP_ASSETS_DIR": self.root})
+        self.env.start()
+        self.tree = generate_asset_tree(self.root, classes=2, packages_per_class=2, images_per_dir=1)
+        self.accounts = [
+            {"username": f"u{i}", "status": "已就绪", "task_mgr": ProTaskManager("", user_info=info, base_url="http://example.test")}
+            for i, info in enumerate(self.tree["user_infos"] * 2)
+        ]
+        health_cache.clear()
+
+    def tearDown(self):
+        self.env.stop()
+        health_cache.clear()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_redraw_reuses_cached_health(self):
+        with mock.patch.object(ProTaskManager, "check_resource_health", autospec=True, return_value={
+            "labor": True, "military": True, "speech": True, "class_meeting_img": True, "class_meeting_record": True
+        }) as check:
+            for _ in range(3):
+                with redirect_stdout(io.StringIO()):
+                    generate_resource_health_report(self.accounts)
+        # 2 个班级分组，各体检一次
+        self.assertEqual(check.call_count, 2)
+
+    def test_asset_change_invalidates_group(self):
+        cache = HealthReportCache(revalidate_seconds=0)
+        tm = self.accounts[0]["task_mgr"]
+        with mock.patch.object(ProTaskManager, "check_resource_health", autospec=True, return_value={}) as check:
+            cache.get(tm)
+            cache.get(tm)
+            self.assertEqual(check.call_count, 1)
+
+            school, grade, clazz = self.tree["classes"][0]
+            os.makedirs(os.path.join(self.root, "主题班会", school, grade, clazz, "2025-05-01 《新班会》"))
+            cache.get(tm)
+            self.assertEqual(check.call_count, 2)
+
+            # 其他班级的资源变化不影响该分组
+            school, grade, clazz = self.tree["classes"][1]
+            os.makedirs(os.path.join(self.root, "劳动", school, grade, clazz, "新专项"))
+            cache.get(tm)
+            self.assertEqual(check.call_count, 2)
+
+    def test_recent_entry_skips_signature_scan(self):
+        cache = HealthReportCache(revalidate_seconds=60)
+        tm = self.accounts[0]["task_mgr"]
+        with mock.patch.object(ProTaskManager, "check_resource_health", autospec=True, return_value={}):
+            cache.get(tm)
+            with mock.patch.object(ProTaskManager, "resource_signature", side_effect=AssertionError("should not rescan")):
+                for _ in range(3):
+                    cache.get(tm)
+
+            # 过期后重新校验指纹
+            cache.revalidate_seconds = 0
+            with mock.patch.object(ProTaskManager, "resource_signature", autospec=True, return_value="changed") as sig:
+                cache.get(tm)
+            self.assertEqual(sig.call_count, 1)
+
+    def test_background_prewarm_fills_every_group(self):
+        cache = HealthReportCache()
+        self.assertTrue(cache.prewarm(self.accounts))
+        self.assertTrue(cache.wait(timeout=30))
+        with mock.patch.object(ProTaskManager, "check_resource_health", side_effect=AssertionError("should be cached")):
+            for a in self.accounts:
+                self.assertTrue(all(cache.get(a["task_mgr"]).values()))
+        self.assertFalse(HealthReportCache().prewarm([{"username": "x", "status": "登录失败", "task_mgr": None}]))
+
+
+class _SlowManager:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+
+    def _school_name(self):
+        return "学校"
+
+    def _grade_name(self):
+        return "高一"
+
+    def _pure_class_name(self):
+        return self.name
+
+    def check_resource_health(self):
+        with _SlowManager.lock:
+            _SlowManager.active += 1
+            _SlowManager.peak = max(_SlowManager.peak, _SlowManager.active)
+        time.sleep(self.delay)
+        with _SlowManager.lock:
+            _SlowManager.active -= 1
+        return {"labor": True, "class": self.name}
+
+
+class TestParallelHealthChecks(unittest.TestCase):
+    def test_get_many_runs_concurrently_and_keeps_order(self):
+        mgrs = [_SlowManager(f"{i}班", delay) for i, delay in enumerate([0.15, 0.05, 0.1, 0.0])]
+        _SlowManager.peak = 0
+        results = HealthReportCache().get_many(mgrs, workers=4)
+        self.assertEqual([r["class"] for r in results], ["0班", "1班", "2班", "3班"])
+        self.assertGreater(_SlowManager.peak, 1)
+
+    def test_record_probe_does_not_parse(self):
+        d = tempfile.mkdtemp(prefix="cep_record_probe_")
+        try:
+            self.assertFalse(has_record_file(d))
+            open(os.path.join(d, "photo.jpg"), "wb").close()
+            open(os.path.join(d, "empty.xlsx"), "wb").close()
+            self.assertFalse(has_record_file(d))
+            with open(os.path.join(d, "记录.XLS"), "wb") as f:
+                f.write(b"not really excel")
+            self.assertTrue(has_record_file(d))
+            self.assertFalse(has_record_file(os.path.join(d, "missing")))
+        finally:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
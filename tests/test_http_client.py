@@ -1,12 +1,14 @@
 import os
 import sys
 import unittest
+from unittest import mock
 from unittest.mock import MagicMock
 
 import requests
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from comprehensive_eval_pro.utils import http_client
 from comprehensive_eval_pro.utils.http_client import create_session, request_json, request_json_response
 
 
@@ -54,5 +56,40 @@ class TestHttpClient(unittest.TestCase):
         self.assertIs(raw, resp)
 
 
+class TestSharedSessions(unittest.TestCase):
+    def setUp(self):
+        http_client.close_shared_adapters()
+
+    def tearDown(self):
+        http_client.close_shared_adapters()
+
+    def test_sessions_share_pools_but_not_credentials(self):
+        a = create_session()
+        b = create_session()
+        self.assertIs(a.get_adapter("http://h.example/x"), b.get_adapter("http://h.example/y"))
+        self.assertIsNot(a.get_adapter("http://h.example/"), create_session(retries=0).get_adapter("http://h.example/"))
+
+        a.headers["X-Auth-Token"] = "ta"
+        a.cookies.set("X-Auth-Token", "ta", domain="h.example")
+        self.assertNotIn("X-Auth-Token", b.headers)
+        self.assertEqual(len(b.cookies), 0)
+
+    def test_close_keeps_shared_pool_usable(self):
+        a = create_session()
+        adapter = a.get_adapter("https://h.example/")
+        a.close()
+        self.assertIs(create_session().get_adapter("https://h.example/"), adapter)
+
+    def test_pool_size_from_settings(self):
+        with mock.patch.dict(os.environ, {"CEP_HTTP_POOL_CONNECTIONS": "3", "CEP_HTTP_POOL_MAXSIZE": "64"}):
+            adapter = create_session().get_adapter("http://h.example/")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 64)
+
+    def test_unshared_session_keeps_own_adapter(self):
+        session = create_session(shared=False)
+        self.assertIsNot(session.get_adapter("http://h.example/"), create_session(shared=False).get_adapter("http://h.example/"))
+
+
 if __name__ == "__main__":
     unittest.main()
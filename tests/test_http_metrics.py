@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.utils.http_client import request_json, request_json_response
+from comprehensive_eval_pro.utils.http_metrics import HttpMetrics, dump_metrics, metrics, template_path
+
+
+def _response(status=200, body=b'{"code": 1}', sent=b"", retries=0):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.request = requests.PreparedRequest()
+    resp.request.body = sent
+    raw = MagicMock()
+    raw.retries.history = tuple(range(retries))
+    resp.raw = raw
+    return resp
+
+
+class TestHttpMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.tmp = tempfile.mkdtemp(prefix="cep_metrics_")
+
+    def tearDown(self):
+        metrics.reset()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _endpoint(self, path):
+        return next(ep for ep in metrics.snapshot()["endpoints"] if ep["path"] == path)
+
+    def test_template_path(self):
+        self.assertEqual(
+            template_path("http://H.example:8280/api/studentCircleNew/getCircleStatistics?dimensionId=3"),
+            ("h.example:8280", "/api/studentCircleNew/getCircleStatistics"),
+        )
+        self.assertEqual(template_path("http://h/api/task/12345/detail")[1], "/api/task/{id}/detail")
+
+    def test_requests_are_recorded_per_endpoint(self):
+        session = MagicMock(spec=requests.Session)
+        session.request.side_effect = [
+            _response(body=b'{"code": 1}', sent=b"abc", retries=2),
+            _response(status=500, body=b"oops"),
+            requests.ConnectionError("down"),
+        ]
+        url = "http://h.example/api/studentCircleNew/getCircleStatistics?dimensionId="
+        request_json(session, "GET", url + "1")
+        request_json_response(session, "GET", url + "2")
+        request_json(session, "GET", url + "3")
+
+        ep = self._endpoint("/api/studentCircleNew/getCircleStatistics")
+        self.assertEqual(ep["method"], "GET")
+        self.assertEqual(ep["host"], "h.example")
+        self.assertEqual(ep["count"], 3)
+        self.assertEqual(ep["errors"], 2)
+        self.assertEqual(ep["status"], {"200": 1, "500": 1, "error": 1})
+        self.assertEqual(ep["bytes_in"], len(b'{"code": 1}') + len(b"oops"))
+        self.assertEqual(ep["bytes_out"], 3)
+        self.assertEqual(ep["retries"], 2)
+        self.assertEqual(ep["latency_buckets"]["+Inf"], 3)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = HttpMetrics()
+        for latency in (0.01, 0.3, 20):
+            registry.record("GET", "http://h/x", latency=latency, status=200)
+        buckets = registry.snapshot()["endpoints"][0]["latency_buckets"]
+        self.assertEqual(buckets["0.05"], 1)
+        self.assertEqual(buckets["0.5"], 2)
+        self.assertEqual(buckets["10.0"], 2)
+        self.assertEqual(buckets["+Inf"], 3)
+
+    def test_dump_json_and_prometheus(self):
+        metrics.record("POST", "http://h/api/submit", latency=0.2, status=200, bytes_out=10)
+        path = dump_metrics(os.path.join(self.tmp, "metrics.json"), fmt="json")
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["endpoints"][0]["path"], "/api/submit")
+
+        prom = dump_metrics(os.path.join(self.tmp, "metrics.prom"), fmt="prometheus")
+        with open(prom, encoding="utf-8") as f:
+            text = f.read()
+        self.assertIn('cep_http_request_duration_seconds_count{method="POST",host="h",path="/api/submit"} 1', text)
+        self.assertIn('cep_http_responses_total{method="POST",host="h",path="/api/submit",status="200"} 1', text)
+
+    def test_dump_skipped_without_requests(self):
+        self.assertIsNone(dump_metrics(os.path.join(self.tmp, "metrics.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.utils import image_convert
+from comprehensive_eval_pro.utils.image_cache import ImageCache
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_key_depends_on_content_and_params(self):
+        cache = ImageCache(self.cache_dir)
+        a = self._write("a.jpg", b"aaa")
+        b = self._write("b.jpg", b"aaa")
+        c = self._write("c.jpg", b"ccc")
+        self.assertEqual(cache.make_key(a, {"max_dim": 1}), cache.make_key(b, {"max_dim": 1}))
+        self.assertNotEqual(cache.make_key(a, {"max_dim": 1}), cache.make_key(a, {"max_dim": 2}))
+        self.assertNotEqual(cache.make_key(a, {"max_dim": 1}), cache.make_key(c, {"max_dim": 1}))
+
+    def test_put_get_roundtrip(self):
+        cache = ImageCache(self.cache_dir)
+        key = cache.make_key(self._write("a.jpg", b"src"), {})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, b"jpeg-bytes")
+        self.assertEqual(cache.get(key), b"jpeg-bytes")
+
+    def test_lru_eviction_keeps_recent_entries(self):
+        cache = ImageCache(self.cache_dir, max_bytes=350)
+        keys = []
+        for i in range(3):
+            key = cache.make_key(self._write(f"{i}.jpg", str(i).encode()), {})
+            cache.put(key, b"x" * 100)
+            keys.append(key)
+            old = time.time() - 100 + i * 10
+            os.utime(cache._entry_path(key), (old, old))
+        # 访问最旧的条目使其变为最近使用
+        self.assertIsNotNone(cache.get(keys[0]))
+        key = cache.make_key(self._write("3.jpg", b"3"), {})
+        cache.put(key, b"x" * 100)
+
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(key))
+
+    @unittest.skipUnless(__import__("importlib").util.find_spec("PIL") is not None, "Pillow not installed")
+    def test_compress_image_warm_hit_skips_transcode(self):
+        from PIL import Image
+
+        src = os.path.join(self.tmp.name, "photo.png")
+        Image.new("RGB", (3000, 2000), (120, 30, 60)).save(src, format="PNG")
+        cache = ImageCache(self.cache_dir)
+
+        out1, c1 = image_convert.compress_image(src, profile="vision", cache=cache)
+        with open(out1, "rb") as f:
+            first = f.read()
+        image_convert.cleanup_temp_file(out1, c1)
+
+        with mock.patch.object(image_convert, "transcode_image", side_effect=AssertionError("should hit cache")):
+            out2, c2 = image_convert.compress_image(src, profile="vision", cache=cache)
+        with open(out2, "rb") as f:
+            self.assertEqual(f.read(), first)
+        self.assertTrue(c2)
+        image_convert.cleanup_temp_file(out2, c2)
+
+    @unittest.skipUnless(__import__("importlib").util.find_spec("PIL") is not None, "Pillow not installed")
+    def test_compress_image_passthrough_warm_hit_skips_pillow(self):
+        from PIL import Image
+
+        src = os.path.join(self.tmp.name, "small.jpg")
+        Image.new("RGB", (200, 100), (1, 2, 3)).save(src, format="JPEG")
+        cache = ImageCache(self.cache_dir)
+
+        self.assertEqual(image_convert.compress_image(src, profile="upload", cache=cache), (src, False))
+        with mock.patch.object(image_convert, "_fits_profile", side_effect=AssertionError("should hit marker")):
+            self.assertEqual(image_convert.compress_image(src, profile="upload", cache=cache), (src, False))
+        # 只记标记，不复制原图字节
+        key = cache.make_key(src, dict(image_convert.get_image_profile("upload"), captcha=False))
+        self.assertIsNone(cache.get(key))
+        self.assertTrue(cache.is_passthrough(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import os
 import tempfile
 import unittest
 
-from comprehensive_eval_pro.utils.image_convert import cleanup_temp_file, ensure_jpg
+from comprehensive_eval_pro.utils.image_convert import IMAGE_PROFILES, cleanup_temp_file, compress_image, ensure_jpg
 
 
 class TestImageConvert(unittest.TestCase):
@@ -34,6 +34,44 @@ class TestImageConvert(unittest.TestCase):
             self.assertFalse(os.path.exists(out))
 
 
+    @unittest.skipUnless(__import__("importlib").util.find_spec("PIL") is not None, "Pillow not installed")
+    def test_compress_image_downscales_to_profile(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "phone.jpg")
+            Image.effect_noise((4000, 3000), 64).convert("RGB").save(src, format="JPEG", quality=95)
+
+            out, cleanup = compress_image(src, profile="vision")
+            self.assertTrue(cleanup)
+            spec = IMAGE_PROFILES["vision"]
+            with Image.open(out) as img:
+                self.assertLessEqual(max(img.size), spec["max_dim"])
+                self.assertEqual(img.format, "JPEG")
+            self.assertLessEqual(os.path.getsize(out), spec["max_bytes"])
+            cleanup_temp_file(out, cleanup)
+
+    @unittest.skipUnless(__import__("importlib").util.find_spec("PIL") is not None, "Pillow not installed")
+    def test_compress_image_passthrough_when_within_profile(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "small.jpg")
+            Image.new("RGB", (200, 100), (1, 2, 3)).save(src, format="JPEG")
+            out, cleanup = compress_image(src, profile="upload")
+            self.assertEqual(out, src)
+            self.assertFalse(cleanup)
+
+    def test_compress_image_corrupted_returns_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "bad.jpg")
+            with open(src, "wb") as f:
+                f.write(b"not an image")
+            out, cleanup = compress_image(src, profile="upload")
+            self.assertIsNone(out)
+            self.assertFalse(cleanup)
+
+
 if __name__ == "__main__":
     unittest.main()
 
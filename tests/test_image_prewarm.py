@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.utils.image_cache import ImageCache
+from comprehensive_eval_pro.utils.image_convert import get_image_profile
+from comprehensive_eval_pro.utils import image_prewarm
+from comprehensive_eval_pro.utils.image_prewarm import ImagePrewarmer
+
+
+class _AssetsTaskMgr(ProTaskManager):
+    def __init__(self, assets_dir: str, class_name: str):
+        super().__init__(
+            "t",
+            user_info={"studentSchoolInfo": {"schoolName": "测试学校", "gradeName": "高一", "className": class_name}},
+        )
+        self._assets_dir = assets_dir
+
+    def collect_candidate_images(self, base_assets_dir=None):
+        return super().collect_candidate_images(base_assets_dir=self._assets_dir)
+
+
+@unittest.skipUnless(__import__("importlib").util.find_spec("PIL") is not None, "Pillow not installed")
+class TestImagePrewarm(unittest.TestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.root = tempfile.mkdtemp(prefix="cep_prewarm_")
+        self.assets = os.path.join(self.root, "assets")
+        self.labor_img = os.path.join(self.assets, "劳动", "测试学校", "高一", "一班", "扫地", "a.png")
+        self.meeting_img = os.path.join(self.assets, "主题班会", "测试学校", "高一", "一班", "2026.1.1《班会》", "b.png")
+        self.speech_img = os.path.join(self.assets, "国旗下讲话", "测试学校", "默认", "c.png")
+        for p in (self.labor_img, self.meeting_img, self.speech_img):
+            os.makedirs(os.path.dirname(p), exist_ok=True)
+            Image.new("RGB", (1600, 1200), (10, 200, 30)).save(p, format="PNG")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_build_jobs_dedupes_by_class(self):
+        mgrs = [_AssetsTaskMgr(self.assets, "一班"), _AssetsTaskMgr(self.assets, "一班")]
+        jobs = ImagePrewarmer.build_jobs(mgrs)
+        paths = sorted((os.path.basename(p), profile) for p, profile, _ in jobs)
+        self.assertEqual(paths, [("a.png", "upload"), ("a.png", "vision"), ("b.png", "upload"), ("c.png", "upload")])
+
+    def test_prewarm_populates_cache(self):
+        cache = ImageCache(os.path.join(self.root, "cache"))
+        prewarmer = ImagePrewarmer(cache, workers=2)
+        self.assertTrue(prewarmer.start([_AssetsTaskMgr(self.assets, "一班")]))
+        try:
+            prewarmer._collector.join(timeout=30)
+            for p in (self.labor_img, self.meeting_img, self.speech_img):
+                prewarmer.wait_for(p, timeout=30)
+        finally:
+            prewarmer.shutdown()
+
+        upload_key = cache.make_key(self.labor_img, dict(get_image_profile("upload"), captcha=False))
+        vision_key = cache.make_key(self.labor_img, dict(get_image_profile("vision"), captcha=False))
+        self.assertIsNotNone(cache.get(upload_key))
+        self.assertIsNotNone(cache.get(vision_key))
+
+    def test_worker_reuses_one_cache_and_scans_once(self):
+        image_prewarm._init_worker(os.path.join(self.root, "cache"), 256 * 1024 * 1024)
+        self.addCleanup(setattr, image_prewarm, "_worker_cache", None)
+        with mock.patch.object(ImageCache, "_scan_total", autospec=True, return_value=0) as scan:
+            for p in (self.labor_img, self.meeting_img, self.speech_img):
+                self.assertTrue(image_prewarm._warm_image(p, "upload", None))
+        self.assertEqual(scan.call_count, 1)
+
+    def test_prewarm_trims_cache_to_budget_after_workers_finish(self):
+        cache = ImageCache(os.path.join(self.root, "cache"), max_bytes=1)
+        prewarmer = ImagePrewarmer(cache, workers=2)
+        with mock.patch.object(cache, "trim", wraps=cache.trim) as trim:
+            self.assertTrue(prewarmer.start([_AssetsTaskMgr(self.assets, "一班")]))
+            try:
+                prewarmer._collector.join(timeout=30)
+            finally:
+                prewarmer.shutdown()
+        trim.assert_called_once_with()
+        self.assertLessEqual(cache._scan_total(), cache.max_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
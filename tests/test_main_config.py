@@ -21,6 +21,11 @@ class TestMainConfig(unittest.TestCase):
             app_main.save_config(app_main.config.state)
             mock_save.assert_called_once()
 
+    def test_main_passes_command_line_arguments(self):
+        with mock.patch.object(sys, "argv", ["main.py", "--rescan"]), mock.patch.object(app_main._flows, "main") as flows_main:
+            app_main.main()
+        flows_main.assert_called_once_with(["--rescan"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.benchmarks import micro
+
+
+class TestMicroBench(unittest.TestCase):
+    def test_measure_reports_rate_and_allocations(self):
+        r = micro.measure(lambda: [0] * 10000, min_time=0.01, repeat=1)
+        self.assertGreater(r["ops_per_sec"], 0)
+        self.assertGreaterEqual(r["alloc_peak_bytes_per_op"], 10000 * 8)
+
+    def test_compare_flags_only_regressions_beyond_threshold(self):
+        baseline = {
+            "a": {"ops_per_sec": 100.0, "alloc_peak_bytes_per_op": 4096},
+            "b": {"ops_per_sec": 100.0, "alloc_peak_bytes_per_op": 100},
+        }
+        results = {
+            "a": {"ops_per_sec": 80.0, "alloc_peak_bytes_per_op": 8192},
+            "b": {"ops_per_sec": 60.0, "alloc_peak_bytes_per_op": 10000},
+            "new": {"ops_per_sec": 1.0, "alloc_peak_bytes_per_op": 1},
+        }
+        regressions = micro.compare(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("a: 峰值分配"))
+        self.assertTrue(regressions[1].startswith("b: ops/sec"))
+
+    def test_cheap_cases_run(self):
+        cases = [c for c in micro.build_cases(quick=True) if "classify" in c.name or "selection" in c.name]
+        results = micro.run_cases(cases, min_time=0.01, repeat=1, verbose=False)
+        self.assertEqual(set(results), {c.name for c in cases})
+
+    def test_committed_baseline_covers_all_cases(self):
+        baseline = micro.load_baseline()
+        self.assertTrue({c.name for c in micro.build_cases()} <= set(baseline))
+
+
+if __name__ == "__main__":
+    unittest.main()
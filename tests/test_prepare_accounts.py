@@ -1,5 +1,7 @@
 import os
 import sys
+import threading
+import time
 import unittest
 from unittest import mock
 
@@ -89,6 +91,51 @@ class TestPrepareAccounts(unittest.TestCase):
 
         self.assertEqual(prepared[0]["status"], "溯源失败")
 
+    def test_saved_tokens_validated_concurrently_and_saved_once(self):
+        class State(dict):
+            saves = 0
+
+            def save_state(self):
+                State.saves += 1
+
+        state = State({f"u{i}": {"token": f"t{i}"} for i in range(6) if i != 2})
+        accounts = [(f"u{i}", "p") for i in range(6)]
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fake_token_flow(config, username, sso_base=None):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            if username == "u4":
+                return None
+            return {"token": "new-" + username, "user_info": {"realName": username}, "task_mgr": DummyTaskMgr()}
+
+        logins = []
+
+        def fake_login(config, username, password, sso_base):
+            logins.append(username)
+            return flows._prepared_entry(username, password, "登录失败")
+
+        with mock.patch.object(flows, "try_use_token_flow", side_effect=fake_token_flow), mock.patch.object(
+            flows, "get_account_entry", side_effect=lambda cfg, u: cfg.setdefault(u, {})
+        ), mock.patch.object(flows, "_login_account_interactively", side_effect=fake_login), mock.patch.dict(
+            os.environ, {"CEP_PRELOGIN_WORKERS": "4"}
+        ):
+            prepared = flows.prepare_accounts_for_selection(accounts=accounts, config=state, sso_base="https://example.com")
+
+        self.assertGreater(active["peak"], 1)
+        self.assertLessEqual(active["peak"], 4)
+        # 无 Token 与 Token 失效的账号在并发阶段之后按顺序交互登录
+        self.assertEqual(logins, ["u2", "u4"])
+        self.assertEqual([p["username"] for p in prepared], [f"u{i}" for i in range(6)])
+        self.assertEqual([p["status"] for p in prepared].count("已就绪"), 4)
+        self.assertEqual(state["u0"]["token"], "new-u0")
+        self.assertEqual(State.saves, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
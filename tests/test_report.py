@@ -0,0 +1,222 @@
+import datetime as _dt
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+from comprehensive_eval_pro.cli import parse_args
+from comprehensive_eval_pro.report import connect, failure_rates, ingest, never_submitted, parse_summary_line, slowest_endpoints
+from comprehensive_eval_pro.run_records import RunRecordWriter
+from comprehensive_eval_pro.summary_log import append_summary, flush_summaries
+
+
+def _info(school, grade, clazz):
+    return {"studentSchoolInfo": {"schoolName": school, "gradeName": grade, "className": clazz}}
+
+
+def _task(ts, school, grade, clazz, username, task_id, task_name, ok, attempt=1, run_id="r1"):
+    return {
+        "kind": "task",
+        "ts": ts,
+        "run_id": run_id,
+        "school": school,
+        "grade": grade,
+        "class": clazz,
+        "username": username,
+        "task_id": task_id,
+        "task_name": task_name,
+        "dimension": "劳动教育",
+        "ok": ok,
+        "msg": "" if ok else "服务器繁忙",
+        "elapsed_ms": 120.0,
+        "attempt": attempt,
+    }
+
+
+def _endpoint(ts, path, count, latency_sum_ms, run_id="r1"):
+    return {
+        "kind": "endpoint",
+        "ts": ts,
+        "run_id": run_id,
+        "method": "POST",
+        "host": "api.example",
+        "path": path,
+        "count": count,
+        "errors": 0,
+        "retries": 0,
+        "latency_sum_ms": latency_sum_ms,
+        "p95_ms": 250.0,
+    }
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_report_")
+        self.records_dir = os.path.join(self.tmp, "records")
+        self.log_dir = os.path.join(self.tmp, "summary_logs")
+        self.db = os.path.join(self.tmp, "report.db")
+        self.today = _dt.date.today().isoformat()
+        self.old_day = (_dt.date.today() - _dt.timedelta(days=30)).isoformat()
+
+        writer = RunRecordWriter(os.path.join(self.records_dir, "r1.jsonl"), max_bytes=0)
+        t = f"{self.today}T10:00:00.500"
+        for rec in (
+            _task(t, "一中", "高一", "1班", "u1", 1, "劳动A", True),
+            _task(t, "一中", "高一", "1班", "u1", 2, "劳动B", False),
+            _task(t, "一中", "高一", "2班", "u2", 1, "劳动A", False),
+            _task(t, "一中", "高一", "2班", "u2", 1, "劳动A", False, attempt=2),
+            _task(t, "二中", "高二", "3班", "u3", 1, "劳动A", True),
+            _endpoint(t, "/api/submit", 10, 9000.0),
+            _endpoint(t, "/api/getMyInfo", 10, 500.0),
+            _endpoint(f"{self.old_day}T09:00:00", "/api/old", 1, 99999.0, run_id="r0"),
+        ):
+            writer.write(rec)
+        writer.close()
+
+        # 旧的汇总日志：一条与运行记录重复 (同账号同任务同一秒)，一条只存在于汇总日志
+        for ok, task in ((False, "劳动B"), (True, "军训")):
+            append_summary(username="u1", user_info=_info("一中", "高一", "1班"), task_name=task, ok=ok, msg="失败原因", log_dir=self.log_dir)
+        flush_summaries()
+        path = os.path.join(self.log_dir, "一中", "高一", "1班", "u1.log")
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines(True)
+        lines[0] = f"\033[90m{self.today} 10:00:01\033[0m" + lines[0][lines[0].index(" | "):]
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        self.conn = connect(self.db)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _ingest(self):
+        return ingest(self.conn, records_dir=self.records_dir, log_dir=self.log_dir)
+
+    def test_parse_summary_line(self):
+        row = parse_summary_line("\033[90m2026-01-02 03:04:05\033[0m | \033[36m高一1班      \033[0m | \033[31mFAIL\033[0m | \033[33m劳动A\033[0m | \033[91m超时\033[0m\n")
+        self.assertEqual(row, {"ts": "2026-01-02 03:04:05", "class_display": "高一1班", "ok": False, "task_name": "劳动A", "msg": "超时"})
+        self.assertIsNone(parse_summary_line("garbage"))
+
+    def test_ingest_is_incremental_and_deduplicates_sources(self):
+        self.assertEqual(self._ingest(), {"records": 8, "summary_lines": 1})
+        self.assertEqual(self._ingest(), {"records": 0, "summary_lines": 0})
+        total = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self.assertEqual(total, 6)
+
+        # 追加写入后只导入新增部分；当前分段轮转成 .gz 后不会重复导入
+        writer = RunRecordWriter(os.path.join(self.records_dir, "r1.jsonl"), max_bytes=1)
+        writer.write(_task(f"{self.today}T11:00:00", "一中", "高一", "2班", "u2", 1, "劳动A", True, attempt=3))
+        writer.close()
+        self.assertTrue(any(n.endswith(".jsonl.gz") for n in os.listdir(self.records_dir)))
+        self._ingest()
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0], 7)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM endpoints").fetchone()[0], 3)
+
+    def test_ingest_after_rotation_reads_new_active_file_from_start(self):
+        records_dir = os.path.join(self.tmp, "rotated")
+        path = os.path.join(records_dir, "r2.jsonl")
+
+        def _rows(start, n):
+            return [_task(f"{self.today}T12:00:{i:02d}", "三中", "高三", "5班", f"s{i}", i, "劳动A", True, run_id="r2") for i in range(start, start + n)]
+
+        writer = RunRecordWriter(path, max_bytes=0)
+        for rec in _rows(0, 10):
+            writer.write(rec)
+        writer.close()
+        self.assertEqual(ingest(self.conn, records_dir=records_dir, log_dir=self.log_dir)["records"], 10)
+
+        # 轮转一次后新的当前分段写得比旧分段更长
+        writer = RunRecordWriter(path, max_bytes=os.path.getsize(path) + 1)
+        new_rows = _rows(10, 15)
+        writer.write(new_rows[0])
+        writer.max_bytes = 0
+        for rec in new_rows[1:]:
+            writer.write(rec)
+        writer.close()
+        self.assertGreater(os.path.getsize(path), self.conn.execute("SELECT offset FROM sources WHERE path = ?", (path,)).fetchone()[0])
+
+        ingest(self.conn, records_dir=records_dir, log_dir=self.log_dir)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM results WHERE run_id = 'r2'").fetchone()[0], 25)
+
+    def test_summary_dirs_map_back_to_raw_names(self):
+        school, clazz = "福清第一中学（高中部）", "(3)班"
+        records_dir = os.path.join(self.tmp, "punct_records")
+        log_dir = os.path.join(self.tmp, "punct_logs")
+        append_summary(username="p1", user_info=_info(school, "高一", clazz), task_name="军训", ok=False, msg="x", log_dir=log_dir)
+        flush_summaries()
+        self.assertTrue(os.path.isdir(os.path.join(log_dir, "福清第一中学_高中部_", "高一", "_3_班")))
+
+        # 先只有汇总日志：按目录名导入；运行记录出现后改回原始名称
+        ingest(self.conn, records_dir=records_dir, log_dir=log_dir)
+        writer = RunRecordWriter(os.path.join(records_dir, "r3.jsonl"), max_bytes=0)
+        writer.write(_task(f"{self.today}T09:00:00", school, "高一", clazz, "p1", 1, "劳动A", True, run_id="r3"))
+        writer.close()
+        ingest(self.conn, records_dir=records_dir, log_dir=log_dir)
+
+        rows = self.conn.execute("SELECT DISTINCT school, class FROM results").fetchall()
+        self.assertEqual([tuple(r) for r in rows], [(school, clazz)])
+        by_school = {r["school"]: r for r in failure_rates(self.conn)}
+        self.assertEqual((by_school[school]["total"], by_school[school]["failed"]), (2, 1))
+
+    def test_connect_upgrades_existing_sources_table(self):
+        old_db = os.path.join(self.tmp, "old.db")
+        raw = sqlite3.connect(old_db)
+        raw.execute("CREATE TABLE sources (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, offset INTEGER NOT NULL)")
+        raw.close()
+        conn = connect(old_db)
+        try:
+            self.assertIn("fingerprint", [row["name"] for row in conn.execute("PRAGMA table_info(sources)")])
+        finally:
+            conn.close()
+
+    def test_aggregate_queries(self):
+        self._ingest()
+        by_school = {r["school"]: r for r in failure_rates(self.conn)}
+        self.assertEqual((by_school["一中"]["total"], by_school["一中"]["failed"]), (5, 3))
+        self.assertEqual(by_school["一中"]["failure_rate"], 60.0)
+        self.assertEqual(by_school["二中"]["failed"], 0)
+
+        by_class = failure_rates(self.conn, group_by="class", grade="高一", since="1")
+        self.assertEqual([(r["class"], r["failed"]) for r in by_class], [("2班", 2), ("1班", 1)])
+
+        missing = never_submitted(self.conn, school="一中")
+        self.assertEqual(
+            [(r["class"], r["task_name"], r["attempts"]) for r in missing],
+            [("1班", "劳动B", 1), ("2班", "军训", 0), ("2班", "劳动A", 2), ("2班", "劳动B", 0)],
+        )
+        self.assertEqual(len(never_submitted(self.conn, school="一中", clazz="1班")), 1)
+
+        slow = slowest_endpoints(self.conn, since="7")
+        self.assertEqual([r["path"] for r in slow], ["/api/submit", "/api/getMyInfo"])
+        self.assertEqual(slow[0]["avg_ms"], 900.0)
+        self.assertEqual(slowest_endpoints(self.conn, since=self.old_day, limit=1)[0]["path"], "/api/old")
+
+    def test_report_subcommand(self):
+        args = parse_args(["report", "--db", self.db, "endpoints", "--since", "3"])
+        self.assertEqual((args.command, args.query, args.since), ("report", "endpoints", "3"))
+        self.assertIsNone(parse_args([]).command)
+
+        argv = ["report", "--db", self.db, "--records-dir", self.records_dir, "--summary-dir", self.log_dir, "failures", "--by", "grade"]
+        with redirect_stdout(io.StringIO()) as out, mock.patch.object(flows, "_main_impl", side_effect=AssertionError("不应进入主流程")):
+            self.assertEqual(flows.main(argv), 0)
+        text = out.getvalue()
+        self.assertIn("已导入", text)
+        self.assertIn("failure_rate", text)
+        self.assertIn("高二", text)
+        self.assertIn("查询耗时", text)
+
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(flows.main(["report", "--db", self.db, "--no-ingest", "failures", "--since", "not-a-date"]), 2)
+        self.assertIn("参数无效", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
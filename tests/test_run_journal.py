@@ -0,0 +1,194 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+from comprehensive_eval_pro.cli import parse_args
+from comprehensive_eval_pro.run_journal import RunJournal, current_journal, start_run_journal, stop_run_journal
+from comprehensive_eval_pro.run_records import close_run_records
+from comprehensive_eval_pro.summary_log import flush_summaries
+
+
+class DummyMgr:
+    def __init__(self, tasks):
+        self._tasks = tasks
+        self.submitted = []
+        self.student_name = "stu"
+        self.user_info = {}
+
+    def get_all_tasks(self, force_refresh=False):
+        return self._tasks
+
+    def get_class_meeting_folders(self):
+        return []
+
+    def audit_resources(self):
+        return []
+
+    def submit_task(self, task, ai_gen, dry_run=True, use_cache=True):
+        self.submitted.append(task.get("name"))
+        return {"code": 1 if task.get("name") != "劳动C" else 0, "msg": "服务器繁忙"}
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_journal_")
+        self.env = mock.patch.dict(os.environ, {"CEP_SUMMARY_LOG_DIR": self.tmp, "CEP_RECORDS_DIR": self.tmp})
+        self.env.start()
+
+    def tearDown(self):
+        stop_run_journal()
+        close_run_records()
+        flush_summaries()
+        self.env.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_reopen_restores_completed_work(self):
+        journal = RunJournal.create("run1", journal_dir=self.tmp)
+        journal.record_run(accounts_file="accounts.txt", selected=["u1", "u2"])
+        journal.record_preset({"mode": "y", "scope": "all", "skip_review": True, "gen_counts": {"x": 1}})
+        journal.record_task("u1", {"id": 11, "name": "劳动A"}, True)
+        journal.record_task("u1", {"id": 12, "name": "劳动B"}, False, "失败")
+        journal.record_account("u1", "ok")
+        journal.record_account("u2", "skip")
+        journal.close()
+
+        resumed = RunJournal.resume("run1", journal_dir=self.tmp)
+        self.assertEqual(resumed.meta["selected"], ["u1", "u2"])
+        self.assertEqual(resumed.preset["scope"], "all")
+        self.assertNotIn("gen_counts", resumed.preset)
+        self.assertTrue(resumed.is_task_done("u1", {"id": 11}))
+        self.assertFalse(resumed.is_task_done("u1", {"id": 12}))
+        self.assertEqual(resumed.done_accounts(), {"u1"})
+        resumed.close()
+        self.assertIsNone(RunJournal.resume("missing", journal_dir=self.tmp))
+
+    def test_torn_last_line_is_ignored_and_terminated(self):
+        path = os.path.join(self.tmp, "run2.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"account": "u1", "task_id": None, "phase": "account", "result": "ok"}) + "\n")
+            f.write('{"account": "u2", "phase": "acc')
+        journal = RunJournal.resume("run2", journal_dir=self.tmp)
+        self.assertEqual(journal.done_accounts(), {"u1"})
+        journal.record_account("u2", "ok")
+        journal.close()
+        self.assertEqual(RunJournal.resume("run2", journal_dir=self.tmp).done_accounts(), {"u1", "u2"})
+
+    def test_fsync_in_batches(self):
+        journal = RunJournal(os.path.join(self.tmp, "run3.jsonl"), "run3", fsync_batch=3)
+        with mock.patch("comprehensive_eval_pro.run_journal.os.fsync") as fsync:
+            for i in range(7):
+                journal.record_account(f"u{i}", "ok")
+            self.assertEqual(fsync.call_count, 2)
+            journal.close()
+            self.assertEqual(fsync.call_count, 3)
+
+    def test_task_flow_skips_tasks_completed_before_interruption(self):
+        journal = start_run_journal(journal_dir=self.tmp)
+        journal.record_task("u1", {"id": 1, "name": "劳动A"}, True)
+        tasks = [
+            {"id": 1, "name": "劳动A", "circleTaskStatus": "已提交", "dimensionName": "x"},
+            {"id": 2, "name": "劳动B", "circleTaskStatus": "待写实", "dimensionName": "x"},
+            {"id": 3, "name": "劳动C", "circleTaskStatus": "待写实", "dimensionName": "x"},
+        ]
+        preset = {
+            "mode": "ld",
+            "selection": "ld",
+            "scope": "all",
+            "indices": [],
+            "skip_review": True,
+            "confirmed_resubmit": True,
+            "diversity_every": 5,
+            "submit_index": 0,
+        }
+        mgr = DummyMgr(tasks)
+        with redirect_stdout(io.StringIO()):
+            status, _ = flows.process_account({"username": "u1", "task_mgr": mgr}, object(), preset, interactive=False)
+        # 劳动C 提交失败：账号记为 partial，续跑时不会被当作已完成
+        self.assertEqual(status, "partial")
+        self.assertEqual(mgr.submitted, ["劳动B", "劳动C"])
+        self.assertTrue(journal.is_task_done("u1", tasks[1]))
+        self.assertFalse(journal.is_task_done("u1", tasks[2]))
+        self.assertEqual(journal.done_accounts(), set())
+
+        # 再次执行只重试失败的任务，全部成功后账号才记为完成
+        mgr.submitted.clear()
+        mgr.submit_task = lambda task, ai_gen, dry_run=True, use_cache=True: mgr.submitted.append(task.get("name")) or {"code": 1}
+        with redirect_stdout(io.StringIO()):
+            status, _ = flows.process_account({"username": "u1", "task_mgr": mgr}, object(), preset, interactive=False)
+        self.assertEqual(status, "ok")
+        self.assertEqual(mgr.submitted, ["劳动C"])
+        self.assertEqual(journal.done_accounts(), {"u1"})
+
+    def test_resume_retries_account_whose_task_scan_failed(self):
+        accounts_file = os.path.join(self.tmp, "accounts.txt")
+        with open(accounts_file, "w", encoding="utf-8") as f:
+            f.write("u1 p1\nu2 p2\nu3 p3\n")
+        preset = {"mode": "ld", "selection": "ld", "scope": "all", "indices": [], "skip_review": True, "confirmed_resubmit": True, "diversity_every": 5}
+        journal = start_run_journal(journal_dir=self.tmp)
+        journal.record_run(accounts_file=accounts_file, selected=["u1", "u2", "u3"])
+        journal.record_preset(preset)
+        with redirect_stdout(io.StringIO()):
+            # 任务扫描失败 (返回空列表)：账号记为 skip
+            status, _ = flows.process_account({"username": "u1", "task_mgr": DummyMgr([])}, object(), dict(preset), interactive=False)
+        self.assertEqual(status, "skip")
+        journal.record_account("u2", "ok")
+        run_id = stop_run_journal().run_id
+
+        tasks = [{"id": 1, "name": "劳动A", "circleTaskStatus": "待写实", "dimensionName": "x"}]
+        mgrs = {}
+
+        def _prepare(accounts, config, sso_base):
+            prepared = []
+            for username, _ in accounts:
+                mgrs[username] = DummyMgr(tasks)
+                # u3 预登录失败，续跑时同样不能被选中
+                status = "已就绪" if username != "u3" else "登录失败"
+                prepared.append({"username": username, "status": status, "task_mgr": mgrs[username] if status == "已就绪" else None})
+            return prepared
+
+        with mock.patch.dict(os.environ, {"CEP_JOURNAL_DIR": self.tmp, "CEP_BATCH_WORKERS": "1"}), \
+                mock.patch.object(flows, "prepare_accounts_for_selection", side_effect=_prepare), \
+                mock.patch.object(flows, "start_image_prewarm"), mock.patch.object(flows.health_cache, "prewarm"), \
+                mock.patch.object(flows, "_mark_task_submitted"), \
+                mock.patch("builtins.input", side_effect=AssertionError("不应进入交互")), redirect_stdout(io.StringIO()) as out:
+            flows._main_impl(parse_args(["--resume", run_id]))
+
+        self.assertEqual(sorted(mgrs), ["u1", "u3"])
+        self.assertEqual(mgrs["u1"].submitted, ["劳动A"])
+        self.assertEqual(mgrs["u3"].submitted, [])
+        self.assertIn("成功执行账号数: 1/1", out.getvalue())
+        self.assertEqual(current_journal().done_accounts(), {"u1", "u2"})
+
+    def test_journal_file_is_created_on_first_record(self):
+        journal = start_run_journal(journal_dir=self.tmp)
+        self.assertFalse(os.path.exists(journal.path))
+        with redirect_stdout(io.StringIO()) as out:
+            flows._print_resume_hint()
+        self.assertEqual(out.getvalue(), "")
+
+        journal.record_run(accounts_file="accounts.txt", selected=["u1"])
+        self.assertTrue(os.path.exists(journal.path))
+        with redirect_stdout(io.StringIO()) as out:
+            flows._print_resume_hint()
+        self.assertIn(f"--resume {journal.run_id}", out.getvalue())
+
+    def test_resume_argument_and_unknown_run(self):
+        self.assertEqual(parse_args(["--resume", "20260101-000000-1"]).resume, "20260101-000000-1")
+        with mock.patch.dict(os.environ, {"CEP_JOURNAL_DIR": self.tmp}), redirect_stdout(io.StringIO()) as out, \
+                mock.patch("builtins.input", side_effect=AssertionError("不应进入交互")):
+            flows._main_impl(parse_args(["--resume", "nope"]))
+        self.assertIn("未找到运行记录", out.getvalue())
+        self.assertIsNone(current_journal())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+from comprehensive_eval_pro.run_journal import start_run_journal, stop_run_journal
+from comprehensive_eval_pro.run_records import RunRecordWriter, close_run_records, iter_run_records
+from comprehensive_eval_pro.summary_log import flush_summaries
+
+
+class DummyMgr:
+    def __init__(self, tasks):
+        self._tasks = tasks
+        self.student_name = "stu"
+        self.user_info = {"studentSchoolInfo": {"schoolName": "测试中学", "gradeName": "高一", "className": "八班"}}
+
+    def get_all_tasks(self, force_refresh=False):
+        return self._tasks
+
+    def get_class_meeting_folders(self):
+        return []
+
+    def audit_resources(self):
+        return []
+
+    def submit_task(self, task, ai_gen, dry_run=True, use_cache=True):
+        return {"code": 0, "msg": "服务器繁忙"} if task.get("id") == 2 else {"code": 1, "msg": "ok"}
+
+
+class TestRunRecords(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_records_")
+        self.env = mock.patch.dict(
+            os.environ, {"CEP_SUMMARY_LOG_DIR": os.path.join(self.tmp, "summary_logs"), "CEP_RECORDS_DIR": self.tmp}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        stop_run_journal()
+        close_run_records()
+        flush_summaries()
+        self.env.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_rotation_compresses_segments_and_keeps_order(self):
+        path = os.path.join(self.tmp, "run.jsonl")
+        writer = RunRecordWriter(path, max_bytes=400)
+        for i in range(40):
+            writer.write({"i": i, "msg": "x" * 20})
+        writer.close()
+
+        names = sorted(os.listdir(self.tmp))
+        segments = [n for n in names if n.startswith("run.0")]
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(n.endswith(".jsonl.gz") for n in segments), names)
+        self.assertLessEqual(os.path.getsize(path), 400)
+        self.assertEqual([r["i"] for r in iter_run_records(path)], list(range(40)))
+
+        # 续写同一运行时序号继续递增
+        writer = RunRecordWriter(path, max_bytes=400)
+        for i in range(40, 60):
+            writer.write({"i": i, "msg": "x" * 20})
+        writer.close()
+        self.assertEqual([r["i"] for r in iter_run_records(path)], list(range(60)))
+
+    def test_task_flow_writes_one_record_per_submit(self):
+        journal = start_run_journal(journal_dir=os.path.join(self.tmp, "journal"))
+        tasks = [
+            {"id": 1, "name": "劳动A", "circleTaskStatus": "待写实", "dimensionName": "劳动教育"},
+            {"id": 2, "name": "劳动B", "circleTaskStatus": "待写实", "dimensionName": "劳动教育"},
+        ]
+        preset = {
+            "mode": "ld",
+            "selection": "ld",
+            "scope": "all",
+            "indices": [],
+            "skip_review": True,
+            "confirmed_resubmit": True,
+            "diversity_every": 5,
+            "submit_index": 0,
+        }
+        mgr = DummyMgr(tasks)
+        with redirect_stdout(io.StringIO()):
+            flows.run_task_flow(mgr, object(), preset=preset, strict=False, account_username="u1")
+            flows.run_task_flow(mgr, object(), preset=preset, strict=False, account_username="u1")
+        path = close_run_records()
+
+        self.assertEqual(os.path.basename(path), f"{journal.run_id}.jsonl")
+        records = list(iter_run_records(path))
+        self.assertEqual([(r["task_id"], r["ok"], r["attempt"]) for r in records], [(1, True, 1), (2, False, 1), (2, False, 2)])
+        first = records[0]
+        self.assertEqual((first["school"], first["grade"], first["class"], first["username"]), ("测试中学", "高一", "八班", "u1"))
+        self.assertEqual(first["task_name"], "劳动A")
+        self.assertEqual(first["run_id"], journal.run_id)
+        self.assertIsInstance(first["elapsed_ms"], float)
+        self.assertEqual(records[1]["msg"], "服务器繁忙")
+
+    def test_disabled_records(self):
+        with mock.patch.dict(os.environ, {"CEP_RECORDS_ENABLED": "false"}):
+            flows.record_task_result(username="u1", user_info={}, task={"id": 1}, ok=True)
+        self.assertIsNone(close_run_records())
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
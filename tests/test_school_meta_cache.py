@@ -0,0 +1,81 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows, runtime_cache
+from comprehensive_eval_pro.services import auth as auth_module
+from comprehensive_eval_pro.services.auth import ProAuthService
+
+
+class TestSchoolMetaCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_school_meta_")
+        self.env = mock.patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
+        self.auth = ProAuthService(sso_base="https://sso.example")
+        self.responses = {}
+        self.calls = []
+
+    def tearDown(self):
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _fake(self, session, method, url, **kwargs):
+        username = url.rsplit("=", 1)[1]
+        self.calls.append(username)
+        return self.responses.get(username)
+
+    def test_positive_result_is_persisted(self):
+        self.responses["u1"] = {"code": 1, "dataList": [{"schoolId": 7, "NAME": "一中"}]}
+        with mock.patch.object(auth_module, "request_json", side_effect=self._fake):
+            self.assertEqual(self.auth.get_school_meta("u1"), {"id": "7", "name": "一中"})
+            # 查询时不落盘，由退出流程统一保存
+            self.assertEqual(os.listdir(self.cache_dir), [])
+            runtime_cache.save_runtime_caches()
+            runtime_cache.reset_runtime_caches()
+            self.assertEqual(ProAuthService(sso_base="https://sso.example").get_school_meta("u1"), {"id": "7", "name": "一中"})
+        self.assertEqual(self.calls, ["u1"])
+
+    def test_negative_cache_expires_and_transport_errors_are_not_cached(self):
+        self.responses["u2"] = {"code": 1, "dataList": []}
+        with mock.patch.object(auth_module, "request_json", side_effect=self._fake):
+            self.assertEqual(self.auth.get_school_meta("u2"), {})
+            self.assertEqual(self.auth.get_school_meta("u2"), {})
+            self.assertEqual(self.calls, ["u2"])
+
+            with mock.patch.dict(os.environ, {"CEP_SCHOOL_META_NEGATIVE_TTL": "0"}), mock.patch.object(
+                runtime_cache.time, "time", return_value=time.time() + 1
+            ):
+                self.auth.get_school_meta("u2")
+            self.assertEqual(self.calls, ["u2", "u2"])
+
+            # u3 无响应 (网络异常)：每次都重新查询
+            self.auth.get_school_meta("u3")
+            self.auth.get_school_meta("u3")
+            self.assertEqual(self.calls[-2:], ["u3", "u3"])
+
+    def test_patch_school_info_uses_cache_without_auth_service(self):
+        auth_module.store_school_meta("https://sso.example", "u4", {"id": "9", "name": "二中"})
+
+        class Mgr:
+            user_info = {}
+
+            def _school_name(self):
+                return ""
+
+        mgr = Mgr()
+        with mock.patch.object(flows, "ProAuthService", side_effect=AssertionError("should not build auth")):
+            flows._patch_school_info(mgr, None, "u4", sso_base="https://sso.example")
+        self.assertEqual(mgr.user_info["studentSchoolInfo"], {"schoolName": "二中", "schoolId": "9"})
+
+
+if __name__ == "__main__":
+    unittest.main()
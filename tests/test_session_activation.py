@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import runtime_cache
+from comprehensive_eval_pro.services import task_manager as tm_module
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+
+
+MY_INFO = {
+    "realName": "张三",
+    "studentSchoolInfo": {"schoolName": "测试中学", "gradeName": "高一", "className": "1班"},
+}
+
+
+class TestSessionActivationCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_activation_")
+        self.env = mock.patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
+        self.urls = []
+
+    def tearDown(self):
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _fake(self, session, method, url, **kwargs):
+        self.urls.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/getMenu"):
+            return {"code": 1, "data": {"menuRole": "student"}}, None
+        return {"code": 1, "data": dict(MY_INFO)}, None
+
+    def _activate(self, token="tok", use_cache=True):
+        mgr = ProTaskManager(token, base_url="http://example.test")
+        with mock.patch.object(tm_module, "request_json_response", side_effect=self._fake), mock.patch.object(
+            mgr.session, "get"
+        ) as home, mock.patch.object(ProTaskManager, "_ensure_resource_dirs") as ensure_dirs, mock.patch.object(
+            ProTaskManager, "print_resource_setup_hints"
+        ):
+            self.assertTrue(mgr.activate_session(use_cache=use_cache))
+        return mgr, home, ensure_dirs
+
+    def test_fresh_cache_replays_only_my_info(self):
+        self._activate()
+        self.assertEqual(self.urls, ["getMenu", "getMyInfo"])
+
+        self.urls.clear()
+        # 模拟重启：预登录结束时统一写回，然后丢弃内存实例
+        runtime_cache.save_runtime_caches()
+        runtime_cache.reset_runtime_caches()
+        mgr, home, ensure_dirs = self._activate()
+        self.assertEqual(self.urls, ["getMyInfo"])
+        home.assert_not_called()
+        ensure_dirs.assert_not_called()
+        # 菜单补充的字段从缓存恢复
+        self.assertEqual(mgr.user_info.get("menuRole"), "student")
+        self.assertEqual(mgr.student_name, "张三")
+
+    def test_identity_change_reruns_asset_setup(self):
+        self._activate()
+        changed = {"studentSchoolInfo": {"schoolName": "测试中学", "gradeName": "高二", "className": "1班"}}
+        with mock.patch.dict(MY_INFO, changed):
+            _, _, ensure_dirs = self._activate()
+        ensure_dirs.assert_called_once()
+
+    def test_force_refresh_and_other_tokens_do_full_activation(self):
+        self._activate()
+        self.urls.clear()
+        _, home, _ = self._activate(use_cache=False)
+        self.assertEqual(self.urls, ["getMenu", "getMyInfo"])
+        home.assert_called_once()
+
+        self.urls.clear()
+        self._activate(token="other")
+        self.assertEqual(self.urls, ["getMenu", "getMyInfo"])
+
+        self.urls.clear()
+        with mock.patch.dict(os.environ, {"CEP_ACTIVATION_CACHE_TTL": "0"}):
+            self._activate()
+        self.assertEqual(self.urls, ["getMenu", "getMyInfo"])
+
+    def test_activations_are_saved_once_and_expired_entries_pruned(self):
+        with mock.patch.object(runtime_cache, "save_json_config", wraps=runtime_cache.save_json_config) as save:
+            for token in ("t1", "t2", "t3"):
+                self._activate(token=token)
+            self.assertEqual(save.call_count, 0)
+            runtime_cache.save_runtime_caches()
+            runtime_cache.save_runtime_caches()
+            self.assertEqual(save.call_count, 1)
+
+        # 写回时清理过期条目
+        cache = runtime_cache.get_runtime_cache("activations", 3600)
+        with mock.patch.object(runtime_cache.time, "time", return_value=time.time() + 7200):
+            cache.set("fresh", {})
+        with open(os.path.join(self.cache_dir, "activations.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)), ["fresh"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ import unittest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from comprehensive_eval_pro.summary_log import append_summary
+from comprehensive_eval_pro.summary_log import append_summary, flush_summaries
 
 
 class TestSummaryLog(unittest.TestCase):
@@ -24,6 +24,7 @@ class TestSummaryLog(unittest.TestCase):
                 ok=True,
                 log_dir=d,
             )
+            self.assertTrue(flush_summaries(timeout=5))
             # 新路径逻辑：{log_dir}/{school}/{grade}/{class}/{username}.log
             path = os.path.join(d, "测试中学", "高一", "八班", "u1.log")
             self.assertTrue(os.path.exists(path))
@@ -8,7 +8,7 @@ import unittest
 # 允许从根目录导入
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from comprehensive_eval_pro.summary_log import append_summary
+from comprehensive_eval_pro.summary_log import append_summary, flush_summaries
 
 class TestSummaryLogConcurrency(unittest.TestCase):
     def setUp(self):
@@ -56,6 +56,7 @@ class TestSummaryLogConcurrency(unittest.TestCase):
 
         for t in threads:
             t.join()
+        self.assertTrue(flush_summaries(timeout=10))
 
         # 验证结果
         log_path = os.path.join(self.test_dir, "并发测试学校", "高一", "八班", f"{self.username}.log")
@@ -0,0 +1,101 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.summary_log import SummaryWriter
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestSummaryWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_summary_writer_")
+        self.writer = SummaryWriter(max_open_files=2, flush_interval=0.05)
+
+    def tearDown(self):
+        self.writer.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_lru_keeps_order_across_evictions(self):
+        paths = [os.path.join(self.tmp, f"班级{i % 5}", f"u{i % 5}.log") for i in range(50)]
+        for i, path in enumerate(paths):
+            self.writer.write(path, f"line{i}\n")
+        self.assertTrue(self.writer.flush(timeout=5))
+        self.assertLessEqual(len(self.writer._handles), 2)
+        for k in range(5):
+            lines = _read(os.path.join(self.tmp, f"班级{k}", f"u{k}.log")).splitlines()
+            self.assertEqual(lines, [f"line{i}" for i in range(k, 50, 5)])
+
+    def test_interval_flush_without_explicit_flush(self):
+        path = os.path.join(self.tmp, "a", "u1.log")
+        self.writer.write(path, "hello\n")
+        deadline = time.time() + 5
+        while time.time() < deadline and not (os.path.exists(path) and _read(path)):
+            time.sleep(0.02)
+        self.assertEqual(_read(path), "hello\n")
+
+    def test_close_drains_and_restarts_on_next_write(self):
+        path = os.path.join(self.tmp, "b", "u1.log")
+        self.writer.write(path, "one\n")
+        self.writer.close()
+        self.assertEqual(_read(path), "one\n")
+        self.writer.write(path, "two\n")
+        self.assertTrue(self.writer.flush(timeout=5))
+        self.assertEqual(_read(path), "one\ntwo\n")
+
+    def test_writes_racing_close_use_a_single_writer_thread(self):
+        path = os.path.join(self.tmp, "c", "u1.log")
+        stop = threading.Event()
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+        run = self.writer._run
+
+        def _counted_run(*args):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            try:
+                run(*args)
+            finally:
+                time.sleep(0.01)  # 拉长线程退出过程，放大 close 与 write 的竞争窗口
+                with lock:
+                    running["now"] -= 1
+
+        self.writer._run = _counted_run
+
+        def _writer(n):
+            for i in range(200):
+                self.writer.write(path, f"{n}-{i}\n")
+
+        def _closer():
+            while not stop.is_set():
+                self.writer.close()
+
+        closer = threading.Thread(target=_closer)
+        closer.start()
+        workers = [threading.Thread(target=_writer, args=(n,)) for n in range(4)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        stop.set()
+        closer.join()
+        self.assertTrue(self.writer.flush(timeout=5))
+        self.assertEqual(running["peak"], 1)
+        self.assertEqual(sorted(_read(path).splitlines()), sorted(f"{n}-{i}" for n in range(4) for i in range(200)))
+
+    def test_flush_before_any_write(self):
+        self.assertTrue(SummaryWriter().flush(timeout=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import runtime_cache
+from comprehensive_eval_pro.services import task_manager as tm_module
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+
+
+class TestConcurrentDimensionScan(unittest.TestCase):
+    def setUp(self):
+        self.mgr = ProTaskManager("t", base_url="http://example.test")
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _fake_request_json(self, dimensions):
+        def fake(session, method, url, **kwargs):
+            if url.endswith("/getDimensions"):
+                if dimensions is None:
+                    return None
+                return {"code": 1, "dataList": dimensions}
+            if "getCircleStatistics" in url:
+                d_id = url.rsplit("=", 1)[1]
+                with self.lock:
+                    self.in_flight += 1
+                    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                # 让靠前的维度更慢返回，验证合并顺序不受完成顺序影响
+                time.sleep(0.05 / int(d_id))
+                with self.lock:
+                    self.in_flight -= 1
+                # 任务 100 在每个维度中都出现，应归属第一个维度
+                return {"code": 1, "data": {"taskList": [{"id": 100, "name": "共享"}, {"id": int(d_id), "name": f"任务{d_id}"}]}}
+            return None
+
+        return fake
+
+    def test_results_are_ordered_and_deduped(self):
+        dims = [{"id": i, "name": f"维度名{i}"} for i in (1, 2, 3, 4, 5)]
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake_request_json(dims)):
+            tasks = self.mgr.get_all_tasks()
+
+        self.assertEqual([t["id"] for t in tasks], [100, 1, 2, 3, 4, 5])
+        self.assertEqual(tasks[0]["dimensionId"], "1")
+        self.assertEqual(tasks[0]["dimensionName"], "维度名1")
+        self.assertGreater(self.max_in_flight, 1)
+
+    def test_fallback_dimensions_scanned_when_list_unavailable(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake_request_json(None)):
+            tasks = self.mgr.get_all_tasks()
+
+        self.assertEqual([t["id"] for t in tasks], [100] + list(range(1, 16)))
+        self.assertEqual(tasks[-1]["dimensionName"], "维度15")
+
+
+class TestSchoolDimensionCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_dim_cache_")
+        self.env = mock.patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
+        self.calls = []
+
+    def tearDown(self):
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _mgr(self, school_id="S1"):
+        return ProTaskManager(
+            "t",
+            base_url="http://example.test",
+            user_info={"studentSchoolInfo": {"schoolName": "测试学校", "schoolId": school_id}},
+        )
+
+    def _fake(self, session, method, url, **kwargs):
+        self.calls.append(url)
+        if url.endswith("/getDimensions"):
+            return {"code": 1, "dataList": [{"id": 7, "name": "思想品德", "extra": "x"}]}
+        return {"code": 1, "data": {"taskList": [{"id": 1, "name": "任务"}]}}
+
+    def test_second_account_skips_get_dimensions(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            self._mgr().get_all_tasks()
+            self.calls.clear()
+            # 模拟重启：丢弃内存实例，只依赖磁盘缓存
+            runtime_cache.reset_runtime_caches()
+            tasks = self._mgr().get_all_tasks()
+
+        self.assertFalse(any(u.endswith("/getDimensions") for u in self.calls))
+        self.assertEqual(tasks[0]["dimensionName"], "思想品德")
+
+    def test_other_school_and_force_refresh_refetch(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            self._mgr().get_all_tasks()
+            self.calls.clear()
+            self._mgr(school_id="S2").get_all_tasks()
+            self.assertTrue(any(u.endswith("/getDimensions") for u in self.calls))
+
+            self.calls.clear()
+            mgr = self._mgr()
+            with mock.patch.object(mgr, "activate_session", return_value=True):
+                mgr.get_all_tasks(force_refresh=True)
+            self.assertTrue(any(u.endswith("/getDimensions") for u in self.calls))
+
+
+class TestTaskSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="cep_snapshot_")
+        self.env = mock.patch.dict(os.environ, {"CEP_RUNTIME_CACHE_DIR": self.cache_dir})
+        self.env.start()
+        runtime_cache.reset_runtime_caches()
+        self.calls = []
+        self.status = {"1": "待写实", "2": "待写实"}
+
+    def tearDown(self):
+        self.env.stop()
+        runtime_cache.reset_runtime_caches()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _fake(self, session, method, url, **kwargs):
+        self.calls.append(url)
+        if url.endswith("/getDimensions"):
+            return {"code": 1, "dataList": [{"id": 1, "name": "维度一"}, {"id": 2, "name": "维度二"}]}
+        d_id = url.rsplit("=", 1)[1]
+        return {"code": 1, "data": {"taskList": [{"id": int(d_id), "name": f"任务{d_id}", "circleTaskStatus": self.status[d_id]}]}}
+
+    def _mgr(self):
+        return ProTaskManager("t", base_url="http://example.test")
+
+    def test_snapshot_reuse_and_incremental_refresh(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            first = self._mgr().load_tasks("u1")
+            self.assertEqual(len(first), 2)
+
+            self.calls.clear()
+            runtime_cache.reset_runtime_caches()
+            second = self._mgr().load_tasks("u1")
+            self.assertEqual(self.calls, [])
+            self.assertEqual([t["id"] for t in second], [1, 2])
+            self.assertEqual(second[1]["dimensionName"], "维度二")
+
+            # 提交维度 2 的任务后，只重新拉取维度 2
+            self._mgr().mark_tasks_submitted("u1", [second[1]])
+            self.status["2"] = "已提交"
+            third = self._mgr().load_tasks("u1")
+            self.assertEqual(len(self.calls), 1)
+            self.assertTrue(self.calls[0].endswith("dimensionId=2"))
+            self.assertEqual(third[1]["circleTaskStatus"], "已提交")
+
+            self.calls.clear()
+            self._mgr().load_tasks("u1")
+            self.assertEqual(self.calls, [])
+
+    def test_failed_refresh_keeps_tasks_and_dirty_flag(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            tasks = self._mgr().load_tasks("u1")
+            self._mgr().mark_tasks_submitted("u1", [tasks[1]])
+
+        # 增量刷新时维度 2 请求失败：保留旧任务，下次加载继续重试
+        def _flaky(session, method, url, **kwargs):
+            return None if url.endswith("dimensionId=2") else self._fake(session, method, url, **kwargs)
+
+        with mock.patch.object(tm_module, "request_json", side_effect=_flaky):
+            kept = self._mgr().load_tasks("u1")
+        self.assertEqual([t["id"] for t in kept], [1, 2])
+
+        self.status["2"] = "已提交"
+        self.calls.clear()
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            retried = self._mgr().load_tasks("u1")
+            self.assertEqual(len(self.calls), 1)
+            self.assertTrue(self.calls[0].endswith("dimensionId=2"))
+            self.assertEqual(retried[1]["circleTaskStatus"], "已提交")
+
+            self.calls.clear()
+            self._mgr().load_tasks("u1")
+            self.assertEqual(self.calls, [])
+
+    def test_rescan_and_expiry_force_full_scan(self):
+        with mock.patch.object(tm_module, "request_json", side_effect=self._fake):
+            self._mgr().load_tasks("u1")
+            self.calls.clear()
+            self._mgr().load_tasks("u1", rescan=True)
+            self.assertEqual(len(self.calls), 3)
+
+            self.calls.clear()
+            with mock.patch.dict(os.environ, {"CEP_TASK_SNAPSHOT_TTL": "0"}):
+                self._mgr().load_tasks("u1")
+            self.assertEqual(len(self.calls), 3)
+
+            # 其它账号不共享快照
+            self.calls.clear()
+            self._mgr().load_tasks("u2")
+            self.assertEqual(len(self.calls), 3)
+
+    def test_cli_rescan_flag(self):
+        from comprehensive_eval_pro.cli import parse_args
+
+        self.assertTrue(parse_args(["--rescan"]).rescan)
+        self.assertFalse(parse_args([]).rescan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import base64
+import json
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro import flows
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+
+
+def make_jwt(payload: dict) -> str:
+    def _b64(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode("utf-8")).decode("ascii").rstrip("=")
+
+    return f"{_b64({'alg': 'HS256'})}.{_b64(payload)}.sig"
+
+
+class TestTokenExpiry(unittest.TestCase):
+    def test_seconds_remaining(self):
+        now = time.time()
+        self.assertAlmostEqual(ProTaskManager(make_jwt({"exp": now + 100})).token_seconds_remaining(now), 100, places=3)
+        self.assertIsNone(ProTaskManager("opaque-token").token_seconds_remaining())
+        self.assertIsNone(ProTaskManager(make_jwt({"sub": "x"})).token_seconds_remaining())
+        # iat 在未来：本机时钟不可信，需在线校验
+        self.assertIsNone(ProTaskManager(make_jwt({"exp": now + 9999, "iat": now + 3600})).token_seconds_remaining(now))
+
+    def test_school_name_still_read_from_token(self):
+        mgr = ProTaskManager(make_jwt({"schoolName": "令牌中学"}))
+        self.assertEqual(mgr._school_name(), "令牌中学")
+
+    def _run_token_flow(self, token: str, margin: str = "3600"):
+        state = {"accounts": {"u1": {"token": token, "user_info": {"realName": "A"}}}}
+        with mock.patch.object(ProTaskManager, "activate_session", return_value=True) as activate, mock.patch.dict(
+            os.environ, {"CEP_TOKEN_EXPIRY_MARGIN": margin}
+        ):
+            result = flows.try_use_token_flow(state, "u1")
+        return result, activate
+
+    def test_fresh_jwt_skips_network_validation(self):
+        result, activate = self._run_token_flow(make_jwt({"exp": time.time() + 7200}))
+        self.assertIsNotNone(result)
+        self.assertEqual(result["user_info"]["realName"], "A")
+        activate.assert_not_called()
+
+    def test_near_expiry_or_opaque_token_is_verified_online(self):
+        for token in (make_jwt({"exp": time.time() + 600}), "opaque-token"):
+            _, activate = self._run_token_flow(token)
+            activate.assert_called_once()
+
+    def test_negative_margin_disables_local_check(self):
+        _, activate = self._run_token_flow(make_jwt({"exp": time.time() + 7200}), margin="-1")
+        activate.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
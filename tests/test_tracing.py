@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from comprehensive_eval_pro.services.task_manager import ProTaskManager
+from comprehensive_eval_pro.utils import tracing
+
+
+class DummyAI:
+    def generate_speech_content(self, task_name, use_cache=True, school_name=""):
+        return "文案"
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="cep_trace_")
+        self.path = os.path.join(self.tmp, "traces", "trace.json")
+
+    def tearDown(self):
+        tracing.stop_tracing()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _load(self, path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["traceEvents"]
+
+    def test_disabled_tracing_is_a_no_op(self):
+        self.assertFalse(tracing.is_tracing())
+        self.assertIs(tracing.span("x"), tracing.span("y"))
+
+        @tracing.traced()
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertIsNone(tracing.stop_tracing())
+
+    def test_spans_and_decorator_export_chrome_events(self):
+        tracing.start_tracing(self.path)
+
+        @tracing.traced("work")
+        def work():
+            with tracing.span("inner", account="u1") as sp:
+                sp.set(code=1)
+
+        work()
+        t = threading.Thread(target=work, name="worker-1")
+        t.start()
+        t.join()
+        with self.assertRaises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("x")
+
+        out = tracing.stop_tracing()
+        self.assertEqual(out, self.path)
+        events = self._load(out)
+        complete = [e for e in events if e["ph"] == "X"]
+        self.assertEqual([e["name"] for e in complete].count("work"), 2)
+        inner = next(e for e in complete if e["name"] == "inner")
+        self.assertEqual(inner["args"], {"account": "u1", "code": 1})
+        self.assertEqual(next(e for e in complete if e["name"] == "failing")["args"]["error"], "ValueError")
+        self.assertTrue(all(e["dur"] >= 0 and "ts" in e for e in complete))
+        names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+        self.assertIn("worker-1", names)
+
+    def test_submit_task_phases_are_traced(self):
+        tracing.start_tracing(self.path)
+        mgr = ProTaskManager("t", base_url="http://example.test", user_info={"studentSchoolInfo": {"schoolName": "一中"}})
+        result = mgr.submit_task({"name": "普通任务", "id": 1}, DummyAI(), dry_run=True)
+        self.assertEqual(result["code"], 1)
+        names = [e["name"] for e in self._load(tracing.stop_tracing()) if e["ph"] == "X"]
+        self.assertIn("ProTaskManager.submit_task", names)
+        self.assertIn("submit.classify", names)
+        self.assertIn("submit.generate", names)
+
+    def test_default_path_under_trace_dir(self):
+        os.environ["CEP_TRACE_DIR"] = self.tmp
+        try:
+            path = tracing.start_tracing()
+        finally:
+            os.environ.pop("CEP_TRACE_DIR", None)
+        self.assertTrue(path.startswith(self.tmp))
+        self.assertTrue(os.path.basename(path).startswith("trace-"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,9 @@ class TestVisionService(unittest.TestCase):
         self.ai_mock = MagicMock(spec=AIModelTool)
         self.ai_mock.enabled.return_value = True
         self.vision = VisionService(ai=self.ai_mock)
+        # 测试图片不写入仓库内的 runtime/image_cache
+        self.env = patch.dict(os.environ, {"CEP_IMAGE_CACHE_ENABLED": "false"})
+        self.env.start()
         
         # 创建一个标准的 100x100 RGB 测试图片
         from PIL import Image as PILImage
@@ -22,6 +25,7 @@ class TestVisionService(unittest.TestCase):
         img.save(self.test_img, "JPEG")
 
     def tearDown(self):
+        self.env.stop()
         # 清理所有可能的临时文件
         for f in [self.test_img, "test_large.jpg", "test_vision_compressed.jpg", "corrupted.jpg"]:
             if os.path.exists(f):
@@ -126,10 +130,10 @@ class TestVisionService(unittest.TestCase):
             mock_compress.return_value = (large_file, False)
             self.vision.see(large_file, engine="ai")
             
-            # 验证是否调用了压缩，且 max_size_mb 默认为 1.0
+            # 验证是否调用了压缩，且默认不覆盖 vision 规格的体积预算
             mock_compress.assert_called()
             args, kwargs = mock_compress.call_args
-            self.assertEqual(kwargs['max_size_mb'], 1.0)
+            self.assertIsNone(kwargs['max_size_mb'])
 
     def test_engine_auto_fallback(self):
         """测试 auto 引擎的降级逻辑 (AI 失败 -> 本地)"""
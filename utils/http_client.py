@@ -3,10 +3,14 @@ from __future__ import annotations
 from typing import Any, Iterable, Optional
 
 import logging
+import threading
+import time
 
 import requests
 from requests.adapters import HTTPAdapter
 
+from comprehensive_eval_pro.utils.http_metrics import metrics, response_sizes
+
 try:
     from urllib3.util.retry import Retry
 except Exception:  # pragma: no cover
@@ -15,20 +19,31 @@ except Exception:  # pragma: no cover
 DEFAULT_TIMEOUT = 10
 
 
-def create_session(
-    *,
-    retries: int = 3,
-    backoff_factor: float = 0.5,
-    status_forcelist: Iterable[int] = (429, 500, 502, 503, 504),
-    allowed_methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
-) -> requests.Session:
-    session = requests.Session()
+_shared_adapters: dict[tuple, HTTPAdapter] = {}
+_shared_adapters_lock = threading.Lock()
 
-    if Retry is None or retries <= 0:
-        return session
 
+def _pool_settings() -> tuple[int, int]:
     try:
-        retry = Retry(
+        from comprehensive_eval_pro.policy import config
+
+        connections = config.get_setting("http_pool_connections", 10, env_name="CEP_HTTP_POOL_CONNECTIONS")
+        maxsize = config.get_setting("http_pool_maxsize", 32, env_name="CEP_HTTP_POOL_MAXSIZE")
+        return max(1, int(connections)), max(1, int(maxsize))
+    except Exception:
+        return 10, 32
+
+
+def _build_retry(
+    retries: int,
+    backoff_factor: float,
+    status_forcelist: Iterable[int],
+    allowed_methods: Iterable[str],
+):
+    if Retry is None or retries <= 0:
+        return 0
+    try:
+        return Retry(
             total=retries,
             connect=retries,
             read=retries,
@@ -39,7 +54,7 @@ def create_session(
             raise_on_status=False,
         )
     except TypeError:
-        retry = Retry(
+        return Retry(
             total=retries,
             connect=retries,
             read=retries,
@@ -50,12 +65,113 @@ def create_session(
             raise_on_status=False,
         )
 
+
+def get_shared_adapter(
+    *,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    status_forcelist: Iterable[int] = (429, 500, 502, 503, 504),
+    allowed_methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
+) -> HTTPAdapter:
+    """
+    按重试策略共享的 HTTPAdapter：其连接池按主机划分 (pool_connections 个主机，
+    每个主机最多 pool_maxsize 条 keep-alive 连接)，所有账号的 Session 复用同一批连接。
+    """
+    key = (
+        int(retries),
+        float(backoff_factor),
+        tuple(status_forcelist),
+        tuple(sorted(m.upper() for m in allowed_methods)),
+    )
+    with _shared_adapters_lock:
+        adapter = _shared_adapters.get(key)
+        if adapter is None:
+            pool_connections, pool_maxsize = _pool_settings()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=_build_retry(retries, backoff_factor, status_forcelist, allowed_methods),
+            )
+            _shared_adapters[key] = adapter
+        return adapter
+
+
+def close_shared_adapters():
+    """关闭并丢弃所有共享连接池 (进程退出或测试时使用)"""
+    with _shared_adapters_lock:
+        adapters = list(_shared_adapters.values())
+        _shared_adapters.clear()
+    for adapter in adapters:
+        try:
+            adapter.close()
+        except Exception:
+            pass
+
+
+class _SharedPoolSession(requests.Session):
+    """
+    轻量 Session：只持有本账号的 headers / cookies，连接池来自共享的 HTTPAdapter。
+    close() 不关闭共享连接池，避免影响其它账号。
+    """
+
+    def close(self):
+        pass
+
+
+def create_session(
+    *,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    status_forcelist: Iterable[int] = (429, 500, 502, 503, 504),
+    allowed_methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
+    shared: bool = True,
+) -> requests.Session:
+    """
+    创建 Session。shared=True (默认) 时挂载进程级共享的连接池，
+    认证信息 (Token 请求头 / Cookie) 仍保存在各自的 Session 上，互不干扰。
+    """
+    if shared:
+        session = _SharedPoolSession()
+        adapter = get_shared_adapter(
+            retries=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=allowed_methods,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    session = requests.Session()
+
+    if Retry is None or retries <= 0:
+        return session
+
+    retry = _build_retry(retries, backoff_factor, status_forcelist, allowed_methods)
     adapter = HTTPAdapter(max_retries=retry)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+def _timed_request(session: requests.Session, method: str, url: str, *, timeout: int, **kwargs: Any) -> requests.Response:
+    """发送请求并按接口记录延迟 / 状态码 / 字节数 / 重试次数"""
+    start = time.perf_counter()
+    try:
+        resp = session.request(method=method, url=url, timeout=timeout, **kwargs)
+    except Exception:
+        metrics.record(method, url, latency=time.perf_counter() - start, error=True)
+        raise
+    latency = time.perf_counter() - start
+    try:
+        bytes_in, bytes_out, retries = response_sizes(resp)
+        status = resp.status_code if isinstance(resp.status_code, int) else None
+        metrics.record(method, url, latency=latency, status=status, bytes_in=bytes_in, bytes_out=bytes_out, retries=retries)
+    except Exception:
+        pass
+    return resp
+
+
 def request_json(
     session: requests.Session,
     method: str,
@@ -69,7 +185,7 @@ def request_json(
     log = logger or logging.getLogger(__name__)
 
     try:
-        resp = session.request(method=method, url=url, timeout=timeout, **kwargs)
+        resp = _timed_request(session, method, url, timeout=timeout, **kwargs)
     except requests.RequestException as e:
         log.error(f"HTTP 请求失败: {method} {url} ({e})")
         return None
@@ -111,7 +227,7 @@ def request_json_response(
     log = logger or logging.getLogger(__name__)
 
     try:
-        resp = session.request(method=method, url=url, timeout=timeout, **kwargs)
+        resp = _timed_request(session, method, url, timeout=timeout, **kwargs)
     except requests.RequestException as e:
         log.error(f"HTTP 请求失败: {method} {url} ({e})")
         return None, None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+# 延迟直方图分桶 (秒)，最后隐含 +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{16,}|[0-9a-fA-F-]{32,36})$")
+
+
+def template_path(url: str) -> tuple[str, str]:
+    """
+    URL -> (主机, 路径模板)：去掉查询串，纯数字 / 长十六进制 / UUID 段替换为 {id}，
+    使同一接口的不同参数聚合到同一标签下。
+    """
+    try:
+        parts = urlsplit(url or "")
+    except ValueError:
+        return "", "/"
+    segments = [("{id}" if _ID_SEGMENT.match(seg) else seg) for seg in (parts.path or "/").split("/")]
+    return (parts.netloc or "").lower(), "/".join(segments) or "/"
+
+
+class _EndpointStats:
+    __slots__ = ("count", "errors", "latency_sum", "buckets", "status", "bytes_in", "bytes_out", "retries")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.status: dict[str, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency_sum": round(self.latency_sum, 6),
+            "latency_avg": round(self.latency_sum / self.count, 6) if self.count else 0.0,
+            "latency_buckets": {
+                **{str(b): n for b, n in zip(LATENCY_BUCKETS, self._cumulative())},
+                "+Inf": self.count,
+            },
+            "status": dict(sorted(self.status.items())),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "retries": self.retries,
+        }
+
+    def _cumulative(self) -> list[int]:
+        out, total = [], 0
+        for n in self.buckets[:-1]:
+            total += n
+            out.append(total)
+        return out
+
+
+class HttpMetrics:
+    """
+    进程内的 HTTP 指标登记表，按 (方法, 主机, 路径模板) 聚合：
+    延迟直方图、状态码计数、收发字节数与 urllib3 重试次数。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str, str], _EndpointStats] = {}
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        *,
+        latency: float,
+        status: Optional[int] = None,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retries: int = 0,
+        error: bool = False,
+    ):
+        host, path = template_path(url)
+        key = ((method or "GET").upper(), host, path)
+        idx = len(LATENCY_BUCKETS)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                idx = i
+                break
+        status_key = str(status) if status is not None else "error"
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _EndpointStats()
+            stats.count += 1
+            stats.latency_sum += max(0.0, latency)
+            stats.buckets[idx] += 1
+            stats.status[status_key] = stats.status.get(status_key, 0) + 1
+            stats.bytes_in += max(0, int(bytes_in or 0))
+            stats.bytes_out += max(0, int(bytes_out or 0))
+            stats.retries += max(0, int(retries or 0))
+            if error or status is None or status >= 400:
+                stats.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = [
+                {"method": m, "host": h, "path": p, **stats.to_dict()}
+                for (m, h, p), stats in sorted(self._stats.items())
+            ]
+        return {"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "endpoints": endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()["endpoints"]
+        lines = [
+            "# HELP cep_http_request_duration_seconds HTTP request latency",
+            "# TYPE cep_http_request_duration_seconds histogram",
+        ]
+
+        def _labels(ep: dict, **extra) -> str:
+            items = {"method": ep["method"], "host": ep["host"], "path": ep["path"], **extra}
+            body = ",".join(f'{k}="{_escape_label(v)}"' for k, v in items.items())
+            return "{" + body + "}"
+
+        for ep in snap:
+            for le, n in ep["latency_buckets"].items():
+                lines.append(f"cep_http_request_duration_seconds_bucket{_labels(ep, le=le)} {n}")
+            lines.append(f"cep_http_request_duration_seconds_sum{_labels(ep)} {ep['latency_sum']}")
+            lines.append(f"cep_http_request_duration_seconds_count{_labels(ep)} {ep['count']}")
+        lines += ["# HELP cep_http_responses_total HTTP responses by status", "# TYPE cep_http_responses_total counter"]
+        for ep in snap:
+            for status, n in ep["status"].items():
+                lines.append(f"cep_http_responses_total{_labels(ep, status=status)} {n}")
+        for name, field, help_text in (
+            ("cep_http_response_bytes_total", "bytes_in", "Response body bytes"),
+            ("cep_http_request_bytes_total", "bytes_out", "Request body bytes"),
+            ("cep_http_retries_total", "retries", "urllib3 retries"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for ep in snap:
+                lines.append(f"{name}{_labels(ep)} {ep[field]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = HttpMetrics()
+
+
+def response_sizes(resp) -> tuple[int, int, int]:
+    """从 Response 提取 (接收字节, 发送字节, 重试次数)，取不到时记 0"""
+    bytes_in = bytes_out = retries = 0
+    content = getattr(resp, "_content", None)
+    if isinstance(content, (bytes, bytearray)):
+        bytes_in = len(content)
+    body = getattr(getattr(resp, "request", None), "body", None)
+    if isinstance(body, (bytes, bytearray)):
+        bytes_out = len(body)
+    elif isinstance(body, str):
+        bytes_out = len(body.encode("utf-8"))
+    history = getattr(getattr(getattr(resp, "raw", None), "retries", None), "history", None)
+    if isinstance(history, tuple):
+        retries = len(history)
+    return bytes_in, bytes_out, retries
+
+
+def dump_metrics(path: Optional[str] = None, fmt: Optional[str] = None) -> Optional[str]:
+    """
+    运行结束时落盘指标：默认 runtime/metrics.json；fmt="prometheus" 时写 textfile 格式。
+    没有任何请求记录时不写文件。
+    """
+    from comprehensive_eval_pro.policy import config
+
+    if not config.get_setting("metrics_enabled", True, env_name="CEP_METRICS_ENABLED"):
+        return None
+    fmt = (fmt or config.get_setting("metrics_format", "json", env_name="CEP_METRICS_FORMAT") or "json").lower()
+    default_name = "metrics.prom" if fmt == "prometheus" else "metrics.json"
+    default_path = os.path.join(config.base_dir, "runtime", default_name)
+    path = path or config.get_setting("metrics_file", default_path, env_name="CEP_METRICS_FILE", is_path=True) or default_path
+    snap = metrics.snapshot()
+    if not snap["endpoints"]:
+        return None
+    text = metrics.to_prometheus() if fmt == "prometheus" else json.dumps(snap, ensure_ascii=False, indent=2)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return path
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger("ImageCache")
+
+# 转码算法变化时递增，使旧缓存自然失效
+CACHE_VERSION = 1
+
+
+class ImageCache:
+    """
+    预处理图片的内容寻址磁盘缓存。
+
+    键 = (源文件内容哈希, 规格参数)，值 = 最终可直接上传/送模型的 JPEG 字节。
+    已满足规格、原样使用的源文件只记一个空的 <key>.pass 标记，不重复保存字节。
+    超出体积预算时按最近使用时间 (mtime) 淘汰最旧的条目。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        # (绝对路径, 大小, mtime_ns) -> 内容哈希，避免同一进程内重复读盘计算
+        self._digest_memo: dict[tuple, str] = {}
+
+    def source_digest(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._digest_memo.get(memo_key)
+        if digest:
+            return digest
+        hasher = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+        except OSError:
+            return None
+        digest = hasher.hexdigest()
+        self._digest_memo[memo_key] = digest
+        return digest
+
+    def make_key(self, path: str, params: dict) -> Optional[str]:
+        digest = self.source_digest(path)
+        if not digest:
+            return None
+        spec = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(f"v{CACHE_VERSION}|{digest}|{spec}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.jpg")
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not key:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path, None)  # 刷新 LRU 时间戳
+        except OSError:
+            pass
+        return data
+
+    def is_passthrough(self, key: str) -> bool:
+        """该源文件在该规格下是否已确认可原样使用"""
+        return bool(key) and os.path.exists(self._entry_path(key)[: -len(".jpg")] + ".pass")
+
+    def mark_passthrough(self, key: str):
+        if not key or self.max_bytes <= 0:
+            return
+        path = self._entry_path(key)[: -len(".jpg")] + ".pass"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb"):
+                pass
+        except OSError as e:
+            logger.debug(f"写入图片缓存标记失败: {e}")
+
+    def put(self, key: str, data: bytes):
+        if not key or not data or self.max_bytes <= 0:
+            return
+        path = self._entry_path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            existed = os.path.exists(path)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".img_", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.debug(f"写入图片缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            elif not existed:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def trim(self):
+        """重新统计目录体积（其他进程可能也写入过），超出预算时执行一次淘汰"""
+        with self._lock:
+            self._total_bytes = self._scan_total()
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _list_entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        try:
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".jpg"):
+                        continue
+                    p = os.path.join(root, name)
+                    try:
+                        st = os.stat(p)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, p))
+        except OSError:
+            pass
+        return entries
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _evict_locked(self):
+        # 淘汰到预算的 90%，避免每次写入都触发一轮扫描
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._list_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+
+_default_cache: Optional[ImageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """
+    获取全局图片缓存实例（按配置惰性创建）；禁用时返回 None。
+    """
+    global _default_cache
+    from comprehensive_eval_pro.policy import config
+
+    if not config.get_setting("image_cache_enabled", True, env_name="CEP_IMAGE_CACHE_ENABLED"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            cache_dir = config.get_setting(
+                "image_cache_dir",
+                os.path.join(config.base_dir, "runtime", "image_cache"),
+                env_name="CEP_IMAGE_CACHE_DIR",
+                is_path=True,
+            )
+            max_mb = config.get_setting("image_cache_max_mb", 256, env_name="CEP_IMAGE_CACHE_MAX_MB")
+            _default_cache = ImageCache(cache_dir, max_bytes=int(max_mb) * 1024 * 1024)
+        return _default_cache
@@ -44,14 +44,7 @@ def ensure_jpg(image_path: str, quality: int = 92) -> Tuple[str, bool]:
                 except Exception:
                     pass
 
-            if img.mode in ("RGBA", "LA") or ("transparency" in getattr(img, "info", {})):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                alpha = img.split()[-1] if img.mode in ("RGBA", "LA") else None
-                background.paste(img.convert("RGBA"), mask=alpha)
-                out_img = background
-            else:
-                out_img = img.convert("RGB") if img.mode != "RGB" else img
-
+            out_img = _flatten_to_rgb(img)
             out_img.save(out_path, format="JPEG", quality=quality, optimize=True)
 
         return out_path, True
@@ -65,86 +58,203 @@ def ensure_jpg(image_path: str, quality: int = 92) -> Tuple[str, bool]:
         return image_path, False
 
 
-def compress_image(image_path: str, max_size_mb: float = 1.0, is_captcha: bool = False) -> Tuple[str, bool]:
+# 各消费方的图片规格：max_dim 为长边像素上限 (0 表示不限制)，max_bytes 为体积预算
+IMAGE_PROFILES = {
+    "upload": {"max_dim": 2560, "max_bytes": 1024 * 1024, "min_quality": 50, "max_quality": 90},
+    "vision": {"max_dim": 1280, "max_bytes": 512 * 1024, "min_quality": 40, "max_quality": 85},
+    "ocr": {"max_dim": 2048, "max_bytes": 1024 * 1024, "min_quality": 60, "max_quality": 92},
+}
+_LEGACY_PROFILE = {"max_dim": 0, "max_bytes": 1024 * 1024, "min_quality": 40, "max_quality": 92}
+
+
+def get_image_profile(profile: Optional[str] = None, max_size_mb: Optional[float] = None) -> dict:
     """
-    智能压缩图片至指定大小（默认 1MB）。性能优化版：减少重复 IO。
+    获取图片规格（返回副本）。max_size_mb 显式传入时覆盖规格中的体积预算。
     """
-    if not image_path or not os.path.exists(image_path):
-        return image_path, False
+    spec = dict(IMAGE_PROFILES.get((profile or "").lower(), _LEGACY_PROFILE))
+    if max_size_mb is not None and max_size_mb > 0:
+        spec["max_bytes"] = int(max_size_mb * 1024 * 1024)
+    return spec
+
+
+def _flatten_to_rgb(img):
+    from PIL import Image
 
-    # 1. 确保是 JPG
-    curr_path, cleanup = ensure_jpg(image_path)
-    
+    if img.mode in ("RGBA", "LA") or ("transparency" in getattr(img, "info", {})):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    return img.convert("RGB") if img.mode != "RGB" else img
+
+
+def _encode_jpeg(img, quality: int) -> bytes:
+    import io
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _encode_within_budget(img, max_bytes: int, min_quality: int, max_quality: int) -> Tuple[bytes, bool]:
+    """
+    二分查找满足体积预算的最高 JPEG 质量，返回 (数据, 是否达标)。
+    未达标时返回最低质量的编码结果，由调用方决定是否继续缩放。
+    """
+    data = _encode_jpeg(img, max_quality)
+    if len(data) <= max_bytes:
+        return data, True
+
+    lo, hi = min_quality, max_quality - 1
+    best = None
+    smallest = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        candidate = _encode_jpeg(img, mid)
+        if len(candidate) <= max_bytes:
+            best = candidate
+            lo = mid + 1
+        else:
+            smallest = candidate
+            hi = mid - 1
+    if best is not None:
+        return best, True
+    return smallest if smallest is not None else data, False
+
+
+def transcode_image(
+    image_path: str,
+    profile: Optional[str] = None,
+    max_size_mb: Optional[float] = None,
+    is_captcha: bool = False,
+) -> Optional[bytes]:
+    """
+    按规格将图片转码为 JPEG 字节流。
+
+    - JPEG 源图先用 Image.draft() 在 DCT 域降采样，避免完整解码千万像素原图
+    - 超出 max_dim 的图片按长边等比缩放 (LANCZOS)
+    - 质量参数二分查找，仍超预算时逐级缩小尺寸（验证码不缩放）
+    - 图片损坏或未安装 Pillow 时返回 None
+    """
+    if not image_path or not os.path.exists(image_path):
+        return None
     try:
         from PIL import Image
-        import io
     except ImportError:
-        return curr_path, cleanup
+        return None
 
-    max_bytes = max_size_mb * 1024 * 1024
-    
-    def get_size(p):
-        return os.path.getsize(p)
+    spec = get_image_profile(profile, max_size_mb)
+    max_dim = 0 if is_captcha else int(spec.get("max_dim") or 0)
+    max_bytes = int(spec["max_bytes"])
 
     try:
-        # 即使文件很小，也要检查是否损坏
-        with Image.open(curr_path) as verify_img:
+        with Image.open(image_path) as verify_img:
             verify_img.verify()
-        
-        with Image.open(curr_path) as img:
+
+        with Image.open(image_path) as img:
+            if getattr(img, "is_animated", False):
+                try:
+                    img.seek(0)
+                except Exception:
+                    pass
+            if max_dim and img.format == "JPEG" and max(img.size) > max_dim:
+                img.draft("RGB", (max_dim, max_dim))
             img.load()
-            
-            if get_size(curr_path) <= max_bytes:
-                return curr_path, cleanup
-
-            # 2. 内存中寻找最佳质量参数
-            best_q = 92
-            buf = io.BytesIO()
-            for q in [80, 60, 40]:
-                buf = io.BytesIO()
-                img.save(buf, format="JPEG", quality=q, optimize=True)
-                if buf.tell() <= max_bytes:
-                    best_q = q
+            out_img = _flatten_to_rgb(img)
+            if max_dim and max(out_img.size) > max_dim:
+                out_img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+            data, fits = _encode_within_budget(out_img, max_bytes, spec["min_quality"], spec["max_quality"])
+            if fits or is_captcha:
+                return data
+
+            # 质量下探到底仍超标：按 0.75 逐级缩小尺寸
+            scaled = out_img
+            while not fits:
+                new_size = (int(scaled.width * 0.75), int(scaled.height * 0.75))
+                if new_size[0] < 10 or new_size[1] < 10:
                     break
-                best_q = q 
-
-            # 3. 如果质量调整后还超标，且非验证码，进行内存缩放
-            final_img_data = buf.getvalue()
-            if buf.tell() > max_bytes and not is_captcha:
-                scale = 0.9
-                while scale > 0.1:
-                    new_size = (int(img.width * scale), int(img.height * scale))
-                    if new_size[0] < 10 or new_size[1] < 10:
-                        break
-                    with img.resize(new_size, Image.Resampling.LANCZOS) as temp_img:
-                        buf = io.BytesIO()
-                        temp_img.save(buf, format="JPEG", quality=best_q, optimize=True)
-                        if buf.tell() <= max_bytes:
-                            final_img_data = buf.getvalue()
-                            break
-                    scale *= 0.7 
-                if scale <= 0.1:
-                    final_img_data = buf.getvalue()
-
-            # 4. 最终一次性 IO 写入
-            fd, out_path = tempfile.mkstemp(prefix="cep_comp_", suffix=".jpg")
-            os.close(fd)
-            with open(out_path, "wb") as f:
-                f.write(final_img_data)
-            
-            # 清理旧的临时文件
-            if cleanup:
-                cleanup_temp_file(curr_path, True)
-                
-            return out_path, True
+                scaled = scaled.resize(new_size, Image.Resampling.LANCZOS)
+                data, fits = _encode_within_budget(scaled, max_bytes, spec["min_quality"], spec["min_quality"])
+            return data
+    except Exception as e:
+        logger.error(f"图片转码异常: {image_path} ({e})")
+        return None
+
+
+def _fits_profile(image_path: str, spec: dict, is_captcha: bool) -> bool:
+    """源文件已是 JPEG 且尺寸、体积均在规格内时可直接复用（仅读取文件头）"""
+    _, ext = os.path.splitext(image_path)
+    if (ext or "").lower() not in {".jpg", ".jpeg"}:
+        return False
+    if os.path.getsize(image_path) > spec["max_bytes"]:
+        return False
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        if img.format != "JPEG":
+            return False
+        max_dim = 0 if is_captcha else int(spec.get("max_dim") or 0)
+        if max_dim and max(img.size) > max_dim:
+            return False
+        img.verify()
+    return True
+
+
+def _write_temp_jpeg(data: bytes) -> str:
+    fd, out_path = tempfile.mkstemp(prefix="cep_comp_", suffix=".jpg")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return out_path
+
 
+def compress_image(
+    image_path: str,
+    max_size_mb: Optional[float] = None,
+    is_captcha: bool = False,
+    profile: Optional[str] = None,
+    cache=None,
+) -> Tuple[Optional[str], bool]:
+    """
+    按消费方规格 (upload/vision/ocr) 压缩图片，返回 (路径, 是否需要清理)。
+    已满足规格的 JPEG 原样返回；图片损坏时返回 (None, False)。
+    传入 cache (ImageCache) 时命中缓存将直接复用转码结果，不再做任何 Pillow 解码；
+    原样返回的文件只在缓存中记一个标记，下次直接返回原路径。
+    """
+    if not image_path or not os.path.exists(image_path):
+        return image_path, False
+
+    spec = get_image_profile(profile, max_size_mb)
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(image_path, dict(spec, captcha=bool(is_captcha)))
+        if cache.is_passthrough(cache_key):
+            return image_path, False
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _write_temp_jpeg(cached), True
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return ensure_jpg(image_path)
+
+    try:
+        if _fits_profile(image_path, spec, is_captcha):
+            if cache_key:
+                cache.mark_passthrough(cache_key)
+            return image_path, False
     except Exception as e:
         logger.error(f"图片压缩异常: {e}")
-        # 如果报错了，如果是 ensure_jpg 生成的临时文件也要清理，防止残留
-        if cleanup:
-            cleanup_temp_file(curr_path, True)
         return None, False
 
+    data = transcode_image(image_path, profile=profile, max_size_mb=max_size_mb, is_captcha=is_captcha)
+    if data is None:
+        return None, False
+    if cache_key:
+        cache.put(cache_key, data)
+    return _write_temp_jpeg(data), True
+
 
 def cleanup_temp_file(path: Optional[str], cleanup: bool):
     if not cleanup or not path:
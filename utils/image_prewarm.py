@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Iterable, Optional
+
+from comprehensive_eval_pro.utils.image_cache import ImageCache, get_image_cache
+
+logger = logging.getLogger("ImagePrewarm")
+
+# 预转码参数必须与实际调用方完全一致才能命中缓存：
+#   ProFileService.upload_image          -> profile="upload"
+#   VisionService.see(task_type="analysis") -> profile="vision"
+UPLOAD_JOB = ("upload", None)
+VISION_JOB = ("vision", None)
+
+
+# 每个子进程只建一个缓存实例，体积统计只在首次写入时扫描一次目录
+_worker_cache: Optional[ImageCache] = None
+
+
+def _init_worker(cache_dir: str, max_bytes: int):
+    """子进程初始化：创建本进程共用的 ImageCache"""
+    global _worker_cache
+    _worker_cache = ImageCache(cache_dir, max_bytes=max_bytes)
+
+
+def _warm_image(path: str, profile: str, max_size_mb: Optional[float]) -> bool:
+    """子进程入口：转码单张图片并写入磁盘缓存"""
+    from comprehensive_eval_pro.utils.image_convert import cleanup_temp_file, compress_image
+
+    out, cleanup = compress_image(path, max_size_mb=max_size_mb, profile=profile, cache=_worker_cache)
+    cleanup_temp_file(out, cleanup)
+    return bool(out)
+
+
+class ImagePrewarmer:
+    """
+    后台图片预转码：在用户挑选账号期间，用进程池把各班级可能用到的图片
+    提前转码进 ImageCache，提交阶段直接命中缓存。
+    """
+
+    def __init__(self, cache: ImageCache, workers: int = 2):
+        self.cache = cache
+        self.workers = max(1, int(workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: dict[str, list[Future]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._collector: Optional[threading.Thread] = None
+
+    def start(self, task_mgrs: Iterable) -> bool:
+        try:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.cache.cache_dir, self.cache.max_bytes),
+            )
+        except Exception as e:
+            logger.warning(f"无法启动图片预转码进程池: {e}")
+            return False
+        mgrs = list(task_mgrs)
+        self._collector = threading.Thread(target=self._collect_and_submit, args=(mgrs,), name="cep-image-prewarm", daemon=True)
+        self._collector.start()
+        return True
+
+    @staticmethod
+    def build_jobs(task_mgrs: Iterable) -> list[tuple[str, str, Optional[float]]]:
+        """按 (学校, 年级, 班级) 去重后生成 (路径, 规格, max_size_mb) 任务列表"""
+        jobs = []
+        seen_groups = set()
+        seen_jobs = set()
+        for tm in task_mgrs:
+            try:
+                group = (tm._school_name(), tm._grade_name(), tm._pure_class_name())
+                if group in seen_groups:
+                    continue
+                seen_groups.add(group)
+                images = tm.collect_candidate_images()
+            except Exception as e:
+                logger.debug(f"收集预转码图片失败: {e}")
+                continue
+            for sub_dir, paths in images.items():
+                specs = [UPLOAD_JOB, VISION_JOB] if sub_dir == "劳动" else [UPLOAD_JOB]
+                for p in paths:
+                    for profile, max_size_mb in specs:
+                        key = (p, profile)
+                        if key not in seen_jobs:
+                            seen_jobs.add(key)
+                            jobs.append((p, profile, max_size_mb))
+        return jobs
+
+    def _collect_and_submit(self, task_mgrs: list):
+        jobs = self.build_jobs(task_mgrs)
+        if jobs:
+            logger.info(f"后台预转码 {len(jobs)} 个图片任务 (进程数: {self.workers})")
+        for path, profile, max_size_mb in jobs:
+            if self._stopped.is_set():
+                return
+            try:
+                fut = self._pool.submit(_warm_image, path, profile, max_size_mb)
+            except Exception as e:
+                logger.debug(f"提交预转码任务失败: {e}")
+                return
+            with self._lock:
+                self._futures.setdefault(os.path.abspath(path), []).append(fut)
+        # 各子进程只统计自己写入的字节，全部完成后在主进程统一核对一次预算
+        with self._lock:
+            futures = [f for fs in self._futures.values() for f in fs]
+        wait(futures)
+        if not self._stopped.is_set():
+            self.cache.trim()
+
+    def wait_for(self, path: str, timeout: float = 30.0):
+        """若该图片仍在预转码中则等待其完成，避免主流程重复转码"""
+        with self._lock:
+            futures = list(self._futures.get(os.path.abspath(path or ""), []))
+        if futures:
+            wait(futures, timeout=timeout)
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._pool is not None:
+            try:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+
+
+_active: Optional[ImagePrewarmer] = None
+
+
+def start_image_prewarm(task_mgrs: Iterable) -> Optional[ImagePrewarmer]:
+    global _active
+    from comprehensive_eval_pro.policy import config
+
+    if not config.get_setting("image_prewarm_enabled", True, env_name="CEP_IMAGE_PREWARM_ENABLED"):
+        return None
+    cache = get_image_cache()
+    if cache is None:
+        return None
+    stop_image_prewarm()
+    workers = config.get_setting("image_prewarm_workers", 2, env_name="CEP_IMAGE_PREWARM_WORKERS")
+    prewarmer = ImagePrewarmer(cache, workers=workers)
+    if not prewarmer.start(task_mgrs):
+        return None
+    _active = prewarmer
+    return prewarmer
+
+
+def wait_for_prewarm(path: str, timeout: float = 30.0):
+    prewarmer = _active
+    if prewarmer is not None:
+        prewarmer.wait_for(path, timeout=timeout)
+
+
+def stop_image_prewarm():
+    global _active
+    prewarmer, _active = _active, None
+    if prewarmer is not None:
+        prewarmer.shutdown()
@@ -110,3 +110,19 @@ def extract_first_record_text(folder: str) -> tuple[str, str | None]:
 
     return "", None
 
+
+RECORD_EXTS = (".xls", ".xlsx", ".docx", ".doc", ".txt", ".pdf")
+
+
+def has_record_file(folder: str) -> bool:
+    """
+    廉价探测：目录下是否存在非空的记录文件 (不解析内容)，用于资源体检。
+    """
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.lower().endswith(RECORD_EXTS) and entry.is_file() and entry.stat().st_size > 0:
+                    return True
+    except OSError:
+        pass
+    return False
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger("ResourceHealth")
+
+
+def get_health_check_workers() -> int:
+    from comprehensive_eval_pro.policy import config
+
+    try:
+        return max(1, int(config.get_setting("health_check_workers", 8, env_name="CEP_HEALTH_CHECK_WORKERS")))
+    except (TypeError, ValueError):
+        return 1
+
+
+def get_health_revalidate_seconds() -> float:
+    from comprehensive_eval_pro.policy import config
+
+    try:
+        return max(0.0, float(config.get_setting("health_cache_revalidate_seconds", 5, env_name="CEP_HEALTH_CACHE_REVALIDATE_SECONDS")))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def group_key(task_mgr) -> tuple[str, str, str]:
+    return (task_mgr._school_name(), task_mgr._grade_name(), task_mgr._pure_class_name())
+
+
+def group_ready_accounts(prepared_accounts: Iterable[dict]) -> dict[tuple[str, str, str], list[dict]]:
+    """就绪账号按 (学校, 年级, 班级) 分组，保持首次出现的顺序"""
+    groups: dict[tuple[str, str, str], list[dict]] = {}
+    for a in prepared_accounts:
+        if a.get("status") != "已就绪" or not a.get("task_mgr"):
+            continue
+        groups.setdefault(group_key(a["task_mgr"]), []).append(a)
+    return groups
+
+
+class HealthReportCache:
+    """
+    资源体检结果缓存：按 (学校, 年级, 班级) 存储 check_resource_health 的结果，
+    附带资源目录指纹 (resource_signature)，指纹变化时重新体检。
+    指纹本身要遍历资源目录，距上次校验不足 revalidate_seconds 时直接返回缓存结果，
+    选择界面反复重绘不会每次都扫盘。
+    同一分组的并发请求只计算一次，其余等待结果。
+    """
+
+    def __init__(self, revalidate_seconds: Optional[float] = None):
+        self.revalidate_seconds = revalidate_seconds
+        self._lock = threading.Lock()
+        # 分组 -> (指纹, 体检结果, 校验时间 monotonic)
+        self._entries: dict[tuple, tuple[Any, dict, float]] = {}
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self._prewarm: Optional[threading.Thread] = None
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def _signature(task_mgr) -> Any:
+        fn = getattr(task_mgr, "resource_signature", None)
+        if not callable(fn):
+            return None
+        try:
+            return fn()
+        except Exception as e:
+            logger.debug(f"计算资源指纹失败: {e}")
+            return None
+
+    def get(self, task_mgr) -> dict:
+        key = group_key(task_mgr)
+        ttl = self.revalidate_seconds
+        if ttl is None:
+            ttl = get_health_revalidate_seconds()
+        with self._key_lock(key):
+            cached = self._entries.get(key)
+            now = time.monotonic()
+            if cached is not None and cached[0] is not None and now - cached[2] < ttl:
+                return cached[1]
+            signature = self._signature(task_mgr)
+            if cached is not None and signature is not None and cached[0] == signature:
+                self._entries[key] = (signature, cached[1], now)
+                return cached[1]
+            health = task_mgr.check_resource_health()
+            self._entries[key] = (signature, health, time.monotonic())
+            return health
+
+    def get_many(self, task_mgrs: list, workers: Optional[int] = None) -> list[dict]:
+        """
+        并发体检多个分组 (有界线程池)，结果顺序与输入一致；
+        单个分组体检异常时返回空字典 (报告中显示为缺失)。
+        """
+        task_mgrs = list(task_mgrs)
+        workers = min(len(task_mgrs), workers or get_health_check_workers())
+
+        def _safe_get(tm) -> dict:
+            try:
+                return self.get(tm)
+            except Exception as e:
+                logger.debug(f"资源体检失败: {e}")
+                return {}
+
+        if workers <= 1:
+            return [_safe_get(tm) for tm in task_mgrs]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cep-health") as pool:
+            return list(pool.map(_safe_get, task_mgrs))
+
+    def prewarm(self, prepared_accounts: Iterable[dict]) -> bool:
+        """后台线程为每个分组预先体检一次；返回是否已启动"""
+        reps = [accounts[0]["task_mgr"] for accounts in group_ready_accounts(prepared_accounts).values()]
+        if not reps:
+            return False
+
+        def _run():
+            self.get_many(reps)
+
+        self._prewarm = threading.Thread(target=_run, name="cep-health-prewarm", daemon=True)
+        self._prewarm.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        thread = self._prewarm
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+health_cache = HealthReportCache()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# 运行期的全局 Tracer；为 None 时 span() 直接返回空上下文，开销只有一次全局变量读取
+_tracer: Optional["Tracer"] = None
+_trace_path: Optional[str] = None
+_tracer_lock = threading.Lock()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start_ns")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_complete(self.name, self.cat, self.start_ns, end_ns, self.args)
+        return False
+
+    def set(self, **args):
+        """在 span 结束前补充参数 (如结果状态码)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    收集 Chrome / Perfetto trace-event 格式的完整事件 (ph="X")，
+    每个线程一条时间线，结束时写成一个 JSON 文件。
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._origin_ns = time.perf_counter_ns()
+        self._events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add_complete(self, name: str, cat: str, start_ns: int, end_ns: int, args: Optional[dict] = None):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start_ns - self._origin_ns) / 1000.0,
+            "dur": max(0, end_ns - start_ns) / 1000.0,
+            "pid": self.pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {k: _jsonable(v) for k, v in args.items()}
+        with self._lock:
+            self._events.append(event)
+            if thread.ident not in self._threads:
+                self._threads[thread.ident] = thread.name
+
+    def events(self) -> list[dict]:
+        with self._lock:
+            meta = [
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            return meta + list(self._events)
+
+    def save(self, path: str) -> str:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".trace_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def span(name: str, cat: str = "cep", **args):
+    """
+    记录一段耗时：with span("submit.upload", task=name): ...
+    未启用追踪时返回共享的空上下文。
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def traced(name: Optional[str] = None, cat: str = "cep") -> Callable:
+    """函数装饰器版本的 span；未启用追踪时直接调用原函数"""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*a, **kw)
+            with _Span(tracer, span_name, cat, {}):
+                return fn(*a, **kw)
+
+        return wrapper
+
+    return decorator
+
+
+def is_tracing() -> bool:
+    return _tracer is not None
+
+
+def start_tracing(path: Optional[str] = None) -> Optional[str]:
+    """
+    开始记录本次运行的追踪；返回将要写入的文件路径。
+    默认写入 runtime/traces/trace-<时间>-<pid>.json。
+    """
+    global _tracer, _trace_path
+    from comprehensive_eval_pro.policy import config
+
+    if path is None:
+        trace_dir = config.get_setting(
+            "trace_dir",
+            os.path.join(config.base_dir, "runtime", "traces"),
+            env_name="CEP_TRACE_DIR",
+            is_path=True,
+        )
+        path = os.path.join(trace_dir, f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+    with _tracer_lock:
+        _tracer = Tracer()
+        _trace_path = path
+    return path
+
+
+def stop_tracing() -> Optional[str]:
+    """停止追踪并落盘，返回写入的文件路径；未启用时返回 None"""
+    global _tracer, _trace_path
+    with _tracer_lock:
+        tracer, path = _tracer, _trace_path
+        _tracer, _trace_path = None, None
+    if tracer is None or not path:
+        return None
+    return tracer.save(path)
+